@@ -0,0 +1,526 @@
+"""项目 e5 的渲染微基准脚本。
+
+用法: python benchmark.py {runs,paragraphs,compiled-styles,tables,formulas,hyperlinks,references,nodes,startup,serve} [--count N] [--rows N] [--budget-ms MS]
+"""
+import argparse
+import gc
+import io
+import json
+from pathlib import Path
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+import urllib.error
+import urllib.request
+import zipfile
+
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.shared import Pt
+from lxml import etree
+
+from custom import GenerationServer, USTCContentParser, USTCFormatter, USTCStyleManager
+from custom.citations import find_citation_spans
+from custom.fragments import FragmentTemplates, build_hyperlink, reference_hyperlink_rpr
+from custom.nodes import ParagraphNode, TableNode, content_to_dict
+from custom.omml import OmmlBuilder
+from custom.references import normalize_reference_text
+from custom.styles import extract_font_pair, resolve_paragraph_style
+from custom.xml_builder import append_block
+
+
+BASE_DIR = Path(__file__).resolve().parent
+SAMPLE_TEXT = '研究表明 mixed text ABC 123，结果显著。'
+# generate.py --parse-only 冷启动（含解释器启动与解析示例文本）的耗时预算
+STARTUP_BUDGET_MS = 120
+SAMPLE_PARAGRAPH = '段落文本 mixed text ABC 123，研究表明[1]结果显著，详见文献[2]。' * 3
+# GB/T 7714 参考文献语料：每行 {"text": 原始条目, "expected": 期望的清洗结果}
+REFERENCE_CORPUS = BASE_DIR / 'benchmark_data' / 'references_gbt7714.jsonl'
+# nodes 基准：长文档合集的正文段落数
+NODE_PARAGRAPHS = 50000
+# 附录大表：tables 基准默认 2000 行 × 12 列
+TABLE_ROWS = 2000
+TABLE_COLUMNS = 12
+# formulas 基准：公式密集章节中的各行公式（按序循环，含大量重复）
+SAMPLE_FORMULAS = (
+    'y_i = alpha + beta_1 x_i + sin(t) + 2*x',
+    'E = m*c^2 + 1000*(x - 273.15)',
+    'L = -sum(y_i log(p_i)) + 0.5*lambda*W_12',
+    'h_t = ReLU(W_h h_t + U_h x_t + b_h)',
+    'f(x) = max(0, x) + min(x, 10) - exp(-2*x)',
+)
+
+
+def _best_of(func, repeat=5):
+    """多次运行取最短耗时（秒）"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _best_of_interleaved(funcs, repeat=5):
+    """各函数按轮交替运行，每轮前先回收垃圾，分别取最短耗时（秒）"""
+    best = [None] * len(funcs)
+    for _ in range(repeat):
+        for idx, func in enumerate(funcs):
+            gc.collect()
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best[idx] = elapsed if best[idx] is None else min(best[idx], elapsed)
+    return best
+
+
+def bench_runs(style_manager, count):
+    """对比 rPr 模板深拷贝与逐项写入属性的 run 吞吐量"""
+    run_style = style_manager.compiled.body.run
+    size_pt = Pt(run_style.size)
+
+    def templated():
+        paragraph = Document().add_paragraph()
+        for _ in range(count):
+            style_manager.apply_mixed_run_style(paragraph.add_run(), SAMPLE_TEXT, run_style)
+
+    def element_by_element():
+        paragraph = Document().add_paragraph()
+        for _ in range(count):
+            run = paragraph.add_run()
+            run.text = SAMPLE_TEXT
+            style_manager._write_mixed_rpr(
+                run, run_style.chinese_font, run_style.english_font, size_pt, run_style.bold
+            )
+
+    for label, func in (('模板深拷贝', templated), ('逐项写入', element_by_element)):
+        elapsed = _best_of(func)
+        print(f'{label}: {count / elapsed:,.0f} runs/s')
+
+
+def _render_paragraphs(style_manager, backend, count, formatter_class=USTCFormatter):
+    """用指定后端写入 count 个正文段落，返回生成器"""
+    formatter = formatter_class(style_manager, backend=backend)
+    formatter.reference_targets = {1: {'bookmark': '_Ref_1'}, 2: {'bookmark': '_Ref_2'}}
+    for _ in range(count):
+        formatter._add_paragraph(SAMPLE_PARAGRAPH)
+    return formatter
+
+
+def bench_paragraphs(style_manager, count):
+    """对比 python-docx 与 lxml 后端的正文段落吞吐量（先校验两者 XML 一致）"""
+    bodies = [
+        etree.tostring(_render_paragraphs(style_manager, backend, 50).doc.element.body, method='c14n')
+        for backend in USTCFormatter.BACKENDS
+    ]
+    if len(set(bodies)) != 1:
+        raise SystemExit('✗ 渲染后端输出的 XML 不一致')
+    print('✓ 各后端输出的 XML 一致（c14n）')
+
+    for backend in USTCFormatter.BACKENDS:
+        elapsed = _best_of(lambda: _render_paragraphs(style_manager, backend, count), repeat=3)
+        print(f'{backend}: {count / elapsed:,.0f} paragraphs/s')
+
+
+class _PerParagraphResolvingFormatter(USTCFormatter):
+    """对照：样式编译前的正文段落写法，每个段落都重新读取配置字典、解析字体对，并由配置字典解析段落格式"""
+
+    def _add_paragraph(self, text, citations=None):
+        para_style = self.style_manager.get_paragraph_style()
+        para = self._new_body_paragraph()
+
+        fonts = self.style_manager.get_fonts()
+        body_cn, body_en = extract_font_pair(
+            para_style, fonts.get('chinese', '宋体'), fonts.get('english', 'Times New Roman')
+        )
+        self._add_text_with_citations(
+            para,
+            text,
+            chinese_font=body_cn,
+            english_font=body_en,
+            font_size=para_style.get('size', 12),
+            bold=para_style.get('bold', False),
+            citations=citations
+        )
+        self.style_manager.apply_paragraph_style(para, para_style)
+
+
+def bench_compiled_styles(style_manager, count):
+    """对比预编译样式与逐段落重新解析配置：单独的样式解析耗时与正文段落吞吐量（先校验两者 XML 一致）"""
+    for backend in USTCFormatter.BACKENDS:
+        bodies = [
+            etree.tostring(_render_paragraphs(style_manager, backend, 50, cls).doc.element.body, method='c14n')
+            for cls in (USTCFormatter, _PerParagraphResolvingFormatter)
+        ]
+        if bodies[0] != bodies[1]:
+            raise SystemExit(f'✗ 预编译样式与逐段落解析的输出不一致（{backend}）')
+    print('✓ 预编译样式与逐段落解析的输出一致（c14n）')
+
+    # 预编译省去的只是样式解析这一步：单独计时，段落写入本身（run、引用超链接）两种写法完全相同
+    def resolve_per_paragraph():
+        para_style = style_manager.get_paragraph_style()
+        fonts = style_manager.get_fonts()
+        extract_font_pair(para_style, fonts.get('chinese', '宋体'), fonts.get('english', 'Times New Roman'))
+        resolve_paragraph_style(para_style)
+
+    def read_compiled():
+        body_style = style_manager.compiled.body
+        return body_style.run, body_style.paragraph
+
+    resolve_us, compiled_us = (
+        _best_of(lambda: [func() for _ in range(count)]) * 1e6 / count
+        for func in (resolve_per_paragraph, read_compiled)
+    )
+    print(f'样式解析: 逐段落 {resolve_us:.2f} us/段落，预编译 {compiled_us:.2f} us/段落')
+
+    # 整段写入：两种写法交替运行，使系统噪声均摊到双方
+    for backend in USTCFormatter.BACKENDS:
+        per_call_elapsed, compiled_elapsed = _best_of_interleaved((
+            lambda: _render_paragraphs(style_manager, backend, count, _PerParagraphResolvingFormatter),
+            lambda: _render_paragraphs(style_manager, backend, count),
+        ))
+        saved_us = (per_call_elapsed - compiled_elapsed) * 1e6 / count
+        print(
+            f'{backend}: 逐段落解析 {count / per_call_elapsed:,.0f} paragraphs/s，'
+            f'预编译 {count / compiled_elapsed:,.0f} paragraphs/s'
+            f'（{per_call_elapsed / compiled_elapsed:.2f}x，每段落节省 {saved_us:.1f} us，'
+            f'其中样式解析 {resolve_us - compiled_us:.1f} us）'
+        )
+
+
+def _sample_table(rows, columns=TABLE_COLUMNS):
+    """表头加 rows 行数据的附录表（中英文与数字混排）"""
+    header = [f'指标{col + 1}' for col in range(columns)]
+    body = [
+        [f'{row}.{col}' if col else f'样本 S{row:04d}' for col in range(columns)]
+        for row in range(rows)
+    ]
+    return TableNode(number='1', caption='附录数据表', rows=[header, *body])
+
+
+def _render_table(style_manager, backend, table):
+    formatter = USTCFormatter(style_manager, backend=backend)
+    formatter._add_table(table)
+    return formatter
+
+
+def _fill_table_per_cell(formatter, grid, tbl_style, column_widths, has_header=True):
+    """参照实现：经 python-docx 的表格对象逐单元格写入三线表（表格改为一次构建 w:tbl 之前的做法）"""
+    table = formatter.doc.add_table(rows=grid.height, cols=grid.width)
+    rows = table.rows
+    if tbl_style.get('allow_row_break', True):
+        for row in rows:
+            cant_split = OxmlElement('w:cantSplit')
+            cant_split.set(qn('w:val'), '0')
+            row._tr.get_or_add_trPr().append(cant_split)
+
+    cell_style_id = formatter.style_ids.get('table_cell')
+    content_font = tbl_style.get('content_font', '宋体')
+    for row_idx, row_data in enumerate(grid.iter_rows()):
+        bold = row_idx == 0 and has_header
+        for col_idx in range(grid.width):
+            cell = rows[row_idx].cells[col_idx]
+            cell.text = row_data[col_idx]
+            for paragraph in cell.paragraphs:
+                if cell_style_id:
+                    paragraph._p.style = cell_style_id
+                else:
+                    paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                for run in paragraph.runs:
+                    if not cell_style_id:
+                        run.font.name = content_font
+                        run._element.rPr.rFonts.set(qn('w:eastAsia'), content_font)
+                        run.font.size = Pt(tbl_style.get('content_size', 12))
+                    if bold and cell_style_id:
+                        run._r.style = formatter.style_ids['table_header']
+                    elif bold:
+                        run.font.bold = True
+
+    if tbl_style.get('header_repeat', False) and rows:
+        tbl_header = OxmlElement('w:tblHeader')
+        tbl_header.set(qn('w:val'), 'on')
+        rows[0]._tr.get_or_add_trPr().append(tbl_header)
+
+    tbl_borders, border_sizes = formatter._table_borders_element(tbl_style)
+    table._tbl.tblPr.append(tbl_borders)
+    for row_idx, row in enumerate(rows):
+        edges = formatter._three_line_cell_edges(row_idx, grid.height, border_sizes)
+        for cell in row.cells:
+            tc_borders = OxmlElement('w:tcBorders')
+            cell._tc.get_or_add_tcPr().append(tc_borders)
+            for edge_name, size_value in edges:
+                formatter._append_border_edge(tc_borders, edge_name, size_value)
+
+    if column_widths is not None:
+        formatter._apply_fixed_table_layout(table._tbl, column_widths)
+        for tr in table._tbl.tr_lst:
+            formatter._set_row_cell_widths(tr, column_widths)
+    return table._tbl
+
+
+def _table_bodies(style_manager, table, named_styles, has_header=True):
+    """同一表格分别由参照实现与 _build_table_element 写入的文档 body"""
+    bodies = []
+    for per_cell in (True, False):
+        formatter = USTCFormatter(style_manager, named_styles=named_styles)
+        tbl_style = style_manager.get_table_style()
+        column_widths = formatter._plan_table_columns(table.grid, tbl_style) if tbl_style.get('fixed_layout', True) else None
+        if per_cell:
+            _fill_table_per_cell(formatter, table.grid, tbl_style, column_widths, has_header)
+        else:
+            append_block(formatter.doc.element.body, formatter._build_table_element(table.grid, tbl_style, column_widths, has_header))
+        bodies.append(etree.tostring(formatter.doc.element.body, method='c14n'))
+    return bodies
+
+
+def bench_tables(style_manager, rows):
+    """对比逐单元格填写（python-docx 参照实现）与一次构建 w:tbl 的表格耗时（先校验两者 XML 一致）"""
+    check = _sample_table(20)
+    for named_styles in (False, True):
+        for has_header in (True, False):
+            reference, built = _table_bodies(style_manager, check, named_styles, has_header)
+            if reference != built:
+                raise SystemExit(
+                    f'✗ 表格 XML 与逐单元格填写的结果不一致（named_styles={named_styles}, has_header={has_header}）'
+                )
+    print('✓ 表格 XML 与逐单元格填写的结果一致（c14n，含命名样式模式与无表头表格）')
+
+    table = _sample_table(rows)
+    cells = (rows + 1) * TABLE_COLUMNS
+    tbl_style = style_manager.get_table_style()
+
+    def per_cell():
+        formatter = USTCFormatter(style_manager)
+        _fill_table_per_cell(formatter, table.grid, tbl_style, formatter._plan_table_columns(table.grid, tbl_style))
+
+    elapsed = _best_of(per_cell, repeat=3)
+    print(f'逐单元格（参照）: {elapsed * 1000:,.0f} ms（{rows + 1}×{TABLE_COLUMNS}，{cells / elapsed:,.0f} cells/s）')
+    for backend in USTCFormatter.BACKENDS:
+        elapsed = _best_of(lambda: _render_table(style_manager, backend, table), repeat=3)
+        print(f'{backend}: {elapsed * 1000:,.0f} ms（{rows + 1}×{TABLE_COLUMNS}，{cells / elapsed:,.0f} cells/s）')
+
+
+def _formula_lines(count):
+    """公式密集章节：前一半各不相同（追加编号），后一半为重复公式"""
+    unique = count // 2
+    return [
+        f'{SAMPLE_FORMULAS[idx % len(SAMPLE_FORMULAS)]} + {idx}' if idx < unique
+        else SAMPLE_FORMULAS[idx % len(SAMPLE_FORMULAS)]
+        for idx in range(count)
+    ]
+
+
+def bench_formulas(style_manager, count):
+    """对比逐记号 m:r 与合并普通字符后的每个公式元素数，以及有无构建缓存的吞吐量"""
+    formula_style = style_manager.get_formula_style()
+    font_name = formula_style.get('font', 'Times New Roman')
+    font_size = str(int(formula_style.get('size', 10.5) * 2))
+    lines = _formula_lines(count)
+
+    def build_all(builder):
+        return [builder.build(line, font_name, font_size) for line in lines]
+
+    for label, coalesce in (('逐记号', False), ('合并普通字符', True)):
+        elements = sum(sum(1 for _ in o_math.iter()) for o_math in build_all(OmmlBuilder(coalesce=coalesce, cache_size=0)))
+        print(f'{label}: 每个公式 {elements / count:.1f} 个元素')
+
+    for label, cache_size in (('无缓存', 0), ('缓存', OmmlBuilder().cache_size)):
+        elapsed = _best_of(lambda: build_all(OmmlBuilder(cache_size=cache_size)), repeat=3)
+        print(f'{label}: {count / elapsed:,.0f} formulas/s')
+
+
+def bench_hyperlinks(style_manager, count):
+    """对比每次逐元素构建与深拷贝片段模板的引用超链接吞吐量（先校验两者 XML 一致）"""
+    run_style = style_manager.compiled.body.run
+    fonts = (run_style.english_font, run_style.chinese_font, run_style.size)
+    anchors = [f'_Reference_{idx % 200 + 1}' for idx in range(count)]
+
+    def element_by_element():
+        links = []
+        for anchor in anchors:
+            hyperlink = build_hyperlink(reference_hyperlink_rpr(fonts))
+            hyperlink.set(qn('w:anchor'), anchor)
+            hyperlink[0][-1].text = f'[{anchor[11:]}]'
+            links.append(hyperlink)
+        return links
+
+    def templated():
+        fragments = FragmentTemplates()
+        return [fragments.reference_hyperlink(anchor, f'[{anchor[11:]}]', fonts) for anchor in anchors]
+
+    if [etree.tostring(link) for link in element_by_element()[:50]] != [etree.tostring(link) for link in templated()[:50]]:
+        raise SystemExit('✗ 片段模板生成的超链接 XML 不一致')
+    print('✓ 片段模板与逐元素构建的超链接 XML 一致')
+
+    for label, func in (('逐元素构建', element_by_element), ('片段模板', templated)):
+        elapsed = _best_of(func, repeat=3)
+        print(f'{label}: {count / elapsed:,.0f} hyperlinks/s')
+
+
+def _traced_bytes(build):
+    """build() 返回的对象新分配的内存（字节，tracemalloc 统计）"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        allocated = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del result
+    return allocated
+
+
+def bench_nodes(count):
+    """对比 count 个正文段落用 __slots__ 节点与 dict 表示时的内存占用（文本与引用位置两者共用，只统计容器本身）"""
+    texts = [f'{SAMPLE_PARAGRAPH}{idx}' for idx in range(count)]
+    citations = [find_citation_spans(text) for text in texts]
+    node_bytes = _traced_bytes(
+        lambda: [ParagraphNode(text=text, citations=spans) for text, spans in zip(texts, citations)]
+    )
+    dict_bytes = _traced_bytes(
+        lambda: [{'type': 'paragraph', 'text': text, 'citations': spans} for text, spans in zip(texts, citations)]
+    )
+    for label, allocated in (('dict', dict_bytes), ('ParagraphNode', node_bytes)):
+        print(f'{label}: {allocated / 1024 / 1024:.2f} MB（{allocated / count:.0f} B/段落，{count:,} 段落）')
+    print(f'✓ __slots__ 节点内存为 dict 的 {node_bytes / dict_bytes:.0%}')
+
+
+def bench_references(count):
+    """
+    校验参考文献清洗与 GB/T 7714 语料的期望输出一致，并测量吞吐量
+    期望输出由单次遍历实现之前的逐步清洗链（URL、省略号、逐字符标点、空白与连字符各一趟）生成
+    """
+    cases = [
+        json.loads(line)
+        for line in REFERENCE_CORPUS.read_text(encoding='utf-8').splitlines()
+        if line.strip()
+    ]
+    mismatched = [case for case in cases if normalize_reference_text(case['text']) != case['expected']]
+    for case in mismatched[:5]:
+        print(f'✗ {case["text"]!r}\n  期望 {case["expected"]!r}\n  实际 {normalize_reference_text(case["text"])!r}')
+    if mismatched:
+        raise SystemExit(f'✗ {len(mismatched)}/{len(cases)} 条参考文献的清洗结果与期望输出不一致')
+    print(f'✓ {len(cases)} 条参考文献的清洗结果与期望输出一致（{REFERENCE_CORPUS.name}）')
+
+    texts = [cases[idx % len(cases)]['text'] for idx in range(count)]
+    elapsed = _best_of(lambda: [normalize_reference_text(text) for text in texts])
+    print(f'清洗: {elapsed * 1e6 / count:.1f} us/条（{count / elapsed:,.0f} refs/s）')
+
+
+def bench_startup(budget_ms, repeat=5):
+    """在子进程中测量冷启动耗时，仅解析模式超出预算时以非零状态退出"""
+    def command(*args):
+        return lambda: subprocess.run([sys.executable, *args], cwd=BASE_DIR, check=True, stdout=subprocess.DEVNULL)
+
+    cases = (
+        ('解释器启动', command('-c', 'pass')),
+        ('generate.py --parse-only', command('generate.py', '--parse-only')),
+        ('导入完整生成器', command('-c', 'import custom; custom.USTCFormatter')),
+    )
+    timings = {}
+    for label, func in cases:
+        timings[label] = _best_of(func, repeat=repeat) * 1000
+        print(f'{label}: {timings[label]:.0f} ms')
+
+    startup_ms = timings['generate.py --parse-only']
+    if startup_ms > budget_ms:
+        raise SystemExit(f'✗ 冷启动 {startup_ms:.0f} ms 超出预算 {budget_ms} ms')
+    print(f'✓ 冷启动 {startup_ms:.0f} ms，预算 {budget_ms} ms')
+
+
+def _post(url, body, content_type):
+    """POST 请求，返回 (状态码, 响应体)"""
+    request = urllib.request.Request(url, data=body, headers={'Content-Type': content_type}, method='POST')
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.read()
+
+
+def bench_serve(repeat=3):
+    """
+    端到端检查生成服务：标准化文本与解析后的 JSON 内容（content_to_dict 的结果）生成相同的 document.xml，
+    格式错误的 JSON 内容返回 400；并给出两种请求的耗时
+    """
+    normalized_path = BASE_DIR / 'input' / 'normalized.txt'
+    text = normalized_path.read_bytes()
+    parser = USTCContentParser(image_dir=str(BASE_DIR / 'input' / 'images'))
+    parsed = json.dumps(content_to_dict(parser.parse_file(str(normalized_path))), ensure_ascii=False).encode('utf-8')
+
+    server = GenerationServer(BASE_DIR, port=0, workers=1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        server.warm_up()
+        url = f'{server.address}/generate'
+        requests = (
+            ('标准化文本', text, 'text/plain; charset=utf-8'),
+            ('解析后的 JSON', parsed, 'application/json'),
+        )
+        documents = []
+        for label, body, content_type in requests:
+            status, data = _post(url, body, content_type)
+            if status != 200:
+                raise SystemExit(f'✗ {label}请求失败: {status} {data[:200].decode("utf-8", "replace")}')
+            documents.append(zipfile.ZipFile(io.BytesIO(data)).read('word/document.xml'))
+        if documents[0] != documents[1]:
+            raise SystemExit('✗ 标准化文本与解析后的 JSON 生成的 document.xml 不一致')
+        print('✓ 标准化文本与解析后的 JSON 生成的 document.xml 一致')
+
+        malformed = json.dumps({'chapters': [{'content': [{'type': 'table', 'rows': [[1, 2]]}]}]}).encode('utf-8')
+        status, _ = _post(url, malformed, 'application/json')
+        if status != 400:
+            raise SystemExit(f'✗ 格式错误的 JSON 内容应返回 400，实际为 {status}')
+        print('✓ 格式错误的 JSON 内容返回 400')
+
+        for label, body, content_type in requests:
+            elapsed = _best_of(lambda: _post(url, body, content_type), repeat=repeat)
+            print(f'{label}: {elapsed * 1000:,.0f} ms/请求')
+    finally:
+        server.shutdown()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='e5 渲染微基准')
+    arg_parser.add_argument('target', choices=['runs', 'paragraphs', 'compiled-styles', 'tables', 'formulas', 'hyperlinks', 'references', 'nodes', 'startup', 'serve'], help='基准项目')
+    arg_parser.add_argument('--count', type=int, default=None, help='每轮写入的数量（默认 5000，nodes 为 50000）')
+    arg_parser.add_argument('--rows', type=int, default=TABLE_ROWS, help='tables 的数据行数')
+    arg_parser.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS, help='startup 的冷启动预算（毫秒）')
+    args = arg_parser.parse_args()
+    if args.count is None:
+        args.count = NODE_PARAGRAPHS if args.target == 'nodes' else 5000
+    if args.target == 'startup':
+        bench_startup(args.budget_ms)
+        return
+    if args.target == 'serve':
+        bench_serve()
+        return
+    if args.target == 'references':
+        bench_references(args.count)
+        return
+    if args.target == 'nodes':
+        bench_nodes(args.count)
+        return
+
+    style_manager = USTCStyleManager(str(BASE_DIR / 'config' / 'thesis_format.json'))
+    if args.target == 'runs':
+        bench_runs(style_manager, args.count)
+    elif args.target == 'paragraphs':
+        bench_paragraphs(style_manager, args.count)
+    elif args.target == 'compiled-styles':
+        bench_compiled_styles(style_manager, args.count)
+    elif args.target == 'tables':
+        bench_tables(style_manager, args.rows)
+    elif args.target == 'formulas':
+        bench_formulas(style_manager, args.count)
+    elif args.target == 'hyperlinks':
+        bench_hyperlinks(style_manager, args.count)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,29 @@
 """USTC (e5) custom formatter package."""
-from .parser import USTCContentParser
-from .styles import USTCStyleManager
-from .formatter import USTCFormatter
-
-__all__ = [
-    'USTCContentParser',
-    'USTCStyleManager',
-    'USTCFormatter',
-]
+import importlib
+
+# 公开名称 -> 所在子模块；首次访问时才导入，只解析文本时不会加载 python-docx
+_EXPORTS = {
+    'USTCContentParser': '.parser',
+    'USTCStyleManager': '.styles',
+    'USTCFormatter': '.formatter',
+    'USTCIncrementalParser': '.incremental',
+    'parse_batch': '.batch',
+    'StyleConfigRegistry': '.registry',
+    'GenerationServer': '.server',
+    'RenderCache': '.render_cache',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
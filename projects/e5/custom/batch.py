@@ -0,0 +1,150 @@
+"""
+批量解析 - 使用进程池并行解析多份 normalized.txt
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows 无 resource 模块
+    resource = None
+
+from .parser import USTCContentParser
+
+
+WORKER_CRASHED = 'BrokenProcessPool: worker 进程异常退出（如超出内存上限被终止）'
+
+# worker 内的各组开始标记（共享内存，由 _init_batch_worker 设置）
+_chunk_started = None
+
+
+class BatchParseResult:
+    """单份文档的解析结果：成功时 content 有值，失败时 error 为错误描述"""
+    __slots__ = ('path', 'image_dir', 'content', 'error')
+
+    def __init__(self, path, image_dir, content=None, error=None):
+        self.path = path
+        self.image_dir = image_dir
+        self.content = content
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        status = 'ok' if self.ok else f'error={self.error!r}'
+        return f'BatchParseResult({self.path!r}, {status})'
+
+
+def _normalize_job(job):
+    """统一为 (文本路径, 图片目录)；未给出图片目录时使用同目录下的 images"""
+    if isinstance(job, (str, os.PathLike)):
+        path = os.fspath(job)
+        return path, os.path.join(os.path.dirname(path), 'images')
+    path, image_dir = job
+    return os.fspath(path), os.fspath(image_dir)
+
+
+def _limit_worker_memory(max_memory_mb):
+    """限制 worker 的地址空间大小"""
+    if resource is None or not max_memory_mb:
+        return
+    limit = int(max_memory_mb * 1024 * 1024)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _init_batch_worker(max_memory_mb, chunk_started):
+    """进程池初始化：限制内存并记下各组的开始标记"""
+    global _chunk_started
+    _chunk_started = chunk_started
+    _limit_worker_memory(max_memory_mb)
+
+
+def _parse_chunk(chunk_index, chunk):
+    """在 worker 中解析一组文档，单份失败不影响同组其他文档"""
+    # 先标记开始：worker 中途退出时主进程据此判断是哪一组
+    _chunk_started[chunk_index] = 1
+    results = []
+    for path, image_dir in chunk:
+        try:
+            content = USTCContentParser(image_dir=image_dir).parse_file(path)
+            results.append(BatchParseResult(path, image_dir, content=content))
+        except MemoryError:
+            results.append(BatchParseResult(path, image_dir, error='MemoryError: 超出 worker 内存上限'))
+        except Exception as exc:
+            results.append(BatchParseResult(path, image_dir, error=f'{type(exc).__name__}: {exc}'))
+    return results
+
+
+def _failed_chunk(chunk, error):
+    return [BatchParseResult(path, image_dir, error=error) for path, image_dir in chunk]
+
+
+def _run_chunks(chunks, indices, results, chunk_started, max_workers, max_memory_mb):
+    """
+    在一个新的进程池中解析 indices 对应的各组，结果写入 results
+    :return: (进程池损坏时已开始但未完成的组, 尚未开始的组)；进程池未损坏时均为空
+    """
+    for idx in indices:
+        chunk_started[idx] = 0
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_batch_worker,
+        initargs=(max_memory_mb, chunk_started)
+    ) as executor:
+        futures = [(idx, executor.submit(_parse_chunk, idx, chunks[idx])) for idx in indices]
+        for idx, future in futures:
+            try:
+                results[idx] = future.result()
+            except BrokenProcessPool:
+                # 进程池损坏后所有未完成的任务都会抛出此异常，稍后按开始标记区分
+                continue
+            except Exception as exc:
+                results[idx] = _failed_chunk(chunks[idx], f'{type(exc).__name__}: {exc}')
+    unfinished = [idx for idx in indices if results[idx] is None]
+    return (
+        [idx for idx in unfinished if chunk_started[idx]],
+        [idx for idx in unfinished if not chunk_started[idx]]
+    )
+
+
+def parse_batch(jobs, max_workers=None, chunksize=1, max_memory_mb=None):
+    """
+    并行解析多份文档
+    worker 异常退出（如超出内存上限被系统终止）会使整个进程池损坏：此时只有当时正在解析的组记为失败
+    （同时有多组在解析时逐组单独重试以找出导致退出的组），尚未开始的组在新的进程池中继续解析
+    :param jobs: 文本路径，或 (文本路径, 图片目录) 二元组的序列
+    :param max_workers: 进程数，默认为 CPU 核数
+    :param chunksize: 每次派发给 worker 的文档数
+    :param max_memory_mb: 每个 worker 的内存上限（MB），None 表示不限制
+    :return: 与输入顺序一致的 BatchParseResult 列表
+    """
+    jobs = [_normalize_job(job) for job in jobs]
+    if not jobs:
+        return []
+    chunksize = max(1, int(chunksize))
+    chunks = [jobs[i:i + chunksize] for i in range(0, len(jobs), chunksize)]
+
+    results = [None] * len(chunks)
+    chunk_started = multiprocessing.get_context().Array('b', len(chunks), lock=False)
+    pending = list(range(len(chunks)))
+    while pending:
+        suspects, unstarted = _run_chunks(chunks, pending, results, chunk_started, max_workers, max_memory_mb)
+        if not suspects and len(unstarted) == len(pending):
+            # 没有任何一组开始解析（如 worker 初始化即退出），不再重试
+            for idx in unstarted:
+                results[idx] = _failed_chunk(chunks[idx], WORKER_CRASHED)
+            break
+        if len(suspects) == 1:
+            results[suspects[0]] = _failed_chunk(chunks[suspects[0]], WORKER_CRASHED)
+        else:
+            for idx in suspects:
+                # 单独重新解析，仍使 worker 退出的即为失败的组
+                _run_chunks(chunks, [idx], results, chunk_started, 1, max_memory_mb)
+                if results[idx] is None:
+                    results[idx] = _failed_chunk(chunks[idx], WORKER_CRASHED)
+        pending = unstarted
+    return [result for chunk_results in results for result in chunk_results]
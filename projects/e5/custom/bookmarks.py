@@ -0,0 +1,138 @@
+"""
+书签注册表 - 统一生成书签名称、按创建顺序分配 ID，并登记所有指向书签的跳转（超链接 anchor 与 PAGEREF 字段），
+生成结束时一次检查重复书签与无目标的跳转
+"""
+
+
+CHAPTER_BOOKMARK_PREFIX = '_Chapter_'
+HEADING_BOOKMARK_PREFIX = '_Heading_'
+REFERENCE_BOOKMARK_PREFIX = '_Reference_'
+CITATION_BOOKMARK_PREFIX = '_Citation_'
+SPECIAL_SECTION_BOOKMARKS = {
+    'references': '_Section_References',
+    'acknowledgements': '_Section_Acknowledgements',
+    'appendix': '_Section_Appendix'
+}
+
+ANCHOR = 'anchor'
+PAGEREF = 'PAGEREF'
+
+
+def chapter_bookmark(chapter_number):
+    """一级标题书签，如 _Chapter_2"""
+    return f'{CHAPTER_BOOKMARK_PREFIX}{chapter_number}'
+
+
+def heading_bookmark(number):
+    """二、三级标题书签，如 2.1.3 -> _Heading_2_1_3"""
+    return f'{HEADING_BOOKMARK_PREFIX}{str(number).replace(".", "_")}'
+
+
+def reference_bookmark(index):
+    """参考文献条目书签（引用跳转的目标），编号从 1 开始"""
+    return f'{REFERENCE_BOOKMARK_PREFIX}{index}'
+
+
+def citation_bookmark(citation_number):
+    """正文中某条文献首次被引用位置的书签（参考文献条目回跳的目标）"""
+    return f'{CITATION_BOOKMARK_PREFIX}{citation_number}'
+
+
+def citation_number_of(bookmark_name):
+    """由 _Citation_N 书签名取出引用编号，其他书签返回 None"""
+    if bookmark_name.startswith(CITATION_BOOKMARK_PREFIX):
+        return int(bookmark_name[len(CITATION_BOOKMARK_PREFIX):])
+    return None
+
+
+class BookmarkIssue:
+    """校验发现的问题：kind 为 'duplicate'（同名书签重复）或 'dangling'（跳转目标不存在）"""
+    __slots__ = ('kind', 'name', 'count', 'sources')
+
+    def __init__(self, kind, name, count, sources=()):
+        self.kind = kind
+        self.name = name
+        self.count = count
+        self.sources = tuple(sources)
+
+    def __repr__(self):
+        return f'BookmarkIssue({self.kind!r}, {self.name!r}, count={self.count})'
+
+
+class BookmarkRegistry:
+    """
+    单篇文档的书签注册表
+    ID 从 1 开始按 allocate 的调用顺序分配，相同输入总是得到相同编号；
+    名称 -> ID、ID -> (名称, 段落) 均为字典查找
+    """
+
+    def __init__(self):
+        self.last_id = 0
+        self._ids = {}          # 名称 -> 首个 ID
+        self._entries = {}      # ID -> [名称, 段落元素]
+        self._duplicates = {}   # 名称 -> 重复次数
+        self._references = {}   # (名称, 类型) -> 次数
+
+    def __contains__(self, name):
+        return name in self._ids
+
+    def __len__(self):
+        return len(self._entries)
+
+    def allocate(self, name, paragraph=None):
+        """
+        为书签分配下一个 ID
+        :param name: 书签名称
+        :param paragraph: 书签所在的 w:p 元素（可选）
+        :return: 新 ID
+        """
+        self.last_id += 1
+        if name in self._ids:
+            self._duplicates[name] = self._duplicates.get(name, 0) + 1
+        else:
+            self._ids[name] = self.last_id
+        self._entries[self.last_id] = [name, paragraph]
+        return self.last_id
+
+    def add_reference(self, name, kind=ANCHOR):
+        """登记一次指向书签的跳转（超链接 anchor 或 PAGEREF 字段）"""
+        key = (name, kind)
+        self._references[key] = self._references.get(key, 0) + 1
+
+    def id_of(self, name):
+        """书签名称对应的 ID，不存在时为 None"""
+        return self._ids.get(name)
+
+    def name_of(self, bookmark_id):
+        entry = self._entries.get(bookmark_id)
+        return entry[0] if entry else None
+
+    def paragraph_of(self, name):
+        """书签所在的段落元素；未记录或已随流式写出释放时为 None"""
+        bookmark_id = self._ids.get(name)
+        return self._entries[bookmark_id][1] if bookmark_id is not None else None
+
+    def release_paragraphs(self):
+        """释放对段落元素的引用（流式模式写出章节后调用，避免已写出的段落留在内存中）"""
+        for entry in self._entries.values():
+            entry[1] = None
+
+    def validate(self):
+        """
+        一次检查全部书签与跳转
+        :return: BookmarkIssue 列表，重复书签在前、无目标跳转在后，各自按名称排序
+        """
+        issues = [
+            BookmarkIssue('duplicate', name, count + 1)
+            for name, count in sorted(self._duplicates.items())
+        ]
+        dangling = {}
+        for (name, kind), count in self._references.items():
+            if name not in self._ids:
+                total, kinds = dangling.get(name, (0, set()))
+                kinds.add(kind)
+                dangling[name] = (total + count, kinds)
+        for name in sorted(dangling):
+            count, kinds = dangling[name]
+            issues.append(BookmarkIssue('dangling', name, count, sorted(kinds)))
+        return issues
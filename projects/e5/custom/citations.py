@@ -0,0 +1,75 @@
+"""
+引用索引 - 解析阶段预先计算正文中的参考文献引用位置
+"""
+import re
+
+
+CITATION_PATTERN = re.compile(r'\[(\d+)\]')
+
+
+def find_citation_spans(text):
+    """
+    查找段落中的引用
+    :param text: 段落文本
+    :return: ((start, end, number), ...)，无引用时为空元组
+    """
+    if '[' not in text:
+        return ()
+    return tuple(
+        (match.start(), match.end(), int(match.group(1)))
+        for match in CITATION_PATTERN.finditer(text)
+    )
+
+
+class CitationIndex:
+    """
+    文档级引用索引
+    first_occurrence: 引用编号 -> (章节序号, 元素序号, 段内起始位置)
+    missing: 没有对应参考文献的引用编号
+    uncited: 从未被引用的参考文献编号
+    """
+    __slots__ = ('first_occurrence', 'missing', 'uncited')
+
+    def __init__(self, first_occurrence, missing, uncited):
+        self.first_occurrence = first_occurrence
+        self.missing = missing
+        self.uncited = uncited
+
+    @classmethod
+    def build(cls, chapters, reference_count):
+        """
+        一次线性扫描所有段落的引用位置
+        :param chapters: 章节列表（段落需带 citations 字段）
+        :param reference_count: 参考文献条目数，引用编号按 1..N 对应
+        """
+        first_occurrence = {}
+        for chapter_pos, chapter in enumerate(chapters):
+            for item_pos, item in enumerate(chapter.get('content', [])):
+                for start, _, number in item.get('citations') or ():
+                    if number not in first_occurrence:
+                        first_occurrence[number] = (chapter_pos, item_pos, start)
+
+        missing = sorted(n for n in first_occurrence if not 1 <= n <= reference_count)
+        uncited = [n for n in range(1, reference_count + 1) if n not in first_occurrence]
+        return cls(first_occurrence, missing, uncited)
+
+    def to_dict(self):
+        """转换为普通 dict"""
+        return {
+            'first_occurrence': dict(self.first_occurrence),
+            'missing': list(self.missing),
+            'uncited': list(self.uncited)
+        }
+
+
+def citation_issues(citation_index):
+    """
+    取出引用问题 (missing, uncited)
+    :param citation_index: CitationIndex 或其 to_dict() 结果（如经过 JSON 往返的内容）；
+                           None 或无法识别时返回两个空元组
+    """
+    if isinstance(citation_index, CitationIndex):
+        return citation_index.missing, citation_index.uncited
+    if isinstance(citation_index, dict):
+        return citation_index.get('missing') or (), citation_index.get('uncited') or ()
+    return (), ()
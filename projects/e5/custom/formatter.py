@@ -2,50 +2,114 @@
 文档生成器 - 将解析后的内容和样式结合生成 docx 文档
 """
 from docx import Document
-from docx.shared import Pt, Cm, RGBColor, Inches
+from docx.shared import Pt, Cm, RGBColor, Inches, Twips
 from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_LINE_SPACING
 from docx.enum.section import WD_SECTION_START
-from docx.oxml.ns import qn
+from docx.oxml.ns import nsmap, qn
 from docx.oxml import OxmlElement, parse_xml
+from docx.oxml.shape import CT_Inline
+from docx.oxml.table import CT_Tbl
 from docx.table import _Cell
+from docx.text.paragraph import Paragraph
+from docx.text.run import Run
+from copy import deepcopy
 import os
 import re
 
-
-CITATION_PATTERN = re.compile(r'\[(\d+)\]')
-WORD_JOINER = '\u2060'
-SPECIAL_SECTION_BOOKMARKS = {
-    'references': '_Section_References',
-    'acknowledgements': '_Section_Acknowledgements',
-    'appendix': '_Section_Appendix'
-}
+from lxml import etree
+
+from .bookmarks import (
+    PAGEREF, SPECIAL_SECTION_BOOKMARKS, BookmarkRegistry, chapter_bookmark, citation_bookmark,
+    citation_number_of, heading_bookmark, reference_bookmark
+)
+from .citations import citation_issues, find_citation_spans
+from .fragments import FragmentTemplates
+from .layout import DEFAULT_LATIN_ADVANCE, LATIN_ADVANCES, PageEstimator, plan_column_widths
+from .nodes import ContentNode, TableGrid
+from .numbering import CHAPTER, SEQ, SEQUENCE, compile_numbering_template, seq_field_name, seq_instruction
+from .omml import OmmlBuilder
+from .parallel import render_chapter_fragments
+from . import references
+from .references import WORD_JOINER, normalize_reference_text
+from .render_cache import source_fingerprint
+from .streaming import DocumentSpool
+from .styles import TOC_ENTRY_SIZE, TOC_LEVEL_INDENTS, extract_font_pair
+from .xml_builder import append_block, append_text, make_run, make_w_element
+
+
+REFERENCE_CACHE_NAMESPACE = 'reference'
+# 域指令之后、separate 标记之后的第一个 w:t，即域的显示结果（生成器把整个域写在同一个 w:r 中）
+_FIELD_RESULT_TEXT = etree.XPath(
+    'following-sibling::w:fldChar[@w:fldCharType="separate"][1]/following-sibling::w:t[1]',
+    namespaces={'w': nsmap['w']}
+)
 
 
 class USTCFormatter:
     """论文文档生成器"""
 
-    def __init__(self, style_manager):
+    BACKENDS = ('docx', 'lxml')
+    _reference_version = None
+
+    def __init__(self, style_manager, named_styles=False, backend='docx', chapter_workers=0, render_cache=None):
         """
         初始化生成器
         :param style_manager: 样式管理器实例
+        :param named_styles: 为 True 时在 styles.xml 中注册命名样式，段落通过 pStyle 引用，
+                             run 只保留与样式不同的直接格式
+        :param backend: 正文段落的渲染方式，'docx' 使用 python-docx 对象，
+                        'lxml' 直接构建 w:p/w:r 元素（生成的 XML 相同）
+        :param chapter_workers: 大于 1 时各章在多个 worker 进程中并行渲染后按顺序合并（输出相同）
+        :param render_cache: 磁盘渲染缓存（RenderCache），跨文档、跨进程复用清洗后的参考文献与公式 OMML；
+                             None 表示不使用
         """
+        if backend not in self.BACKENDS:
+            raise ValueError(f'未知的渲染后端: {backend}（可选: {", ".join(self.BACKENDS)}）')
         self.style_manager = style_manager
+        self.named_styles = named_styles
+        self.backend = backend
+        self.chapter_workers = chapter_workers
+        self.render_cache = render_cache
+        # 公式 OMML 构建器与超链接/域代码片段模板（缓存跨多次生成保留）
+        self.omml = OmmlBuilder(store=render_cache)
+        self.fragments = FragmentTemplates()
+        self._content_handlers = {
+            'paragraph': lambda item: self._add_paragraph(item['text'], item.get('citations')),
+            'heading2': lambda item: self._add_heading2(item['number'], item['text']),
+            'heading3': lambda item: self._add_heading3(item['number'], item['text']),
+            'figure': self._add_figure,
+            'table': self._add_table,
+            'formula': self._add_formula,
+        }
         self._reset_document()
 
     def _reset_document(self):
-        """重新创建文档，确保每次生成都是干净的"""
-        self.doc = Document()
-        self.bookmark_id = 0  # 书签ID计数器
+        """重新创建文档，确保每次生成都是干净的（从样式管理器缓存的底稿复制）"""
+        self.doc, self.style_ids = self.style_manager.base_document(
+            self.named_styles, self._build_base_document
+        )
+        self.bookmarks = BookmarkRegistry()
+        self.shape_id = 0  # 图片 wp:docPr ID 计数器
+        self.image_sources = {}  # 图片关系 ID -> 首次插入时的源文件路径
         self.reference_targets = {}
         self.references_data = []
         self.reference_backlinks = {}
+        self.page_estimates = {}  # 书签名称 -> 估算页码，用作目录 PAGEREF 字段的显示结果
+        self.seq_counters = {}  # SEQ 域名称 -> 已编号个数，用作题注与公式编号的显示结果
+        self._spool = None
+
+    def _build_base_document(self):
+        """构建底稿：页面设置、Normal 样式与数学默认字体，命名样式模式下另注册命名样式"""
+        self.doc = Document()
         self._setup_document()
+        return self.doc, self.style_ids
 
     def _setup_document(self):
         """设置文档基本属性"""
         for section in self.doc.sections:
             self._apply_section_layout(section)
         self._apply_normal_style_defaults()
+        self.style_ids = self.style_manager.register_named_styles(self.doc) if self.named_styles else {}
 
     def _apply_section_layout(self, section):
         """根据配置设置节的页面属性"""
@@ -153,9 +217,27 @@ class USTCFormatter:
         self.references_data = references or []
         self.reference_targets = {}
         for idx in range(len(self.references_data)):
-            bookmark_name = f'_Reference_{idx + 1}'
+            bookmark_name = reference_bookmark(idx + 1)
             self.reference_targets[idx + 1] = {'bookmark': bookmark_name}
 
+    def _report_citation_issues(self, citation_index):
+        """
+        输出正文中没有对应参考文献的引用（接受 CitationIndex 或其 dict 形式，缺失时不输出）
+        未被引用的参考文献不在生成时逐条列出（常见于未标注引用的稿件），由 generate.py --parse-only 报告
+        """
+        missing, _ = citation_issues(citation_index)
+        if missing:
+            numbers = ', '.join(str(n) for n in missing)
+            print(f"⚠ 以下引用没有对应的参考文献: {numbers}")
+
+    def _report_bookmark_issues(self):
+        """输出书签校验结果：同名书签重复、超链接或 PAGEREF 指向不存在的书签"""
+        for issue in self.bookmarks.validate():
+            if issue.kind == 'duplicate':
+                print(f"⚠ 书签重复: {issue.name}（{issue.count} 处）")
+            else:
+                print(f"⚠ 跳转目标书签不存在: {issue.name}（{'/'.join(issue.sources)}，{issue.count} 处）")
+
     def _apply_page_number_settings(self, section, config):
         """根据配置为节设置页码格式"""
         if not config:
@@ -217,24 +299,23 @@ class USTCFormatter:
 
     def _add_field_code(self, run, instruction):
         """在 run 中插入字段指令"""
-        fldChar1 = OxmlElement('w:fldChar')
-        fldChar1.set(qn('w:fldCharType'), 'begin')
-
-        instrText = OxmlElement('w:instrText')
-        instrText.set(qn('xml:space'), 'preserve')
-        instrText.text = instruction
-
-        fldChar2 = OxmlElement('w:fldChar')
-        fldChar2.set(qn('w:fldCharType'), 'end')
+        self.fragments.append_field(run._r, instruction)
 
-        run._r.append(fldChar1)
-        run._r.append(instrText)
-        run._r.append(fldChar2)
+    def _next_shape_id(self):
+        """获取下一个图片 wp:docPr ID（自行计数，不依赖当前内存中的文档内容）"""
+        self.shape_id += 1
+        return self.shape_id
 
-    def _get_next_bookmark_id(self):
-        """获取下一个书签ID"""
-        self.bookmark_id += 1
-        return self.bookmark_id
+    def _add_picture(self, run, image_path, width):
+        """
+        在 run 中插入图片
+        与 run.add_picture 相同，但 docPr ID 取自计数器：python-docx 每次扫描整篇文档求最大 ID，
+        流式模式下已写出的章节不在树中，会得到重复 ID
+        """
+        rId, image = self.doc.part.get_or_add_image(image_path)
+        self.image_sources.setdefault(rId, image_path)
+        cx, cy = image.scaled_dimensions(width, None)
+        run._r.add_drawing(CT_Inline.new_pic_inline(self._next_shape_id(), rId, image.filename, cx, cy))
 
     def _add_bookmark_to_paragraph(self, paragraph, bookmark_name):
         """
@@ -243,7 +324,7 @@ class USTCFormatter:
         :param bookmark_name: 书签名称
         """
         # 参考: best_practices/目录系统_reference.py 第96-137行
-        bookmark_id = self._get_next_bookmark_id()
+        bookmark_id = self.bookmarks.allocate(bookmark_name, paragraph._element)
 
         # 创建书签开始标记
         bookmark_start = OxmlElement('w:bookmarkStart')
@@ -312,55 +393,17 @@ class USTCFormatter:
 
     def _create_standard_hyperlink(self, paragraph, text, bookmark_name, font_size=10.5):
         """
-        创建符合Word标准的内部超链接
+        创建符合Word标准的内部超链接（Hyperlink 字符样式、黑色文本，由片段模板生成）
         :param paragraph: 段落对象
         :param text: 超链接文本
         :param bookmark_name: 目标书签名称
         :param font_size: 字体大小（磅）
         """
         # 参考: best_practices/目录系统_reference.py 第140-200行
-        # 创建超链接元素
-        hyperlink = OxmlElement('w:hyperlink')
-        hyperlink.set(qn('w:anchor'), bookmark_name)
-        hyperlink.set(qn('w:history'), '1')
-
-        # 创建运行元素
-        run_element = OxmlElement('w:r')
-
-        # 创建运行属性
-        run_props = OxmlElement('w:rPr')
-
-        # 关键：设置超链接样式
-        style_element = OxmlElement('w:rStyle')
-        style_element.set(qn('w:val'), 'Hyperlink')
-        run_props.append(style_element)
-
-        # 设置字体（中英文分离处理）
-        fonts = OxmlElement('w:rFonts')
-        fonts.set(qn('w:ascii'), 'Times New Roman')
-        fonts.set(qn('w:eastAsia'), '宋体')
-        fonts.set(qn('w:hAnsi'), 'Times New Roman')
-        run_props.append(fonts)
-
-        # 设置字体大小（磅转为半磅）
-        size_element = OxmlElement('w:sz')
-        size_element.set(qn('w:val'), str(int(font_size * 2)))
-        run_props.append(size_element)
-
-        # 设置颜色（黑色文本）
-        color = OxmlElement('w:color')
-        color.set(qn('w:val'), '000000')
-        run_props.append(color)
-
-        run_element.append(run_props)
-
-        # 添加文本内容
-        text_element = OxmlElement('w:t')
-        text_element.text = text
-        run_element.append(text_element)
-
-        hyperlink.append(run_element)
-        paragraph._element.append(hyperlink)
+        self.bookmarks.add_reference(bookmark_name)
+        paragraph._element.append(self.fragments.standard_hyperlink(
+            bookmark_name, text, None if self.named_styles else font_size
+        ))
 
     def _add_pageref_field(self, run, bookmark_name):
         """
@@ -369,23 +412,14 @@ class USTCFormatter:
         :param bookmark_name: 书签名称
         """
         # 参考: best_practices/目录系统_reference.py 第203-240行
-        # 创建字段开始标记
-        fldChar1 = OxmlElement('w:fldChar')
-        fldChar1.set(qn('w:fldCharType'), 'begin')
-
-        # 创建指令文本
-        instrText = OxmlElement('w:instrText')
-        instrText.set(qn('xml:space'), 'preserve')
-        instrText.text = f'PAGEREF {bookmark_name} \\h'  # \h 表示超链接格式
-
-        # 创建字段结束标记
-        fldChar2 = OxmlElement('w:fldChar')
-        fldChar2.set(qn('w:fldCharType'), 'end')
-
-        # 将字段元素添加到运行中
-        run._r.append(fldChar1)
-        run._r.append(instrText)
-        run._r.append(fldChar2)
+        self.bookmarks.add_reference(bookmark_name, PAGEREF)
+        # 有估算页码时写入 separate 与显示结果，未更新域也能看到页码
+        page = self.page_estimates.get(bookmark_name)
+        self.fragments.append_field(
+            run._r,
+            f'PAGEREF {bookmark_name} \\h',  # \h 表示超链接格式
+            str(page) if page is not None else None
+        )
 
     def _add_tab_stop(self, paragraph, position_cm=16.0, alignment='right', leader=None):
         """
@@ -409,18 +443,30 @@ class USTCFormatter:
         tab.set(qn('w:pos'), str(int(position_cm * 567)))
         tabs.append(tab)
 
-    def generate(self, content, output_path, include_toc=True):
+    def generate(self, content, output_path, include_toc=True, streaming=False):
         """
         生成完整的论文文档
         :param content: 解析后的内容结构
         :param output_path: 输出文件路径
         :param include_toc: 是否包含目录
+        :param streaming: 为 True 时每章生成后即序列化到临时文件并从内存中移除，
+                          适合上千页的合集，输出与非流式模式相同
         """
-        import os
-        import glob
-
         # 每次生成都重新初始化文档
         self._reset_document()
+        if streaming:
+            self._spool = DocumentSpool(self.doc, spool_dir=os.path.dirname(output_path) or None)
+        try:
+            self._generate_document(content, output_path, include_toc)
+        finally:
+            # 生成失败时也释放临时文件，避免残留的缓冲内容被下一次生成沿用
+            if self._spool is not None:
+                self._spool.close()
+                self._spool = None
+
+    def _generate_document(self, content, output_path, include_toc):
+        """生成各部分并保存（参数同 generate）"""
+        import glob
 
         # 删除输出目录中的所有旧docx文件
         output_dir = os.path.dirname(output_path)
@@ -450,6 +496,7 @@ class USTCFormatter:
         else:
             self.reference_targets = {}
             self.references_data = []
+        self._report_citation_issues(content.get('citations'))
 
         section_number_map = {}
         current_section_number = self._get_last_chapter_number(chapters)
@@ -514,7 +561,9 @@ class USTCFormatter:
                     toc_section,
                     self.style_manager.get_page_number_config('toc')
                 )
+            self.page_estimates = PageEstimator(self.style_manager).estimate(content)
             self._generate_toc(chapters, special_sections_for_toc)
+            self._flush_spool()
             body_section = self._add_configured_section()
             self._apply_page_number_settings(
                 body_section,
@@ -544,6 +593,7 @@ class USTCFormatter:
             ) or '参考文献'
             self._create_special_section(references_header, None)
             self._generate_references(references, section_number_map.get('references'))
+            self._flush_spool()
 
         if has_ack:
             ack_header = self._format_section_title(
@@ -561,8 +611,14 @@ class USTCFormatter:
             self._create_special_section(appendix_header, None)
             self._generate_appendix(appendix_entries, section_number_map.get('appendix'))
 
+        self._report_bookmark_issues()
+
         # 保存文档
-        self.doc.save(output_path)
+        if self._spool is not None:
+            self._spool.save(output_path)
+            print(f"✓ 流式写出 {self._spool.blocks_flushed} 个正文块")
+        else:
+            self.doc.save(output_path)
         print(f"新文档已生成: {output_path}")
 
     def _generate_abstract(self, abstract_data):
@@ -583,21 +639,7 @@ class USTCFormatter:
 
         self.doc.add_paragraph()
 
-        content_style = self.style_manager.get_abstract_content_style()
-        content_cn, content_en = self._extract_font_pair(content_style, fallback_cn, fallback_en)
-        for para_text in abstract_data.get('content', []):
-            if not para_text:
-                continue
-            para = self.doc.add_paragraph()
-            run = para.add_run()
-            self.style_manager.set_mixed_font(
-                run,
-                para_text,
-                chinese_font=content_cn,
-                english_font=content_en,
-                size=content_style.get('size', 12)
-            )
-            self.style_manager.apply_paragraph_style(para, content_style)
+        self._add_styled_paragraphs(abstract_data.get('content', []), self.style_manager.compiled.abstract, 'abstract')
 
         self.doc.add_paragraph()
 
@@ -663,21 +705,7 @@ class USTCFormatter:
 
         self.doc.add_paragraph()
 
-        content_cfg = abstract_en_cfg.get('content', {})
-        content_cn, content_en = self._extract_font_pair(content_cfg, fallback_cn, fallback_en)
-        for para_text in abstract_data.get('content', []):
-            if not para_text:
-                continue
-            para = self.doc.add_paragraph()
-            run = para.add_run()
-            self.style_manager.set_mixed_font(
-                run,
-                para_text,
-                chinese_font=content_cn,
-                english_font=content_en,
-                size=content_cfg.get('size', 12)
-            )
-            self.style_manager.apply_paragraph_style(para, content_cfg)
+        self._add_styled_paragraphs(abstract_data.get('content', []), self.style_manager.compiled.abstract_en, 'abstract_en')
 
         self.doc.add_paragraph()
 
@@ -754,74 +782,31 @@ class USTCFormatter:
         for chapter in chapters:
             chapter_num = chapter.get('number', 1)
             chapter_title = chapter.get('title', '')
-            bookmark_name = f'_Chapter_{chapter_num}'
+            bookmark_name = chapter_bookmark(chapter_num)
 
             # 创建一级目录条目（顶格，五号字体）
-            toc_p = self.doc.add_paragraph()
-
-            # 添加右对齐制表位（带点线前导符）
-            self._add_tab_stop(toc_p, position_cm=16.0, alignment='right', leader='dot')
+            toc_p = self._add_toc_entry_paragraph(1)
 
             # 添加超链接文本
             entry_text = f"第{chapter_num}章 {chapter_title}"
             self._create_standard_hyperlink(toc_p, entry_text, bookmark_name)
-
-            # 添加制表符（会自动显示点线前导符）
-            tab_run = toc_p.add_run('\t')
-
-            # 添加自动页码字段
-            page_run = toc_p.add_run()
-            page_run.font.name = 'Times New Roman'
-            page_run.font.size = Pt(10.5)  # 五号
-            self._add_pageref_field(page_run, bookmark_name)
+            self._add_toc_page_number(toc_p, bookmark_name)
 
             # 添加二三级目录
             for item in chapter.get('content', []):
                 if item['type'] == 'heading2':
-                    h2_bookmark = f'_Heading_{item["number"].replace(".", "_")}'
-                    h2_p = self.doc.add_paragraph()
-
-                    # 添加缩进（缩进1字符 = 10.5pt，五号字大小）
-                    h2_p.paragraph_format.left_indent = Pt(10.5)
-
-                    # 添加右对齐制表位（带点线前导符）
-                    self._add_tab_stop(h2_p, position_cm=16.0, alignment='right', leader='dot')
-
-                    # 超链接
+                    h2_bookmark = heading_bookmark(item['number'])
+                    h2_p = self._add_toc_entry_paragraph(2)
                     h2_text = f'{item["number"]} {item["text"]}'
                     self._create_standard_hyperlink(h2_p, h2_text, h2_bookmark)
-
-                    # 添加制表符
-                    h2_tab_run = h2_p.add_run('\t')
-
-                    # 页码
-                    h2_page_run = h2_p.add_run()
-                    h2_page_run.font.name = 'Times New Roman'
-                    h2_page_run.font.size = Pt(10.5)  # 五号
-                    self._add_pageref_field(h2_page_run, h2_bookmark)
+                    self._add_toc_page_number(h2_p, h2_bookmark)
 
                 elif item['type'] == 'heading3':
-                    h3_bookmark = f'_Heading_{item["number"].replace(".", "_")}'
-                    h3_p = self.doc.add_paragraph()
-
-                    # 添加缩进（缩进2字符 = 21pt）
-                    h3_p.paragraph_format.left_indent = Pt(21)
-
-                    # 添加右对齐制表位（带点线前导符）
-                    self._add_tab_stop(h3_p, position_cm=16.0, alignment='right', leader='dot')
-
-                    # 超链接
+                    h3_bookmark = heading_bookmark(item['number'])
+                    h3_p = self._add_toc_entry_paragraph(3)
                     h3_text = f'{item["number"]} {item["text"]}'
                     self._create_standard_hyperlink(h3_p, h3_text, h3_bookmark)
-
-                    # 添加制表符
-                    h3_tab_run = h3_p.add_run('\t')
-
-                    # 页码
-                    h3_page_run = h3_p.add_run()
-                    h3_page_run.font.name = 'Times New Roman'
-                    h3_page_run.font.size = Pt(10.5)  # 五号
-                    self._add_pageref_field(h3_page_run, h3_bookmark)
+                    self._add_toc_page_number(h3_p, h3_bookmark)
 
         for section in special_sections:
             title = section.get('title')
@@ -829,14 +814,35 @@ class USTCFormatter:
             if not title or not bookmark_name:
                 continue
 
-            section_para = self.doc.add_paragraph()
-            self._add_tab_stop(section_para, position_cm=16.0, alignment='right', leader='dot')
+            section_para = self._add_toc_entry_paragraph(1)
             self._create_standard_hyperlink(section_para, title, bookmark_name)
-            section_para.add_run('\t')
-            page_run = section_para.add_run()
+            self._add_toc_page_number(section_para, bookmark_name)
+
+    def _add_toc_entry_paragraph(self, level):
+        """
+        新建目录条目段落（缩进 + 右对齐点线制表位）
+        :param level: 目录级别 1-3
+        """
+        paragraph = self.doc.add_paragraph()
+        if self.named_styles:
+            paragraph._p.style = self.style_ids[f'toc{level}']
+            return paragraph
+
+        # 缩进：二级 1 字符（10.5pt，五号字大小），三级 2 字符
+        indent = TOC_LEVEL_INDENTS.get(level)
+        if indent:
+            paragraph.paragraph_format.left_indent = Pt(indent)
+        self._add_tab_stop(paragraph, position_cm=16.0, alignment='right', leader='dot')
+        return paragraph
+
+    def _add_toc_page_number(self, paragraph, bookmark_name):
+        """添加制表符（显示点线前导符）与自动页码字段"""
+        paragraph.add_run('\t')
+        page_run = paragraph.add_run()
+        if not self.named_styles:
             page_run.font.name = 'Times New Roman'
-            page_run.font.size = Pt(10.5)
-            self._add_pageref_field(page_run, bookmark_name)
+            page_run.font.size = Pt(TOC_ENTRY_SIZE)  # 五号
+        self._add_pageref_field(page_run, bookmark_name)
 
     def _generate_body(self, title, chapters, section):
         """
@@ -849,8 +855,83 @@ class USTCFormatter:
         self._set_header(title, section)
 
         # 生成各章节
+        if self.chapter_workers > 1 and len(chapters) > 1:
+            for fragment in render_chapter_fragments(self, chapters, self.chapter_workers):
+                self._merge_chapter_fragment(fragment)
+                self._flush_spool()
+            return
         for chapter_idx, chapter in enumerate(chapters):
             self._generate_chapter(chapter, chapter_idx)
+            self._flush_spool()
+
+    def _merge_chapter_fragment(self, fragment):
+        """
+        按顺序并入 worker 渲染的章节片段，结果与逐章顺序生成相同：
+        书签按分配顺序重新编号；SEQ 域结果按本文档计数重写；已在前文出现过的引用位置书签（_Citation_N）移除；
+        图片按源文件并入本文档（相同内容只保留一份）并改写关系 ID，wp:docPr ID 续接本文档计数
+        """
+        if not fragment.xml:
+            return
+        wrapper = parse_xml(fragment.xml)
+
+        bookmark_ends = {end.get(qn('w:id')): end for end in wrapper.iter(qn('w:bookmarkEnd'))}
+        # worker 内的书签 ID 即分配顺序
+        bookmark_starts = sorted(wrapper.iter(qn('w:bookmarkStart')), key=lambda start: int(start.get(qn('w:id'))))
+        for start in bookmark_starts:
+            end = bookmark_ends.get(start.get(qn('w:id')))
+            name = start.get(qn('w:name'))
+            number = citation_number_of(name)
+            if number is not None:
+                if number in self.reference_backlinks:
+                    # 该引用在前面的章节已出现，顺序生成时不会在此处添加书签
+                    for element in (start, end):
+                        if element is not None:
+                            element.getparent().remove(element)
+                    continue
+                self.reference_backlinks[number] = name
+            new_id = str(self.bookmarks.allocate(name, start.getparent()))
+            start.set(qn('w:id'), new_id)
+            if end is not None:
+                end.set(qn('w:id'), new_id)
+        for hyperlink in wrapper.iter(qn('w:hyperlink')):
+            anchor = hyperlink.get(qn('w:anchor'))
+            if anchor:
+                self.bookmarks.add_reference(anchor)
+        for instr in wrapper.iter(qn('w:instrText')):
+            field = (instr.text or '').split()
+            if len(field) > 1 and field[0] == PAGEREF:
+                self.bookmarks.add_reference(field[1], PAGEREF)
+            elif len(field) > 1 and field[0] == SEQ:
+                # worker 内各章从空计数开始，按本文档的计数重写显示结果（separate 之后的 w:t）
+                result = _FIELD_RESULT_TEXT(instr)
+                if not result:
+                    raise ValueError(f'章节片段中的 SEQ 域缺少显示结果: {instr.text!r}')
+                result[0].text = str(self._next_seq_value(field[1]))
+
+        for inline in wrapper.iter(qn('wp:inline')):
+            blip = next(inline.iter(qn('a:blip')), None)
+            if blip is not None:
+                image_path = fragment.images[blip.get(qn('r:embed'))]
+                rId, image = self.doc.part.get_or_add_image(image_path)
+                self.image_sources.setdefault(rId, image_path)
+                blip.set(qn('r:embed'), rId)
+                # 与本文档中已有的相同图片共用图片部件时，沿用该部件的文件名
+                for c_nv_pr in inline.iter(qn('pic:cNvPr')):
+                    c_nv_pr.set('name', image.filename)
+            shape_id = self._next_shape_id()
+            doc_pr = inline.find(qn('wp:docPr'))
+            doc_pr.set('id', str(shape_id))
+            doc_pr.set('name', f'Picture {shape_id}')
+
+        body = self.doc.element.body
+        for block in list(wrapper):
+            append_block(body, block)
+
+    def _flush_spool(self):
+        """流式模式下将已完成的正文块写入临时文件"""
+        if self._spool is not None:
+            self._spool.flush()
+            self.bookmarks.release_paragraphs()
 
     def _generate_references(self, references, section_number=None):
         """
@@ -892,23 +973,31 @@ class USTCFormatter:
             self._add_bookmark_to_paragraph(title_para, bookmark_name)
 
         # 条目
-        entry_cn, entry_en = self._extract_font_pair(entry_cfg, fonts.get('chinese', '宋体'), english_font)
-        entry_size = entry_cfg.get('size', 10.5)
+        entry_style = self.style_manager.compiled.reference_entry
+        entry_cn = entry_style.run.chinese_font
+        entry_en = entry_style.run.english_font
+        entry_size = entry_style.run.size
         left_bracket, right_bracket = number_cfg.get('brackets', ['[', ']'])
         number_font = number_cfg.get('font', entry_en)
         number_bold = number_cfg.get('bold', False)
 
         for idx, ref in enumerate(references, 1):
             para = self.doc.add_paragraph()
-            self.style_manager.apply_paragraph_style(para, entry_cfg)
+            if self.named_styles:
+                para._p.style = self.style_ids['reference_entry']
+            else:
+                self.style_manager.apply_paragraph_style(para, entry_style.paragraph)
 
             number_run = para.add_run(f'{left_bracket}{idx}{right_bracket}')
-            number_run.font.name = number_font
-            number_run.font.size = Pt(entry_size)
-            number_run.font.bold = number_bold
-            number_run._element.rPr.rFonts.set(qn('w:eastAsia'), entry_cn)
+            if self.named_styles:
+                number_run._r.style = self.style_ids['reference_number']
+            else:
+                number_run.font.name = number_font
+                number_run.font.size = entry_style.run.size_pt
+                number_run.font.bold = number_bold
+                number_run._element.rPr.rFonts.set(qn('w:eastAsia'), entry_cn)
 
-            text = self._sanitize_reference_text(ref.get('text', ''))
+            text = self._cached_reference_text(ref.get('text', ''))
             ref['text'] = text
             detail_text = f' {text}' if text else ''
             backlink_name = self.reference_backlinks.get(idx)
@@ -922,6 +1011,8 @@ class USTCFormatter:
                         entry_en,
                         entry_size
                     )
+                elif self.named_styles:
+                    para.add_run(detail_text)
                 else:
                     detail_run = para.add_run()
                     self.style_manager.set_mixed_font(
@@ -936,93 +1027,30 @@ class USTCFormatter:
             if target:
                 self._add_bookmark_to_paragraph(para, target['bookmark'])
 
-    def _sanitize_reference_text(self, text):
-        """移除 URL、统一标点并控制换行"""
-        # 参考: best_practices/参考文献系统_reference.py 第213-230行
-        if not text:
-            return ''
-
-        sanitized = text.strip()
-        sanitized = self._remove_reference_urls(sanitized)
-        sanitized = self._normalize_reference_punctuation(sanitized)
-        sanitized = self._remove_space_before_punctuation(sanitized)
-        sanitized = self._collapse_reference_whitespace(sanitized)
-        sanitized = self._ensure_reference_spacing(sanitized)
-        sanitized = self._collapse_reference_whitespace(sanitized)
-        sanitized = self._protect_reference_sequences(sanitized)
-        sanitized = sanitized.strip()
-        sanitized = re.sub(r'\s+\.', '.', sanitized)
-        if sanitized and not sanitized.endswith('.'):
-            sanitized = f'{sanitized}.'
+    def _cached_reference_text(self, text):
+        """清洗参考文献文本，配置了磁盘渲染缓存时先查缓存"""
+        if self.render_cache is None or not text:
+            return self._sanitize_reference_text(text)
+        key = self.render_cache.key(
+            REFERENCE_CACHE_NAMESPACE, self._reference_code_version(), text, WORD_JOINER
+        )
+        sanitized = self.render_cache.get_text(key)
+        if sanitized is None:
+            sanitized = self._sanitize_reference_text(text)
+            self.render_cache.put_text(key, sanitized)
         return sanitized
 
-    def _remove_reference_urls(self, text):
-        """去除参考文献中的 http/https 链接"""
-        return re.sub(r'https?://\S+', '', text, flags=re.IGNORECASE)
+    @classmethod
+    def _reference_code_version(cls):
+        """参考文献清洗规则（references 模块）源码的指纹，规则改动后旧缓存条目失效"""
+        if cls._reference_version is None:
+            cls._reference_version = source_fingerprint(references)
+        return cls._reference_version
 
-    def _normalize_reference_punctuation(self, text):
-        """将标点统一为英文半角字符"""
-        replacements = {
-            '……': '...'
-        }
-        for original, repl in replacements.items():
-            text = text.replace(original, repl)
-
-        punctuation_map = {
-            '，': ',',
-            '。': '.',
-            '．': '.',
-            '、': ',',
-            '；': ';',
-            '：': ':',
-            '？': '?',
-            '！': '!',
-            '（': '(',
-            '）': ')',
-            '【': '[',
-            '】': ']',
-            '《': '<',
-            '》': '>',
-            '“': '"',
-            '”': '"',
-            '‘': "'",
-            '’': "'",
-            '—': '-',
-            '－': '-',
-            '～': '~',
-            '·': '-',
-            '｜': '|'
-        }
-        translation_table = str.maketrans(punctuation_map)
-        return text.translate(translation_table)
-
-    def _remove_space_before_punctuation(self, text):
-        """清理标点前多余的空格"""
-        return re.sub(r'\s+([,.;:?!\)\]\}])', r'\1', text)
-
-    def _ensure_reference_spacing(self, text):
-        """在标点后插入空格（- 和句末句号除外）"""
-        if not text:
-            return ''
-
-        punctuation_pattern = re.compile(r'([,;:?!\)\]\}])(?=[^\s,.;:?!\)\]\}])')
-        text = punctuation_pattern.sub(r'\1 ', text)
-
-        period_pattern = re.compile(r'\.(?=[^\s,.;:?!\)\]\}])')
-        text = period_pattern.sub('. ', text)
-        return text
-
-    def _collapse_reference_whitespace(self, text):
-        """压缩多余空白"""
-        return re.sub(r'\s+', ' ', text)
-
-    def _protect_reference_sequences(self, text):
-        """为日期、页码等连字符片段添加不可断开控制"""
-        def wrap(match):
-            segment = match.group(0)
-            return segment.replace('-', f'{WORD_JOINER}-{WORD_JOINER}')
-
-        return re.sub(r'\d+(?:-\d+)+', wrap, text)
+    def _sanitize_reference_text(self, text):
+        """移除 URL、统一标点并控制换行（一次遍历完成，见 references.normalize_reference_text）"""
+        # 参考: best_practices/参考文献系统_reference.py 第213-230行
+        return normalize_reference_text(text)
 
     def _ensure_continuous_page_numbering(self, section):
         """移除新节的起始页码设置，保持与上一节连续"""
@@ -1043,7 +1071,9 @@ class USTCFormatter:
             paragraphs,
             default_title='致  谢',
             section_number=section_number,
-            bookmark_name=self._get_special_section_bookmark('acknowledgements')
+            bookmark_name=self._get_special_section_bookmark('acknowledgements'),
+            text_style=self.style_manager.compiled.acknowledgements,
+            style_key='acknowledgements'
         )
 
     def _generate_appendix(self, paragraphs, section_number=None):
@@ -1054,10 +1084,12 @@ class USTCFormatter:
             paragraphs,
             default_title='附  录',
             section_number=section_number,
-            bookmark_name=self._get_special_section_bookmark('appendix')
+            bookmark_name=self._get_special_section_bookmark('appendix'),
+            text_style=self.style_manager.compiled.appendix,
+            style_key='appendix'
         )
 
-    def _render_custom_section(self, section_style, paragraphs, default_title, section_number=None, bookmark_name=None):
+    def _render_custom_section(self, section_style, paragraphs, default_title, section_number=None, bookmark_name=None, text_style=None, style_key=None):
         """渲染自定义章节（致谢/附录）"""
         if not paragraphs:
             return
@@ -1077,25 +1109,53 @@ class USTCFormatter:
         if bookmark_name:
             self._add_bookmark_to_paragraph(title_para, bookmark_name)
 
-        fonts = self.style_manager.get_fonts()
-        english_font = fonts.get('english', 'Times New Roman')
-        chinese_font = fonts.get('chinese', '宋体')
-        content_cn, content_en = self._extract_font_pair(content_cfg, chinese_font, english_font)
-        content_size = content_cfg.get('size', 12)
+        if text_style is None:
+            text_style = self.style_manager.compile_text_style(content_cfg)
+        self._add_styled_paragraphs(paragraphs, text_style, style_key)
 
+    def _add_styled_paragraphs(self, paragraphs, text_style, style_key=None):
+        """
+        按已编译的样式逐段写入纯文本段落（空段落跳过）
+        :param text_style: ResolvedTextStyle
+        :param style_key: 命名样式模式下引用的样式键
+        """
+        style_id = self.style_ids.get(style_key)
+        run_style = text_style.run
         for para_text in paragraphs:
             if not para_text:
                 continue
-            para = self.doc.add_paragraph()
-            run = para.add_run()
-            self.style_manager.set_mixed_font(
-                run,
-                para_text,
-                chinese_font=content_cn,
-                english_font=content_en,
-                size=content_size
-            )
-            self.style_manager.apply_paragraph_style(para, content_cfg or {})
+            para = self._new_body_paragraph()
+            if style_id:
+                para._p.style = style_id
+                self._append_run(para, para_text)
+                continue
+            self._append_run(para, para_text, run_style)
+            self.style_manager.apply_paragraph_style(para, text_style.paragraph)
+
+    def _new_body_paragraph(self):
+        """在正文末尾新建段落；lxml 后端直接插入 w:p，不经过 python-docx 的逐子元素查找"""
+        if self.backend == 'lxml':
+            p = append_block(self.doc.element.body, make_w_element('p'))
+            return Paragraph(p, self.doc._body)
+        return self.doc.add_paragraph()
+
+    def _append_run(self, paragraph, text, run_style=None):
+        """
+        向段落追加文本 run
+        :param run_style: ResolvedRunStyle；为 None 时不写 rPr（格式由段落样式提供）
+        """
+        if self.backend == 'lxml':
+            rpr = None
+            if run_style is not None:
+                rpr = self.style_manager.mixed_rpr_template(
+                    run_style.chinese_font, run_style.english_font, run_style.size_pt, run_style.bold
+                )
+            paragraph._p.append(make_run(text, rpr))
+            return
+        if run_style is None:
+            paragraph.add_run(text)
+            return
+        self.style_manager.apply_mixed_run_style(paragraph.add_run(), text, run_style)
 
     def _apply_title_paragraph_format(self, paragraph, title_cfg):
         """应用标题段落的对齐与间距"""
@@ -1119,71 +1179,77 @@ class USTCFormatter:
         :param chapter_idx: 章节索引
         """
         # 一级标题
-        h1_style = self.style_manager.get_heading_style(1)
+        h1_style = self.style_manager.compiled.headings[1]
         h1_para = self.doc.add_paragraph()
 
-        # 章节号（Times New Roman）
         chapter_num = chapter.get('number', chapter_idx + 1)
-        num_run = h1_para.add_run(f'第{chapter_num}章 ')
-        num_run.font.name = h1_style.get('number_font', 'Times New Roman')
-        num_run.font.size = Pt(h1_style['size'])
-        num_run.font.bold = h1_style.get('bold', False)
-
-        # 章节标题（宋体）
-        title_run = h1_para.add_run(chapter['title'])
-        title_run.font.name = h1_style['font']
-        title_run._element.rPr.rFonts.set(qn('w:eastAsia'), h1_style['font'])
-        title_run.font.size = Pt(h1_style['size'])
-        title_run.font.bold = h1_style.get('bold', False)
-
-        # 应用段落样式
-        h1_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        if 'space_before' in h1_style:
-            h1_para.paragraph_format.space_before = Pt(h1_style['space_before'])
+        if self.named_styles:
+            h1_para._p.style = self.style_ids['heading1']
+            self._add_heading_number_run(h1_para, f'第{chapter_num}章 ', 1)
+            h1_para.add_run(chapter['title'])
+        else:
+            # 章节号（Times New Roman）
+            num_run = h1_para.add_run(f'第{chapter_num}章 ')
+            num_run.font.name = h1_style.number_font
+            num_run.font.size = h1_style.size_pt
+            num_run.font.bold = h1_style.bold
+
+            # 章节标题（宋体）
+            title_run = h1_para.add_run(chapter['title'])
+            title_run.font.name = h1_style.font
+            title_run._element.rPr.rFonts.set(qn('w:eastAsia'), h1_style.font)
+            title_run.font.size = h1_style.size_pt
+            title_run.font.bold = h1_style.bold
+
+            # 应用段落样式
+            h1_para.alignment = h1_style.alignment
+            if h1_style.space_before is not None:
+                h1_para.paragraph_format.space_before = h1_style.space_before
 
         # 🔑 关键：为一级标题添加书签
-        bookmark_name = f'_Chapter_{chapter_num}'
-        self._add_bookmark_to_paragraph(h1_para, bookmark_name)
+        self._add_bookmark_to_paragraph(h1_para, chapter_bookmark(chapter_num))
 
-        # 添加章节内容
+        # 添加章节内容（节点直接读取类属性 type，dict 兼容旧结构）
+        handlers = self._content_handlers
         for item in chapter.get('content', []):
-            if item['type'] == 'paragraph':
-                self._add_paragraph(item['text'])
-            elif item['type'] == 'heading2':
-                self._add_heading2(item['number'], item['text'])
-            elif item['type'] == 'heading3':
-                self._add_heading3(item['number'], item['text'])
-            elif item['type'] == 'figure':
-                self._add_figure(item)
-            elif item['type'] == 'table':
-                self._add_table(item)
-            elif item['type'] == 'formula':
-                self._add_formula(item)
-
-    def _add_paragraph(self, text):
+            item_type = item.type if isinstance(item, ContentNode) else item['type']
+            handler = handlers.get(item_type)
+            if handler is not None:
+                handler(item)
+
+    def _add_heading_number_run(self, paragraph, text, level):
+        """
+        命名样式模式下的标题编号：引用该级标题的编号字符样式（编号字体），字号与加粗由段落样式提供
+        """
+        run = paragraph.add_run(text)
+        run._r.style = self.style_ids[f'heading{level}_number']
+        return run
+
+    def _add_paragraph(self, text, citations=None):
         """
         添加正文段落
         :param text: 段落文本
+        :param citations: 解析时预先计算的引用位置，缺省时现场扫描
         """
-        para_style = self.style_manager.get_paragraph_style()
-        para = self.doc.add_paragraph()
-
-        fonts = self.style_manager.get_fonts()
-        chinese_font = fonts.get('chinese', '宋体')
-        english_font = fonts.get('english', 'Times New Roman')
-        body_cn, body_en = self._extract_font_pair(para_style, chinese_font, english_font)
+        body_style = self.style_manager.compiled.body
+        run_style = body_style.run
+        para = self._new_body_paragraph()
+        if self.named_styles:
+            para._p.style = self.style_ids['body']
 
         self._add_text_with_citations(
             para,
             text,
-            chinese_font=body_cn,
-            english_font=body_en,
-            font_size=para_style.get('size', 12),
-            bold=para_style.get('bold', False)
+            chinese_font=run_style.chinese_font,
+            english_font=run_style.english_font,
+            font_size=run_style.size,
+            bold=run_style.bold,
+            citations=citations
         )
 
         # 应用段落样式
-        self.style_manager.apply_paragraph_style(para, para_style)
+        if not self.named_styles:
+            self.style_manager.apply_paragraph_style(para, body_style.paragraph)
 
     def _add_heading2(self, number, text):
         """
@@ -1191,29 +1257,32 @@ class USTCFormatter:
         :param number: 标题编号
         :param text: 标题文本
         """
-        h2_style = self.style_manager.get_heading_style(2)
+        h2_style = self.style_manager.compiled.headings[2]
         para = self.doc.add_paragraph()
-
-        # 编号（Times New Roman）
-        num_run = para.add_run(f'{number} ')
-        num_run.font.name = h2_style.get('number_font', 'Times New Roman')
-        num_run.font.size = Pt(h2_style['size'])
-        num_run.font.bold = h2_style.get('bold', False)
-
-        # 标题文本（宋体）
-        text_run = para.add_run(text)
-        text_run.font.name = h2_style['font']
-        text_run._element.rPr.rFonts.set(qn('w:eastAsia'), h2_style['font'])
-        text_run.font.size = Pt(h2_style['size'])
-        text_run.font.bold = h2_style.get('bold', False)
-
-        # 应用段落样式
-        if h2_style.get('alignment') == 'left':
-            para.alignment = WD_ALIGN_PARAGRAPH.LEFT
+        if self.named_styles:
+            para._p.style = self.style_ids['heading2']
+            self._add_heading_number_run(para, f'{number} ', 2)
+            para.add_run(text)
+        else:
+            # 编号（Times New Roman）
+            num_run = para.add_run(f'{number} ')
+            num_run.font.name = h2_style.number_font
+            num_run.font.size = h2_style.size_pt
+            num_run.font.bold = h2_style.bold
+
+            # 标题文本（宋体）
+            text_run = para.add_run(text)
+            text_run.font.name = h2_style.font
+            text_run._element.rPr.rFonts.set(qn('w:eastAsia'), h2_style.font)
+            text_run.font.size = h2_style.size_pt
+            text_run.font.bold = h2_style.bold
+
+            # 应用段落样式
+            if h2_style.alignment is not None:
+                para.alignment = h2_style.alignment
 
         # 🔑 关键：为二级标题添加书签
-        bookmark_name = f'_Heading_{number.replace(".", "_")}'
-        self._add_bookmark_to_paragraph(para, bookmark_name)
+        self._add_bookmark_to_paragraph(para, heading_bookmark(number))
 
     def _add_heading3(self, number, text):
         """
@@ -1221,47 +1290,53 @@ class USTCFormatter:
         :param number: 标题编号
         :param text: 标题文本
         """
-        h3_style = self.style_manager.get_heading_style(3)
+        h3_style = self.style_manager.compiled.headings[3]
         para = self.doc.add_paragraph()
-
-        # 编号（Times New Roman）
-        num_run = para.add_run(f'{number} ')
-        num_run.font.name = h3_style.get('number_font', 'Times New Roman')
-        num_run.font.size = Pt(h3_style['size'])
-        num_run.font.bold = h3_style.get('bold', False)
-
-        # 标题文本（宋体）
-        text_run = para.add_run(text)
-        text_run.font.name = h3_style['font']
-        text_run._element.rPr.rFonts.set(qn('w:eastAsia'), h3_style['font'])
-        text_run.font.size = Pt(h3_style['size'])
-        text_run.font.bold = h3_style.get('bold', False)
-
-        # 应用段落样式
-        if h3_style.get('alignment') == 'left':
-            para.alignment = WD_ALIGN_PARAGRAPH.LEFT
+        if self.named_styles:
+            para._p.style = self.style_ids['heading3']
+            self._add_heading_number_run(para, f'{number} ', 3)
+            para.add_run(text)
+        else:
+            # 编号（Times New Roman）
+            num_run = para.add_run(f'{number} ')
+            num_run.font.name = h3_style.number_font
+            num_run.font.size = h3_style.size_pt
+            num_run.font.bold = h3_style.bold
+
+            # 标题文本（宋体）
+            text_run = para.add_run(text)
+            text_run.font.name = h3_style.font
+            text_run._element.rPr.rFonts.set(qn('w:eastAsia'), h3_style.font)
+            text_run.font.size = h3_style.size_pt
+            text_run.font.bold = h3_style.bold
+
+            # 应用段落样式
+            if h3_style.alignment is not None:
+                para.alignment = h3_style.alignment
 
         # 🔑 关键：为三级标题添加书签
-        bookmark_name = f'_Heading_{number.replace(".", "_")}'
-        self._add_bookmark_to_paragraph(para, bookmark_name)
+        self._add_bookmark_to_paragraph(para, heading_bookmark(number))
 
-    def _add_text_with_citations(self, paragraph, text, chinese_font, english_font, font_size, bold=False):
+    def _add_text_with_citations(self, paragraph, text, chinese_font, english_font, font_size, bold=False, citations=None):
         """
         在段落中写入正文文本并处理参考文献引用
+        :param citations: [(start, end, number)]，为 None 时用正则扫描
         """
         # 参考: best_practices/参考文献系统_reference.py 第194-210行
         if not text:
             return
 
+        if citations is None:
+            citations = find_citation_spans(text)
+
         last_index = 0
-        for match in CITATION_PATTERN.finditer(text):
-            plain_text = text[last_index:match.start()]
+        for start, end, citation_number in citations:
+            plain_text = text[last_index:start]
             if plain_text:
                 self._append_text_run(paragraph, plain_text, chinese_font, english_font, font_size, bold)
 
-            citation_number = int(match.group(1))
             self._append_citation_run(paragraph, citation_number, chinese_font, english_font, font_size, bold)
-            last_index = match.end()
+            last_index = end
 
         if last_index < len(text):
             remaining = text[last_index:]
@@ -1272,6 +1347,16 @@ class USTCFormatter:
         """向段落中添加普通文本"""
         if not text:
             return
+        if self.backend == 'lxml':
+            rpr = None
+            if not self.named_styles:
+                rpr = self.style_manager.mixed_rpr_template(chinese_font, english_font, Pt(font_size), bold)
+            paragraph._p.append(make_run(text, rpr))
+            return
+        if self.named_styles:
+            # 字体字号由段落样式提供
+            paragraph.add_run(text)
+            return
         run = paragraph.add_run()
         self.style_manager.set_mixed_font(
             run,
@@ -1292,7 +1377,7 @@ class USTCFormatter:
 
         bookmark_name = None
         if citation_number not in self.reference_backlinks:
-            bookmark_name = f'_Citation_{citation_number}'
+            bookmark_name = citation_bookmark(citation_number)
             self.reference_backlinks[citation_number] = bookmark_name
 
         self._add_internal_reference_link(
@@ -1309,41 +1394,13 @@ class USTCFormatter:
     def _add_internal_reference_link(self, paragraph, text, bookmark_name, chinese_font, english_font, font_size, bold=False, bookmark_name_for_location=None):
         """创建保持黑色字体的内部超链接（用于参考文献引用）"""
         # 参考: best_practices/参考文献系统_reference.py 第94-149行
-        hyperlink = OxmlElement('w:hyperlink')
-        hyperlink.set(qn('w:anchor'), bookmark_name)
-        hyperlink.set(qn('w:history'), '1')
-
-        run_element = OxmlElement('w:r')
-        run_props = OxmlElement('w:rPr')
-
-        fonts = OxmlElement('w:rFonts')
-        fonts.set(qn('w:ascii'), english_font)
-        fonts.set(qn('w:hAnsi'), english_font)
-        fonts.set(qn('w:eastAsia'), chinese_font)
-        run_props.append(fonts)
-
-        size_element = OxmlElement('w:sz')
-        size_element.set(qn('w:val'), str(int(font_size * 2)))
-        run_props.append(size_element)
-
-        if bold:
-            bold_element = OxmlElement('w:b')
-            bold_element.set(qn('w:val'), '1')
-            run_props.append(bold_element)
-
-        color = OxmlElement('w:color')
-        color.set(qn('w:val'), '000000')
-        run_props.append(color)
-
-        run_element.append(run_props)
-        text_element = OxmlElement('w:t')
-        text_element.text = text
-        run_element.append(text_element)
-
-        hyperlink.append(run_element)
+        self.bookmarks.add_reference(bookmark_name)
+        # 命名样式模式下字体字号由段落样式提供，只保留黑色
+        fonts = None if self.named_styles else (english_font, chinese_font, font_size)
+        hyperlink = self.fragments.reference_hyperlink(bookmark_name, text, fonts, bold)
 
         if bookmark_name_for_location:
-            bookmark_id = self._get_next_bookmark_id()
+            bookmark_id = self.bookmarks.allocate(bookmark_name_for_location, paragraph._element)
             bookmark_start = OxmlElement('w:bookmarkStart')
             bookmark_start.set(qn('w:id'), str(bookmark_id))
             bookmark_start.set(qn('w:name'), bookmark_name_for_location)
@@ -1406,40 +1463,29 @@ class USTCFormatter:
         return paragraph
 
     def _render_seq_template(self, paragraph, format_template, seq_type, chapter_num=None, chapter_based=True):
-        """根据配置模板渲染编号字符串，支持 {chapter} 和 {seq} 占位符"""
-        tokens = re.split(r'(\{chapter\}|\{seq\}|\{index\})', format_template)
-        for token in tokens:
-            if not token:
-                continue
-            if token == '{chapter}':
+        """根据配置模板渲染编号字符串，支持 {chapter} 和 {seq} 占位符（模板编译结果按模板缓存）"""
+        for kind, token in compile_numbering_template(format_template):
+            if kind == CHAPTER:
                 if chapter_num is not None:
                     paragraph.add_run(str(chapter_num))
-            elif token in ('{seq}', '{index}'):
+            elif kind == SEQUENCE:
                 self._insert_seq_field(paragraph, seq_type, chapter_num, chapter_based=chapter_based)
             else:
                 paragraph.add_run(token)
         return paragraph
 
     def _insert_seq_field(self, paragraph, seq_type, chapter_num=None, chapter_based=False):
-        """底层工具：将SEQ字段插入段落"""
-        run = paragraph.add_run()
-        r = run._r
-
-        fldChar_begin = OxmlElement('w:fldChar')
-        fldChar_begin.set(qn('w:fldCharType'), 'begin')
-        r.append(fldChar_begin)
-
-        instrText = OxmlElement('w:instrText')
-        instrText.set(qn('xml:space'), 'preserve')
-        seq_name = seq_type if not chapter_based or chapter_num is None else f'{seq_type}_{chapter_num}'
-        instrText.text = f' SEQ {seq_name} \\* ARABIC '
-        r.append(instrText)
-
-        fldChar_end = OxmlElement('w:fldChar')
-        fldChar_end.set(qn('w:fldCharType'), 'end')
-        r.append(fldChar_end)
-
-        return run
+        """底层工具：将SEQ字段插入段落（带预先计算的编号结果，未更新域也能看到编号）"""
+        seq_name = seq_field_name(seq_type, chapter_num, chapter_based)
+        r = self.fragments.field_run(seq_instruction(seq_name), str(self._next_seq_value(seq_name)))
+        paragraph._p.append(r)
+        return Run(r, paragraph)
+
+    def _next_seq_value(self, seq_name):
+        """按文档顺序为 SEQ 域计数，与 Word 更新域的结果相同"""
+        value = self.seq_counters.get(seq_name, 0) + 1
+        self.seq_counters[seq_name] = value
+        return value
 
     def _resolve_chapter_number(self, raw_number, default='1'):
         """从编号字符串中提取章节号，例如 '2-3' -> 2"""
@@ -1458,20 +1504,7 @@ class USTCFormatter:
 
     def _extract_font_pair(self, style_cfg, fallback_cn='宋体', fallback_en='Times New Roman', base_key='font'):
         """根据配置提取中文/英文字体对"""
-        chinese_font = style_cfg.get(f'{base_key}_chinese')
-        english_font = style_cfg.get(f'{base_key}_english')
-        if chinese_font or english_font:
-            return chinese_font or fallback_cn, english_font or fallback_en
-
-        chinese_font = style_cfg.get('font_chinese')
-        english_font = style_cfg.get('font_english')
-        if chinese_font or english_font:
-            return chinese_font or fallback_cn, english_font or fallback_en
-
-        fallback_font = style_cfg.get('font')
-        if fallback_font:
-            return fallback_font, fallback_font
-        return fallback_cn, fallback_en
+        return extract_font_pair(style_cfg, fallback_cn, fallback_en, base_key)
 
     def _add_figure(self, figure_data):
         """
@@ -1481,6 +1514,7 @@ class USTCFormatter:
         # 参考: best_practices/图表系统_reference.py 第132-209行
         fig_style = self.style_manager.get_figure_style()
         caption_cfg = fig_style.get('caption', {})
+        caption_style = self.style_manager.compiled.figure_caption
         spacing_cfg = fig_style.get('spacing', {})
 
         self.doc.add_paragraph()  # 与上文保持空行
@@ -1498,17 +1532,19 @@ class USTCFormatter:
             placeholder.font.size = Pt(fig_style.get('content_size', 12))
         else:
             try:
-                run = img_para.add_run()
-                run.add_picture(image_path, width=Inches(width_in))
+                self._add_picture(img_para.add_run(), image_path, Inches(width_in))
             except Exception as exc:
                 error_run = img_para.add_run(f'[图片加载失败: {exc}]')
                 error_run.font.color.rgb = RGBColor(255, 0, 0)
                 error_run.font.size = Pt(fig_style.get('content_size', 12))
 
         caption_para = self.doc.add_paragraph()
-        caption_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        caption_para.paragraph_format.space_before = Pt(caption_cfg.get('space_before', 0))
-        caption_para.paragraph_format.space_after = Pt(caption_cfg.get('space_after', 0))
+        if self.named_styles:
+            caption_para._p.style = self.style_ids['figure_caption']
+        else:
+            caption_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            caption_para.paragraph_format.space_before = Pt(caption_cfg.get('space_before', 0))
+            caption_para.paragraph_format.space_after = Pt(caption_cfg.get('space_after', 0))
 
         number_template = caption_cfg.get('number_format') or fig_style.get('numbering_format') or '图{chapter}.{seq}'
         chapter_num = self._resolve_chapter_number(figure_data.get('number'))
@@ -1529,14 +1565,16 @@ class USTCFormatter:
         caption_text = figure_data.get('caption', '')
         if caption_text:
             caption_run = caption_para.add_run(caption_text)
-            caption_run.font.name = caption_cfg.get('font', '宋体')
-            caption_run._element.rPr.rFonts.set(qn('w:eastAsia'), caption_cfg.get('font', '宋体'))
-            caption_run.font.size = Pt(caption_cfg.get('size', 12))
+            if not self.named_styles:
+                caption_run.font.name = caption_style.font
+                caption_run._element.rPr.rFonts.set(qn('w:eastAsia'), caption_style.font)
+                caption_run.font.size = caption_style.size_pt
 
-        for run in caption_para.runs:
-            run.font.name = caption_cfg.get('font', '宋体')
-            run._element.rPr.rFonts.set(qn('w:eastAsia'), caption_cfg.get('font', '宋体'))
-            run.font.size = Pt(caption_cfg.get('size', 12))
+        if not self.named_styles:
+            for run in caption_para.runs:
+                run.font.name = caption_style.font
+                run._element.rPr.rFonts.set(qn('w:eastAsia'), caption_style.font)
+                run.font.size = caption_style.size_pt
 
         if figure_data.get('source'):
             source_para = self.doc.add_paragraph()
@@ -1561,14 +1599,18 @@ class USTCFormatter:
         """
         tbl_style = self.style_manager.get_table_style()
         caption_cfg = tbl_style.get('caption', {})
+        caption_style = self.style_manager.compiled.table_caption
 
         self.doc.add_paragraph()
 
         caption_para = self.doc.add_paragraph()
-        caption_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        caption_para.paragraph_format.space_before = Pt(caption_cfg.get('space_before', 0))
-        caption_para.paragraph_format.space_after = Pt(caption_cfg.get('space_after', 0))
-        caption_para.paragraph_format.keep_with_next = True
+        if self.named_styles:
+            caption_para._p.style = self.style_ids['table_caption']
+        else:
+            caption_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            caption_para.paragraph_format.space_before = Pt(caption_cfg.get('space_before', 0))
+            caption_para.paragraph_format.space_after = Pt(caption_cfg.get('space_after', 0))
+            caption_para.paragraph_format.keep_with_next = True
 
         chapter_num = self._resolve_chapter_number(table_data.get('number'))
         number_template = caption_cfg.get('number_format') or tbl_style.get('numbering_format') or '表{chapter}.{seq}'
@@ -1587,45 +1629,31 @@ class USTCFormatter:
         title_text = table_data.get('caption', '')
         if title_text:
             title_run = caption_para.add_run(title_text)
-            title_run.font.name = caption_cfg.get('font', '宋体')
-            title_run._element.rPr.rFonts.set(qn('w:eastAsia'), caption_cfg.get('font', '宋体'))
-            title_run.font.size = Pt(caption_cfg.get('size', 12))
+            if not self.named_styles:
+                title_run.font.name = caption_style.font
+                title_run._element.rPr.rFonts.set(qn('w:eastAsia'), caption_style.font)
+                title_run.font.size = caption_style.size_pt
 
         for run in caption_para.runs:
-            run.font.name = caption_cfg.get('font', '宋体')
-            run._element.rPr.rFonts.set(qn('w:eastAsia'), caption_cfg.get('font', '宋体'))
-            run.font.size = Pt(caption_cfg.get('size', 12))
-            if run.text and run.text.strip() and caption_cfg.get('bold', False):
+            if not self.named_styles:
+                run.font.name = caption_style.font
+                run._element.rPr.rFonts.set(qn('w:eastAsia'), caption_style.font)
+                run.font.size = caption_style.size_pt
+            if run.text and run.text.strip() and caption_style.bold:
                 run.font.bold = True
 
-        rows = table_data.get('rows', [])
-        if not rows:
+        # 解析器生成的 TableGrid 已补齐列数，dict 输入则现场补齐
+        grid = getattr(table_data, 'grid', None)
+        if grid is None:
+            grid = TableGrid(table_data.get('rows') or [])
+        if not grid.height:
             return
 
-        num_cols = max(len(row) for row in rows) if rows else 1
-        table = self.doc.add_table(rows=len(rows), cols=num_cols)
-
-        if tbl_style.get('allow_row_break', True):
-            self._allow_table_row_break(table)
-
-        for row_idx, row_data in enumerate(rows):
-            for col_idx in range(num_cols):
-                cell_text = row_data[col_idx] if col_idx < len(row_data) else ''
-                cell = table.rows[row_idx].cells[col_idx]
-                cell.text = cell_text
-                for paragraph in cell.paragraphs:
-                    paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                    for run in paragraph.runs:
-                        run.font.name = tbl_style.get('content_font', '宋体')
-                        run._element.rPr.rFonts.set(qn('w:eastAsia'), tbl_style.get('content_font', '宋体'))
-                        run.font.size = Pt(tbl_style.get('content_size', 12))
-                        if row_idx == 0:
-                            run.font.bold = True
-
-        if tbl_style.get('header_repeat', False):
-            self._repeat_table_header(table)
-
-        self._set_table_borders(table, tbl_style)
+        has_header = table_data.get('has_header')
+        if has_header is None:
+            has_header = tbl_style.get('header_row', True)
+        column_widths = self._plan_table_columns(grid, tbl_style) if tbl_style.get('fixed_layout', True) else None
+        append_block(self.doc.element.body, self._build_table_element(grid, tbl_style, column_widths, has_header))
 
         if table_data.get('source'):
             source_para = self.doc.add_paragraph()
@@ -1643,32 +1671,142 @@ class USTCFormatter:
 
         self.doc.add_paragraph()
 
-    def _set_table_borders(self, table, style_config):
+    def _plan_table_columns(self, grid, tbl_style):
         """
-        设置三线表边框：上下 1.5pt，中线 0.5pt，去除竖线
+        按单元格内容规划列宽，总宽为当前节的版心宽度
+        :return: 各列宽度（twips）
         """
-        # 参考: best_practices/图表系统_reference.py 第257-343行
-        from docx.oxml import parse_xml
-        from docx.oxml.ns import nsdecls
-
-        tbl = table._element
-        tblPr = tbl.tblPr
-        if tblPr is None:
-            tblPr = parse_xml(r'<w:tblPr %s/>' % nsdecls('w'))
-            tbl.insert(0, tblPr)
-
-        # 清理并写入表级边框
-        tblBorders = tblPr.find(qn('w:tblBorders'))
-        if tblBorders is not None:
-            tblPr.remove(tblBorders)
+        available = self.doc._block_width.twips
+        content_font = tbl_style.get('content_font', '宋体')
+        widths = plan_column_widths(
+            grid,
+            tbl_style.get('content_size', 12),
+            available / 20,
+            LATIN_ADVANCES.get(content_font, DEFAULT_LATIN_ADVANCE)
+        )
+        twips = [int(width * 20) for width in widths]
+        twips[-1] += available - sum(twips)
+        return twips
+
+    def _apply_fixed_table_layout(self, tbl, column_widths):
+        """写入固定布局（w:tblLayout fixed）、表格总宽与各列 gridCol 宽度，Word 打开时无需自动调整列宽"""
+        tbl_pr = tbl.tblPr
+        tbl_pr.autofit = False
+        tbl_w = tbl_pr.find(qn('w:tblW'))
+        tbl_w.set(qn('w:type'), 'dxa')
+        tbl_w.set(qn('w:w'), str(sum(column_widths)))
+        for grid_col, width in zip(tbl.tblGrid.gridCol_lst, column_widths):
+            grid_col.set(qn('w:w'), str(width))
+
+    def _set_row_cell_widths(self, tr, column_widths):
+        """按列宽写入一行各单元格的 tcW"""
+        for tc, width in zip(tr.tc_lst, column_widths):
+            tc.width = Twips(width)
+
+    def _build_table_element(self, grid, tbl_style, column_widths=None, has_header=True):
+        """
+        一次构建完整的 w:tbl（两种后端共用：逐单元格经 python-docx 写入的表格 XML 与此相同，但大表格慢两个数量级）
+        按行类型（首行/中间行/末行）构建整行模板，每行深拷贝一次后只写入单元格文本，
+        不经过 python-docx 每次访问都重建单元格列表的 row.cells
+        :param has_header: 首行是否为表头（加粗）
+        """
+        num_cols = grid.width
+        total_rows = grid.height
+        # 表格属性与列宽取自 python-docx 的新表格（列宽按版心宽度均分）
+        tbl = CT_Tbl.new_tbl(1, num_cols, self.doc._block_width)
+        tc_template = tbl.tr_lst[0].tc_lst[0]
+        tbl.remove(tbl.tr_lst[0])
+        tbl_borders, border_sizes = self._table_borders_element(tbl_style)
+        tbl.tblPr.append(tbl_borders)
+        if column_widths is not None:
+            self._apply_fixed_table_layout(tbl, column_widths)
+
+        cell_style_id = self.style_ids.get('table_cell')
+        allow_row_break = tbl_style.get('allow_row_break', True)
+        repeat_header = tbl_style.get('header_repeat', False)
+        row_templates = {}
+
+        def row_template(row_idx):
+            is_header = row_idx == 0
+            kind = 'header' if is_header else ('last' if row_idx == total_rows - 1 else 'middle')
+            template = row_templates.get(kind)
+            if template is not None:
+                return template
+
+            tr = make_w_element('tr')
+            if allow_row_break or (repeat_header and is_header):
+                tr_pr = make_w_element('trPr')
+                if allow_row_break:
+                    cant_split = make_w_element('cantSplit')
+                    cant_split.set(qn('w:val'), '0')
+                    tr_pr.append(cant_split)
+                if repeat_header and is_header:
+                    tbl_header = make_w_element('tblHeader')
+                    tbl_header.set(qn('w:val'), 'on')
+                    tr_pr.append(tbl_header)
+                tr.append(tr_pr)
+
+            tc = deepcopy(tc_template)
+            tc_borders = make_w_element('tcBorders')
+            for edge_name, size_value in self._three_line_cell_edges(row_idx, total_rows, border_sizes):
+                self._append_border_edge(tc_borders, edge_name, size_value)
+            tc.tcPr.append(tc_borders)
+            p_pr = make_w_element('pPr')
+            if cell_style_id:
+                p_style = make_w_element('pStyle')
+                p_style.set(qn('w:val'), cell_style_id)
+                p_pr.append(p_style)
+            else:
+                jc = make_w_element('jc')
+                jc.set(qn('w:val'), 'center')
+                p_pr.append(jc)
+            p = tc.p_lst[0]
+            p.append(p_pr)
+            p.append(make_run('', self._table_cell_rpr(tbl_style, is_header and has_header)))
+            for _ in range(num_cols):
+                tr.append(deepcopy(tc))
+            if column_widths is not None:
+                self._set_row_cell_widths(tr, column_widths)
+            template = row_templates[kind] = tr
+            return template
+
+        tc_tag = qn('w:tc')
+        for row_idx, row_data in enumerate(grid.iter_rows()):
+            tr = deepcopy(row_template(row_idx))
+            for tc, text in zip(tr.iterchildren(tc_tag), row_data):
+                if text:
+                    append_text(tc[-1][-1], text)
+            tbl.append(tr)
+        return tbl
+
+    def _table_cell_rpr(self, tbl_style, bold):
+        """
+        单元格 run 的 rPr（与 python-docx 逐项设置 run.font 的结果相同），没有直接格式时为 None
+        命名样式模式下表头加粗通过表头字符样式引用
+        """
+        run = Run(OxmlElement('w:r'), None)
+        if self.named_styles:
+            if bold:
+                run._r.style = self.style_ids['table_header']
+            return run._r.rPr
+        content_font = tbl_style.get('content_font', '宋体')
+        run.font.name = content_font
+        run._element.rPr.rFonts.set(qn('w:eastAsia'), content_font)
+        run.font.size = Pt(tbl_style.get('content_size', 12))
+        if bold:
+            run.font.bold = True
+        return run._r.rPr
 
-        top_border = style_config.get('top_border', 1.5)
-        bottom_border = style_config.get('bottom_border', 1.5)
-        middle_border = style_config.get('middle_border', 0.5)
+    def _table_borders_element(self, style_config):
+        """
+        构建表级三线边框 w:tblBorders
+        :return: (tblBorders 元素, (上线, 下线, 中线) 的 1/8pt 宽度字符串)
+        """
+        from docx.oxml.ns import nsdecls
 
-        top_sz = self._border_size_value(top_border)
-        bottom_sz = self._border_size_value(bottom_border)
-        middle_sz = self._border_size_value(middle_border)
+        top_sz = self._border_size_value(style_config.get('top_border', 1.5))
+        bottom_sz = self._border_size_value(style_config.get('bottom_border', 1.5))
+        middle_sz = self._border_size_value(style_config.get('middle_border', 0.5))
 
         borders_xml = f'''
             <w:tblBorders {nsdecls('w')}>
@@ -1678,166 +1816,38 @@ class USTCFormatter:
                 <w:insideV w:val="nil"/>
             </w:tblBorders>
         '''
-        tblPr.append(parse_xml(borders_xml))
-
-        # 逐单元格写死边框，确保 Word 属性面板能读到正确值
-        total_rows = len(table.rows)
-        if total_rows == 0:
-            return
-
-        for row_idx, row in enumerate(table.rows):
-            is_header = row_idx == 0
-            is_last = row_idx == total_rows - 1
-
-            for cell in row.cells:
-                tc = cell._tc
-                tcPr = tc.get_or_add_tcPr()
-                tcBorders = tcPr.find(qn('w:tcBorders'))
-                if tcBorders is None:
-                    tcBorders = OxmlElement('w:tcBorders')
-                    tcPr.append(tcBorders)
-                else:
-                    for child in list(tcBorders):
-                        tcBorders.remove(child)
-
-                def _set_edge(edge_name, size_value):
-                    edge = OxmlElement(f'w:{edge_name}')
-                    if size_value is None:
-                        edge.set(qn('w:val'), 'nil')
-                    else:
-                        edge.set(qn('w:val'), 'single')
-                        edge.set(qn('w:sz'), size_value)
-                        edge.set(qn('w:color'), '000000')
-                        edge.set(qn('w:space'), '0')
-                    tcBorders.append(edge)
-
-                # 三线表无竖线
-                _set_edge('left', None)
-                _set_edge('right', None)
-
-                if is_header:
-                    _set_edge('top', top_sz)
-                    # 单行表格直接使用底线，否则写中线
-                    _set_edge('bottom', bottom_sz if total_rows == 1 else middle_sz)
-                elif is_last:
-                    _set_edge('top', None)
-                    _set_edge('bottom', bottom_sz)
-                else:
-                    _set_edge('top', None)
-                    _set_edge('bottom', None)
+        return parse_xml(borders_xml), (top_sz, bottom_sz, middle_sz)
+
+    def _three_line_cell_edges(self, row_idx, total_rows, border_sizes):
+        """三线表第 row_idx 行单元格的边框：[(边, 宽度或 None 表示无线)]"""
+        top_sz, bottom_sz, middle_sz = border_sizes
+        # 三线表无竖线
+        edges = [('left', None), ('right', None)]
+        if row_idx == 0:
+            # 单行表格直接使用底线，否则写中线
+            edges += [('top', top_sz), ('bottom', bottom_sz if total_rows == 1 else middle_sz)]
+        elif row_idx == total_rows - 1:
+            edges += [('top', None), ('bottom', bottom_sz)]
+        else:
+            edges += [('top', None), ('bottom', None)]
+        return edges
+
+    def _append_border_edge(self, tc_borders, edge_name, size_value):
+        """向 w:tcBorders 追加一条边框，size_value 为 None 时写 nil"""
+        edge = OxmlElement(f'w:{edge_name}')
+        if size_value is None:
+            edge.set(qn('w:val'), 'nil')
+        else:
+            edge.set(qn('w:val'), 'single')
+            edge.set(qn('w:sz'), size_value)
+            edge.set(qn('w:color'), '000000')
+            edge.set(qn('w:space'), '0')
+        tc_borders.append(edge)
 
     def _border_size_value(self, points):
         """Word 边框宽度以 1/8pt 为单位"""
         return str(int(max(points, 0) * 8))
 
-    def _allow_table_row_break(self, table):
-        """允许表格行跨页断行"""
-        # 参考: best_practices/图表系统_reference.py 第215-235行
-        for row in table.rows:
-            tr = row._tr
-            trPr = tr.trPr
-            if trPr is None:
-                trPr = OxmlElement('w:trPr')
-                tr.insert(0, trPr)
-            cant_split = trPr.find(qn('w:cantSplit'))
-            if cant_split is None:
-                cant_split = OxmlElement('w:cantSplit')
-                trPr.append(cant_split)
-            cant_split.set(qn('w:val'), '0')
-
-    def _repeat_table_header(self, table):
-        """设置表头在分页时重复"""
-        if not table.rows:
-            return
-        header_row = table.rows[0]
-        tr = header_row._tr
-        trPr = tr.trPr
-        if trPr is None:
-            trPr = OxmlElement('w:trPr')
-            tr.insert(0, trPr)
-        tbl_header = trPr.find(qn('w:tblHeader'))
-        if tbl_header is None:
-            tbl_header = OxmlElement('w:tblHeader')
-            trPr.append(tbl_header)
-        tbl_header.set(qn('w:val'), 'on')
-
-    def _text_to_omml(self, text):
-        """
-        将简单的数学文本转换为OMML格式
-        支持下标（使用_）和基本运算符
-        """
-        # 设置Times New Roman字体和五号字体(10.5pt)
-        font_name = 'Times New Roman'
-        font_size = '21'  # 半磅单位，10.5pt * 2 = 21
-
-        # 创建基本的文本运行
-        def create_run(content, italic=False):
-            sty = '<m:sty m:val="i"/>' if italic else ''
-            return f'''<m:r>
-                <m:rPr>{sty}</m:rPr>
-                <w:rPr>
-                    <w:rFonts w:ascii="{font_name}" w:hAnsi="{font_name}"/>
-                    <w:sz w:val="{font_size}"/>
-                </w:rPr>
-                <m:t>{content}</m:t>
-            </m:r>'''
-
-        # 函数列表（不需要斜体）
-        functions = {'sin', 'cos', 'tan', 'floor', 'log', 'ln', 'exp', 'max', 'min', 'ReLU', 'Concat'}
-
-        result_parts = []
-        i = 0
-
-        while i < len(text):
-            # 处理下标：x_i 或 word_num
-            if i < len(text) - 2 and text[i].isalnum():
-                # 查找下标
-                j = i
-                while j < len(text) and (text[j].isalnum() or text[j] == '_'):
-                    if text[j] == '_':
-                        break
-                    j += 1
-
-                if j < len(text) and text[j] == '_':
-                    # 找到下标
-                    base = text[i:j]
-                    k = j + 1
-                    while k < len(text) and text[k].isalnum():
-                        k += 1
-                    subscript = text[j+1:k]
-
-                    # 检查base是否是函数名
-                    is_func = base in functions
-                    is_var = base.isalpha() and not is_func
-
-                    result_parts.append(f'''<m:sSub>
-                        <m:e>{create_run(base, italic=is_var)}</m:e>
-                        <m:sub>{create_run(subscript, italic=subscript.isalpha())}</m:sub>
-                    </m:sSub>''')
-                    i = k
-                    continue
-
-            # 处理普通单词/变量
-            if text[i].isalpha():
-                j = i
-                while j < len(text) and text[j].isalpha():
-                    j += 1
-                word = text[i:j]
-
-                # 检查是否是函数名
-                is_func = word in functions
-                is_var = len(word) == 1 or not is_func
-
-                result_parts.append(create_run(word, italic=is_var and not is_func))
-                i = j
-                continue
-
-            # 处理数字和其他字符
-            result_parts.append(create_run(text[i], italic=False))
-            i += 1
-
-        return ''.join(result_parts)
-
     def _add_formula(self, formula_data):
         """
         添加公式：使用OMML格式，公式居中，编号右对齐（同一行）
@@ -1878,11 +1888,12 @@ class USTCFormatter:
                 # 创建oMathPara元素
                 oMathPara = OxmlElement('m:oMathPara')
 
-                # 创建oMath元素
-                oMath = OxmlElement('m:oMath')
-
-                # 解析公式并添加到oMath
-                self._build_omml_runs(oMath, line, formula_style)
+                # 解析公式并构建oMath（相同公式取缓存副本）
+                oMath = self.omml.build(
+                    line,
+                    formula_style.get('font', 'Times New Roman'),
+                    str(int(formula_style.get('size', 10.5) * 2))  # 转换为半磅
+                )
 
                 # 将oMath添加到oMathPara
                 oMathPara.append(oMath)
@@ -1951,98 +1962,6 @@ class USTCFormatter:
         }
         jc.set(qn('m:val'), alignment_map.get(str(alignment).lower(), 'center'))
 
-    def _build_omml_runs(self, oMath, text, formula_style):
-        """
-        构建OMML格式的run元素
-        """
-        # 参考: best_practices/公式系统_reference.py 第89-141行
-        font_name = formula_style.get('font', 'Times New Roman')
-        font_size = str(int(formula_style.get('size', 10.5) * 2))  # 转换为半磅
-        functions = {'sin', 'cos', 'tan', 'floor', 'log', 'ln', 'exp', 'max', 'min', 'ReLU', 'Concat'}
-
-        i = 0
-        while i < len(text):
-            # 处理下标：x_i
-            if i < len(text) - 2 and text[i].isalnum():
-                j = i
-                while j < len(text) and text[j].isalnum():
-                    j += 1
-
-                if j < len(text) and text[j] == '_':
-                    # 找到下标
-                    base = text[i:j]
-                    k = j + 1
-                    while k < len(text) and text[k].isalnum():
-                        k += 1
-                    subscript = text[j+1:k]
-
-                    # 创建下标结构
-                    sSub = OxmlElement('m:sSub')
-
-                    # base元素
-                    e = OxmlElement('m:e')
-                    is_var = base.isalpha() and base not in functions
-                    self._add_omml_text_run(e, base, font_name, font_size, italic=is_var)
-                    sSub.append(e)
-
-                    # subscript元素
-                    sub = OxmlElement('m:sub')
-                    self._add_omml_text_run(sub, subscript, font_name, font_size, italic=subscript.isalpha())
-                    sSub.append(sub)
-
-                    oMath.append(sSub)
-                    i = k
-                    continue
-
-            # 处理普通单词
-            if text[i].isalpha():
-                j = i
-                while j < len(text) and text[j].isalpha():
-                    j += 1
-                word = text[i:j]
-                is_var = len(word) == 1 or word not in functions
-                self._add_omml_text_run(oMath, word, font_name, font_size, italic=is_var and word not in functions)
-                i = j
-                continue
-
-            # 其他字符
-            self._add_omml_text_run(oMath, text[i], font_name, font_size, italic=False)
-            i += 1
-
-    def _add_omml_text_run(self, parent, text, font_name, font_size, italic=False):
-        """添加一个OMML文本run"""
-        # 参考: best_practices/公式系统_reference.py 第57-86行
-        r = OxmlElement('m:r')
-
-        # 添加run属性
-        rPr = OxmlElement('m:rPr')
-        if italic:
-            sty = OxmlElement('m:sty')
-            sty.set(qn('m:val'), 'i')
-            rPr.append(sty)
-        r.append(rPr)
-
-        # 添加Word格式属性
-        w_rPr = OxmlElement('w:rPr')
-        rFonts = OxmlElement('w:rFonts')
-        rFonts.set(qn('w:ascii'), font_name)
-        rFonts.set(qn('w:hAnsi'), font_name)
-        rFonts.set(qn('w:eastAsia'), font_name)
-        w_rPr.append(rFonts)
-
-        sz = OxmlElement('w:sz')
-        sz.set(qn('w:val'), font_size)
-        w_rPr.append(sz)
-
-        r.append(w_rPr)
-
-        # 添加文本
-        t = OxmlElement('m:t')
-        t.text = text
-        r.append(t)
-
-        parent.append(r)
-
     def _set_header(self, title, section):
         """
         设置指定节的页眉
@@ -2057,6 +1976,10 @@ class USTCFormatter:
         header.is_linked_to_previous = False
         self._clear_block_paragraphs(header)
         header_para = header.add_paragraph()
+        if self.named_styles:
+            header_para._p.style = self.style_ids['header']
+            header_para.add_run(title)
+            return
 
         alignment_map = {
             'left': WD_ALIGN_PARAGRAPH.LEFT,
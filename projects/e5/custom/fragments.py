@@ -0,0 +1,151 @@
+"""
+超链接与域代码片段模板 - 每种结构（w:hyperlink、带 PAGE/PAGEREF/SEQ 指令的 fldChar 序列）按样式签名构建一次，
+之后深拷贝模板，只填入书签、文本与指令
+"""
+from copy import deepcopy
+
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+
+_ANCHOR = qn('w:anchor')
+_XML_SPACE = qn('xml:space')
+
+
+def build_hyperlink(rpr_items):
+    """
+    构建内部超链接：w:hyperlink > w:r > (w:rPr, w:t)，anchor 与文本留空
+    :param rpr_items: rPr 子元素 [(标签, [(属性, 值), ...]), ...]，按顺序写入
+    """
+    hyperlink = OxmlElement('w:hyperlink')
+    hyperlink.set(_ANCHOR, '')
+    hyperlink.set(qn('w:history'), '1')
+
+    run_element = OxmlElement('w:r')
+    run_props = OxmlElement('w:rPr')
+    for tag, attributes in rpr_items:
+        element = OxmlElement(tag)
+        for name, value in attributes:
+            element.set(qn(name), value)
+        run_props.append(element)
+    run_element.append(run_props)
+    run_element.append(OxmlElement('w:t'))
+
+    hyperlink.append(run_element)
+    return hyperlink
+
+
+def build_field(with_result=False):
+    """
+    构建域代码：w:r > (fldChar begin, instrText, [fldChar separate, w:t], fldChar end)，指令与结果留空
+    :param with_result: 是否带 separate 与显示结果
+    """
+    r = OxmlElement('w:r')
+    begin = OxmlElement('w:fldChar')
+    begin.set(qn('w:fldCharType'), 'begin')
+    r.append(begin)
+
+    instr_text = OxmlElement('w:instrText')
+    instr_text.set(_XML_SPACE, 'preserve')
+    r.append(instr_text)
+
+    if with_result:
+        separate = OxmlElement('w:fldChar')
+        separate.set(qn('w:fldCharType'), 'separate')
+        r.append(separate)
+        r.append(OxmlElement('w:t'))
+
+    end = OxmlElement('w:fldChar')
+    end.set(qn('w:fldCharType'), 'end')
+    r.append(end)
+    return r
+
+
+def standard_hyperlink_rpr(font_size=None):
+    """
+    目录条目超链接的 rPr：Hyperlink 字符样式、宋体/Times New Roman、字号与黑色
+    :param font_size: 字号（磅）；None 表示字体字号由段落样式提供
+    """
+    items = [('w:rStyle', [('w:val', 'Hyperlink')])]
+    if font_size is not None:
+        items.append(('w:rFonts', [
+            ('w:ascii', 'Times New Roman'), ('w:eastAsia', '宋体'), ('w:hAnsi', 'Times New Roman')
+        ]))
+        items.append(('w:sz', [('w:val', str(int(font_size * 2)))]))
+    items.append(('w:color', [('w:val', '000000')]))
+    return items
+
+
+def reference_hyperlink_rpr(fonts=None, bold=False):
+    """
+    参考文献引用超链接的 rPr：中英文字体、字号、加粗与黑色
+    :param fonts: (英文字体, 中文字体, 字号磅)；None 表示字体字号由段落样式提供（加粗也随之省略）
+    """
+    items = []
+    if fonts is not None:
+        english_font, chinese_font, font_size = fonts
+        items.append(('w:rFonts', [
+            ('w:ascii', english_font), ('w:hAnsi', english_font), ('w:eastAsia', chinese_font)
+        ]))
+        items.append(('w:sz', [('w:val', str(int(font_size * 2)))]))
+        if bold:
+            items.append(('w:b', [('w:val', '1')]))
+    items.append(('w:color', [('w:val', '000000')]))
+    return items
+
+
+class FragmentTemplates:
+    """按结构与样式签名缓存的片段模板（与具体文档无关，可跨多次生成复用）"""
+
+    def __init__(self):
+        self._templates = {}
+
+    def _template(self, key, build):
+        template = self._templates.get(key)
+        if template is None:
+            template = self._templates[key] = build()
+        return template
+
+    def standard_hyperlink(self, anchor, text, font_size=None):
+        """
+        目录条目的内部超链接
+        :param font_size: 字号（磅）；None 表示不写直接格式（命名样式模式）
+        """
+        template = self._template(
+            ('standard', font_size), lambda: build_hyperlink(standard_hyperlink_rpr(font_size))
+        )
+        return self._fill_hyperlink(template, anchor, text)
+
+    def reference_hyperlink(self, anchor, text, fonts=None, bold=False):
+        """
+        保持黑色字体的参考文献引用超链接
+        :param fonts: (英文字体, 中文字体, 字号磅)；None 表示不写直接格式（命名样式模式）
+        """
+        bold = bool(bold) and fonts is not None
+        template = self._template(
+            ('reference', fonts, bold), lambda: build_hyperlink(reference_hyperlink_rpr(fonts, bold))
+        )
+        return self._fill_hyperlink(template, anchor, text)
+
+    def _fill_hyperlink(self, template, anchor, text):
+        hyperlink = deepcopy(template)
+        hyperlink.set(_ANCHOR, anchor)
+        hyperlink[0][-1].text = text
+        return hyperlink
+
+    def field_run(self, instruction, result=None):
+        """
+        只含一个域代码的新 w:r
+        :param instruction: 域指令（如 ' SEQ Figure \\* ARABIC '）
+        :param result: 显示结果；None 时不写 separate 与结果
+        """
+        with_result = result is not None
+        r = deepcopy(self._template(('field', with_result), lambda: build_field(with_result)))
+        r[1].text = instruction
+        if with_result:
+            r[3].text = result
+        return r
+
+    def append_field(self, r, instruction, result=None):
+        """将域代码的各元素追加到已有 w:r 末尾（保留该 run 已有的 rPr）"""
+        r.extend(list(self.field_run(instruction, result)))
@@ -0,0 +1,121 @@
+"""
+增量解析器 - 按章节/特殊部分分块，只重新解析内容发生变化的块
+"""
+import hashlib
+
+from .citations import CitationIndex
+from .nodes import ChapterNode
+from .parser import USTCContentParser
+
+
+class _BlockResult:
+    """单个块的解析结果"""
+    __slots__ = ('content', 'references_buffer', 'orphans')
+
+    def __init__(self, content, references_buffer, orphans):
+        self.content = content
+        self.references_buffer = references_buffer
+        # 块内出现在占位章节中的元素（如附录中的图表），拼接时并入前一章
+        self.orphans = orphans
+
+
+class USTCIncrementalParser:
+    """
+    编辑场景下的增量解析
+    每个块按 (内容摘要, 起始状态) 缓存解析结果；跨章节的参考文献列表与引用索引在拼接时重建
+    输入格式规范（各部分标题前有空行）时，结果与 USTCContentParser.parse_text 一致
+    """
+
+    def __init__(self, image_dir='examples/images', parser=None):
+        """
+        初始化增量解析器
+        :param image_dir: 图片目录路径
+        :param parser: 可复用的 USTCContentParser 实例
+        """
+        self.parser = parser or USTCContentParser(image_dir=image_dir)
+        self._cache = {}
+        self.last_stats = {'blocks': 0, 'reparsed': 0}
+
+    def parse_file(self, file_path):
+        """从文件增量解析"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        return self.parse_text(text)
+
+    def parse_text(self, text):
+        """
+        增量解析文本内容
+        :param text: 原始文本
+        :return: 解析后的内容结构（与 parse_text 相同）
+        """
+        lines = text.split('\n')
+        blocks = self.parser.split_blocks(lines)
+        bounds = [start for start, _ in blocks[1:]] + [len(lines)]
+
+        cache = {}
+        results = []
+        reparsed = 0
+        has_chapter = False
+        for (start, kind), end in zip(blocks, bounds):
+            block_lines = lines[start:end]
+            digest = hashlib.blake2b('\n'.join(block_lines).encode('utf-8'), digest_size=16).digest()
+            key = (digest, kind, has_chapter)
+            result = self._cache.get(key)
+            if result is None:
+                result = self._parse_block(block_lines, kind, has_chapter)
+                reparsed += 1
+            cache[key] = result
+            results.append(result)
+            has_chapter = has_chapter or bool(result.content['chapters'])
+
+        # 只保留本次用到的块，避免编辑过程中缓存无限增长
+        self._cache = cache
+        self.last_stats = {'blocks': len(blocks), 'reparsed': reparsed}
+        return self._assemble(results)
+
+    def invalidate(self):
+        """清空块缓存（例如图片目录内容变化后）"""
+        self._cache = {}
+
+    def _parse_block(self, block_lines, kind, has_chapter):
+        """以块的起始状态调用解析状态机"""
+        placeholder = ChapterNode(number=None, title=None, content=[]) if has_chapter else None
+        content, references_buffer = self.parser._parse_lines(
+            block_lines,
+            current_section='body' if kind == 'chapter' else None,
+            current_chapter=placeholder,
+            detect_title=kind == 'front'
+        )
+        orphans = placeholder['content'] if placeholder is not None else []
+        return _BlockResult(content, references_buffer, orphans)
+
+    def _assemble(self, results):
+        """按顺序拼接各块结果，并重建跨章节状态"""
+        content = self.parser._empty_content()
+        chapters = content['chapters']
+        references_buffer = []
+
+        for result in results:
+            part = result.content
+            if part['title']:
+                content['title'] = part['title']
+            for key in ('abstract', 'abstract_en'):
+                content[key]['content'].extend(part[key]['content'])
+                if part[key]['keywords']:
+                    content[key]['keywords'] = part[key]['keywords']
+            if result.orphans and chapters:
+                # 复制章节，避免修改缓存中的节点
+                last = chapters[-1]
+                chapters[-1] = ChapterNode(
+                    number=last['number'],
+                    title=last['title'],
+                    content=last['content'] + result.orphans
+                )
+            chapters.extend(part['chapters'])
+            content['acknowledgements'].extend(part['acknowledgements'])
+            content['appendix'].extend(part['appendix'])
+            references_buffer.extend(result.references_buffer)
+
+        content['references'] = self.parser._build_references_list(references_buffer)
+        content['citations'] = CitationIndex.build(chapters, len(content['references']))
+        return content
@@ -0,0 +1,382 @@
+"""
+版面估算 - 不经过排版引擎，按字体度量、页面尺寸、行距以及图表公式高度推算各标题所在页码，
+用于预先填写目录中 PAGEREF 字段的显示结果（Word 更新域后以实际排版为准）
+"""
+import math
+import os
+import unicodedata
+
+from docx.enum.text import WD_LINE_SPACING
+from docx.shared import Cm, Inches, Pt
+
+from .bookmarks import SPECIAL_SECTION_BOOKMARKS, chapter_bookmark, heading_bookmark
+from .nodes import TableGrid
+
+
+PAGE_SIZES_CM = {'A4': (21.0, 29.7), 'Letter': (21.59, 27.94)}
+
+# 单倍行距的行高与字号之比（按中文字体；西文字体 Word 的单倍行高略小，混排时以中文字体为准）
+SINGLE_LINE_FACTORS = {'宋体': 1.3, '黑体': 1.3, '楷体': 1.3, '仿宋': 1.3, 'Times New Roman': 1.15}
+DEFAULT_SINGLE_LINE_FACTOR = 1.3
+# 西文字符的平均字宽（以字号为单位）；中文及全角字符按 1 计
+LATIN_ADVANCES = {'Times New Roman': 0.47, 'Arial': 0.52, 'Calibri': 0.47, 'Courier New': 0.6}
+DEFAULT_LATIN_ADVANCE = 0.5
+# 按全角字宽估算的 Unicode 东亚宽度类别
+WIDE_EAST_ASIAN_WIDTHS = ('W', 'F')
+# Normal 样式为 1.5 倍行距，未单独设置行距的段落（标题、题注、空行、公式）均沿用
+NORMAL_LINE_MULTIPLE = 1.5
+LINE_MULTIPLES = {
+    WD_LINE_SPACING.SINGLE: 1.0,
+    WD_LINE_SPACING.ONE_POINT_FIVE: 1.5,
+    WD_LINE_SPACING.DOUBLE: 2.0
+}
+# 缺图占位符、解析失败等无法得到图片尺寸时的高度（宽高比 4:3）
+DEFAULT_IMAGE_RATIO = 0.75
+# Word 默认单元格左右边距各 108 twips（5.4pt）
+CELL_PADDING_PT = 10.8
+# 列宽下限：两个汉字
+MIN_COLUMN_CHARS = 2
+
+
+def text_width(text, size, latin_advance=DEFAULT_LATIN_ADVANCE):
+    """
+    估算文本宽度（磅）
+    按 Unicode 东亚宽度逐字判断：W（中日韩文字、全角标点）与 F（全角字母数字）按一个字号计，
+    其余（含半角片假名、带重音的西文字母）按西文字宽计；纯 ASCII 文本不必逐字判断
+    """
+    length = len(text)
+    if text.isascii():
+        return size * latin_advance * length
+    wide = sum(1 for char in text if unicodedata.east_asian_width(char) in WIDE_EAST_ASIAN_WIDTHS)
+    return size * (wide + latin_advance * (length - wide))
+
+
+def cell_text_width(text, size, latin_advance=DEFAULT_LATIN_ADVANCE):
+    """单元格文本不折行时的宽度（磅），含换行的单元格取最长一行"""
+    if '\n' in text:
+        return max(text_width(line, size, latin_advance) for line in text.split('\n'))
+    return text_width(text, size, latin_advance)
+
+
+def plan_column_widths(grid, font_size, available_width, latin_advance=DEFAULT_LATIN_ADVANCE):
+    """
+    按内容估算表格各列宽度并适配版心宽度
+    :param grid: TableGrid
+    :param font_size: 单元格字号（磅）
+    :param available_width: 版心宽度（磅）
+    :return: 各列宽度（磅），总和等于 available_width
+    """
+    minimum = font_size * MIN_COLUMN_CHARS + CELL_PADDING_PT
+    natural = [
+        max(
+            max((cell_text_width(cell, font_size, latin_advance) for cell in grid.column(col) if cell), default=0.0)
+            + CELL_PADDING_PT,
+            minimum
+        )
+        for col in range(grid.width)
+    ]
+    return fit_column_widths(natural, available_width)
+
+
+def fit_column_widths(natural, available_width):
+    """
+    将各列的自然宽度适配到版心宽度
+    总宽有富余时按比例放大；放不下时，不超过平均份额的窄列保留自然宽度，
+    其余宽度按自然宽度的比例分给宽列
+    """
+    total = sum(natural)
+    if not natural or total <= 0:
+        return natural
+    if total <= available_width:
+        return [width * available_width / total for width in natural]
+
+    widths = [None] * len(natural)
+    pending = list(range(len(natural)))
+    remaining = available_width
+    while pending:
+        share = remaining / len(pending)
+        narrow = [col for col in pending if natural[col] <= share]
+        if not narrow:
+            break
+        for col in narrow:
+            widths[col] = natural[col]
+            remaining -= natural[col]
+        pending = [col for col in pending if widths[col] is None]
+    wide_total = sum(natural[col] for col in pending)
+    for col in pending:
+        widths[col] = remaining * natural[col] / wide_total
+    return widths
+
+
+class _PageFlow:
+    """按行向页面填充内容，记录当前页码与本页已用高度"""
+    __slots__ = ('page', 'used', 'height')
+
+    def __init__(self, first_page, height):
+        self.page = first_page
+        self.used = 0.0
+        self.height = height
+
+    def new_page(self):
+        if self.used > 0:
+            self.page += 1
+            self.used = 0.0
+
+    def add_lines(self, count, line_height, space_before=0.0, space_after=0.0):
+        """
+        放入可跨页的段落（逐行分页），页首的段前距不计
+        :return: 段落首行所在页码
+        """
+        if self.used > 0:
+            if self.used + space_before + line_height > self.height:
+                self.new_page()
+            else:
+                self.used += space_before
+        first_page = self.page
+        free_lines = int((self.height - self.used) // line_height)
+        if count > free_lines:
+            count -= free_lines
+            per_page = max(1, int(self.height // line_height))
+            self.page += math.ceil(count / per_page)
+            self.used = ((count - 1) % per_page + 1) * line_height
+        else:
+            self.used += count * line_height
+        self.used = min(self.used + space_after, self.height)
+        return first_page
+
+    def add_block(self, height):
+        """放入不可拆分的块（图片、公式行、表格行），本页放不下时移到下一页"""
+        if self.used > 0 and self.used + height > self.height:
+            self.new_page()
+        first_page = self.page
+        self.used = min(self.used + height, self.height)
+        return first_page
+
+
+class PageEstimator:
+    """
+    论文版面的页码估算器
+    只计算正文与其后的参考文献/致谢/附录（目录中的条目都在这些阿拉伯数字页码的节中）
+    """
+
+    def __init__(self, style_manager):
+        self.style_manager = style_manager
+        config = style_manager.config
+        compiled = style_manager.compiled
+        document_settings = style_manager.get_document_settings()
+        margins = document_settings.get('margins', {})
+        width_cm, height_cm = PAGE_SIZES_CM.get(document_settings.get('page_size', 'A4'), PAGE_SIZES_CM['A4'])
+        # 与 _apply_section_layout 的默认值一致
+        self.content_width = Cm(width_cm - margins.get('left', 2.5) - margins.get('right', 2.0)).pt
+        self.content_height = Cm(height_cm - margins.get('top', 2.0) - margins.get('bottom', 2.0)).pt
+
+        fonts = style_manager.get_fonts()
+        self.latin_advance = LATIN_ADVANCES.get(fonts.get('english', 'Times New Roman'), DEFAULT_LATIN_ADVANCE)
+        normal_size = style_manager.get_paragraph_style().get('size', 12)
+        self.blank_line = self._natural_line(fonts.get('chinese', '宋体'), normal_size)
+
+        self.body = self._text_metrics(compiled.body)
+        self.special_texts = {
+            'references': self._text_metrics(compiled.reference_entry),
+            'acknowledgements': self._text_metrics(compiled.acknowledgements),
+            'appendix': self._text_metrics(compiled.appendix)
+        }
+        self.headings = {}
+        for level, heading in compiled.headings.items():
+            size = heading.size_pt.pt
+            space_before = heading.space_before.pt if heading.space_before is not None else 0.0
+            self.headings[level] = (size, self._natural_line(heading.font, size), space_before)
+
+        figure_cfg = config.get('figure', {})
+        table_cfg = config.get('table', {})
+        formula_cfg = config.get('formula', {})
+        self.figure_width = Inches(figure_cfg.get('width_in', 5)).pt
+        self.figure_caption = self._caption_metrics(figure_cfg, compiled.figure_caption)
+        self.table_caption = self._caption_metrics(table_cfg, compiled.table_caption)
+        cell_font = table_cfg.get('content_font', '宋体')
+        self.cell_size = table_cfg.get('content_size', 12)
+        self.cell_latin_advance = LATIN_ADVANCES.get(cell_font, DEFAULT_LATIN_ADVANCE)
+        self.cell_line = self._natural_line(cell_font, self.cell_size)
+        self.formula_line = self._natural_line(formula_cfg.get('font', 'Times New Roman'), formula_cfg.get('size', 12))
+        self.source_lines = {
+            key: self._natural_line(cfg.get('source', {}).get('font', '宋体'), cfg.get('source', {}).get('size', 9))
+            for key, cfg in (('figure', figure_cfg), ('table', table_cfg))
+        }
+        self._image_ratios = {}
+
+    def _natural_line(self, font, size, multiple=NORMAL_LINE_MULTIPLE):
+        """未设置固定行距时的行高（沿用 Normal 的 1.5 倍行距）"""
+        return size * SINGLE_LINE_FACTORS.get(font, DEFAULT_SINGLE_LINE_FACTOR) * multiple
+
+    def _text_metrics(self, text_style):
+        """由编译后的正文类样式得到 (字号, 行高, 首行缩进, 左缩进, 段前, 段后)"""
+        run, paragraph = text_style
+        size = run.size
+        rule = paragraph.line_spacing_rule
+        if rule == WD_LINE_SPACING.EXACTLY and paragraph.line_spacing is not None:
+            line_height = paragraph.line_spacing.pt
+        elif rule == WD_LINE_SPACING.MULTIPLE and paragraph.line_spacing is not None:
+            line_height = self._natural_line(run.chinese_font, size, paragraph.line_spacing)
+        else:
+            line_height = self._natural_line(run.chinese_font, size, LINE_MULTIPLES.get(rule, NORMAL_LINE_MULTIPLE))
+        first_line = paragraph.first_line_indent.pt if paragraph.first_line_indent is not None else 0.0
+        left = paragraph.left_indent.pt if paragraph.left_indent is not None else 0.0
+        return (
+            size, line_height, first_line, left,
+            paragraph.space_before.pt if paragraph.space_before is not None else 0.0,
+            paragraph.space_after.pt if paragraph.space_after is not None else 0.0
+        )
+
+    def _caption_metrics(self, owner_cfg, caption_style):
+        caption_cfg = owner_cfg.get('caption', {})
+        size = caption_style.size_pt.pt
+        return (
+            size, self._natural_line(caption_style.font, size),
+            caption_cfg.get('space_before', 0), caption_cfg.get('space_after', 0)
+        )
+
+    def _count_lines(self, text, size, width, first_line=0.0, latin_advance=None):
+        """文本折行后的行数（中文两端对齐逐字折行，按总宽度除以行宽计算）"""
+        if width <= 0:
+            return 1
+        latin_advance = self.latin_advance if latin_advance is None else latin_advance
+        return max(1, math.ceil((text_width(text, size, latin_advance) + first_line) / width))
+
+    def _add_text(self, flow, text, metrics):
+        size, line_height, first_line, left, space_before, space_after = metrics
+        lines = self._count_lines(text, size, self.content_width - left, first_line)
+        return flow.add_lines(lines, line_height, space_before, space_after)
+
+    def _add_heading(self, flow, level, text):
+        size, line_height, space_before = self.headings[level]
+        lines = self._count_lines(text, size, self.content_width)
+        return flow.add_lines(lines, line_height, space_before)
+
+    def _add_caption(self, flow, text, metrics):
+        size, line_height, space_before, space_after = metrics
+        return flow.add_lines(self._count_lines(text, size, self.content_width), line_height, space_before, space_after)
+
+    def _image_ratio(self, path):
+        """图片高宽比，只读取文件头；同一路径只解析一次"""
+        ratio = self._image_ratios.get(path)
+        if ratio is None:
+            ratio = DEFAULT_IMAGE_RATIO
+            if path and os.path.exists(path):
+                try:
+                    from docx.image.image import Image
+                    image = Image.from_file(path)
+                    if image.px_width:
+                        ratio = image.px_height / image.px_width
+                except Exception:
+                    pass
+            self._image_ratios[path] = ratio
+        return ratio
+
+    def _add_figure(self, flow, item):
+        flow.add_lines(1, self.blank_line)
+        path = item.get('path')
+        if path and os.path.exists(path):
+            # 图片所在段落同样按 1.5 倍行距放大行高
+            height = min(self.figure_width * self._image_ratio(path) * NORMAL_LINE_MULTIPLE, flow.height)
+            flow.add_block(height)
+        else:
+            flow.add_lines(1, self.blank_line)
+        self._add_caption(flow, item.get('caption', ''), self.figure_caption)
+        if item.get('source'):
+            flow.add_lines(1, self.source_lines['figure'])
+        flow.add_lines(1, self.blank_line)
+
+    def _add_table(self, flow, item):
+        flow.add_lines(1, self.blank_line)
+        caption_size, caption_line, space_before, space_after = self.table_caption
+        caption_lines = self._count_lines(item.get('caption', ''), caption_size, self.content_width)
+        caption_height = space_before + caption_lines * caption_line + space_after
+        grid = getattr(item, 'grid', None)
+        rows = list(grid.iter_rows()) if grid is not None else (item.get('rows') or [])
+        if rows:
+            # 题注与表格首行同页（keep_with_next）；列宽与生成时的列宽规划一致
+            if grid is None:
+                grid = TableGrid(rows)
+            column_widths = plan_column_widths(grid, self.cell_size, self.content_width, self.cell_latin_advance)
+            for index, row in enumerate(rows):
+                lines = max(
+                    (
+                        self._count_lines(cell, self.cell_size, width - CELL_PADDING_PT, latin_advance=self.cell_latin_advance)
+                        for cell, width in zip(row, column_widths) if cell
+                    ),
+                    default=1
+                )
+                height = lines * self.cell_line
+                if index == 0:
+                    flow.add_block(caption_height + height)
+                else:
+                    flow.add_block(height)
+        else:
+            flow.add_block(caption_height)
+        if item.get('source'):
+            flow.add_lines(1, self.source_lines['table'])
+        flow.add_lines(1, self.blank_line)
+
+    def _add_formula(self, flow, item):
+        lines = [line for line in item.get('content', '').split('\n') if line.strip()]
+        if not lines:
+            return
+        flow.add_lines(1, self.blank_line)
+        # 公式各行 keep_with_next / keep_together，整体不拆页
+        flow.add_block(len(lines) * self.formula_line)
+        flow.add_lines(1, self.blank_line)
+
+    def estimate(self, content):
+        """
+        估算正文各级标题与特殊章节标题所在页码
+        :param content: 解析后的内容结构
+        :return: {书签名称: 页码}
+        """
+        pages = {}
+        chapters = content.get('chapters', [])
+        body_config = self.style_manager.get_page_number_config('body') or {}
+        flow = _PageFlow(body_config.get('start_from', 1), self.content_height)
+
+        body = self.body
+        for chapter_idx, chapter in enumerate(chapters):
+            chapter_num = chapter.get('number', chapter_idx + 1)
+            pages[chapter_bookmark(chapter_num)] = self._add_heading(
+                flow, 1, f'第{chapter_num}章 {chapter.get("title", "")}'
+            )
+            for item in chapter.get('content', []):
+                item_type = item['type']
+                if item_type == 'paragraph':
+                    self._add_text(flow, item['text'], body)
+                elif item_type in ('heading2', 'heading3'):
+                    pages[heading_bookmark(item['number'])] = self._add_heading(
+                        flow, 2 if item_type == 'heading2' else 3, f'{item["number"]} {item["text"]}'
+                    )
+                elif item_type == 'figure':
+                    self._add_figure(flow, item)
+                elif item_type == 'table':
+                    self._add_table(flow, item)
+                elif item_type == 'formula':
+                    self._add_formula(flow, item)
+
+        # 参考文献/致谢/附录各自新起一节（新页），页码接续正文
+        special_sections = (
+            ('references', [f'[{idx}] {ref.get("text", "")}' for idx, ref in enumerate(content.get('references', []), 1)]),
+            ('acknowledgements', content.get('acknowledgements', [])),
+            ('appendix', content.get('appendix', []))
+        )
+        for key, paragraphs in special_sections:
+            if not paragraphs:
+                continue
+            flow.new_page()
+            title_cfg = self.style_manager.config.get(key, {}).get('title', {})
+            title_size = title_cfg.get('size', 16)
+            pages[SPECIAL_SECTION_BOOKMARKS[key]] = flow.add_lines(
+                1,
+                self._natural_line(title_cfg.get('font', '黑体'), title_size),
+                space_after=title_cfg.get('space_after', 0)
+            )
+            metrics = self.special_texts[key]
+            for text in paragraphs:
+                if text:
+                    self._add_text(flow, text, metrics)
+        return pages
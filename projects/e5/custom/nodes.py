@@ -0,0 +1,332 @@
+"""
+内容节点 - 解析结果的轻量节点类型（__slots__），兼容原有的 dict 访问方式
+"""
+import sys
+from collections.abc import MutableMapping
+
+from .citations import CitationIndex, find_citation_spans
+
+
+class ContentNode(MutableMapping):
+    """
+    节点基类
+    字段存放在 __slots__ 中；同时实现映射接口，
+    旧代码中的 item['type']、item.get('path')、dict(item) 等写法无需修改
+    所有节点的字段都以 'type' 开头，与 dict 结构的键集合一致
+    """
+    __slots__ = ('extra',)
+    type = None
+    _fields = ()
+
+    def __init__(self, **values):
+        self.extra = None
+        values.pop('type', None)
+        for key in self._fields:
+            if key != 'type':
+                setattr(self, key, values.pop(key, None))
+        if values:
+            self.extra = values
+
+    def __getitem__(self, key):
+        if key in self._fields:
+            return getattr(self, key)
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        """
+        字段访问走快速路径；未给出的字段（值为 None）视为缺失并返回 default，
+        与解析器输出的 dict 不含可选键时 item.get('caption', '') 的结果一致
+        """
+        if key in self._fields:
+            value = getattr(self, key)
+            return default if value is None else value
+        if self.extra is not None:
+            return self.extra.get(key, default)
+        return default
+
+    def __setitem__(self, key, value):
+        if key == 'type':
+            raise KeyError('节点类型不可修改')
+        if key in self._fields:
+            setattr(self, key, value)
+            return
+        if self.extra is None:
+            self.extra = {}
+        self.extra[key] = value
+
+    def __delitem__(self, key):
+        if self.extra is not None and key in self.extra:
+            del self.extra[key]
+            return
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self._fields or (self.extra is not None and key in self.extra)
+
+    def __iter__(self):
+        yield from self._fields
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self):
+        return len(self._fields) + (len(self.extra) if self.extra else 0)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({dict(self)!r})'
+
+    def to_dict(self):
+        """转换为普通 dict（递归处理章节内容），用于 JSON 序列化等场景"""
+        return {key: _to_plain(self[key]) for key in self}
+
+
+class ChapterNode(ContentNode):
+    """章节"""
+    __slots__ = ('number', 'title', 'content')
+    type = 'chapter'
+    _fields = ('type', 'number', 'title', 'content')
+
+
+class ParagraphNode(ContentNode):
+    """正文段落（citations 为解析时预先计算的引用位置）"""
+    __slots__ = ('text', 'citations')
+    type = 'paragraph'
+    _fields = ('type', 'text', 'citations')
+
+
+class HeadingNode(ContentNode):
+    """二/三级标题"""
+    __slots__ = ('number', 'text')
+    level = None
+    _fields = ('type', 'number', 'text')
+
+
+class Heading2Node(HeadingNode):
+    """二级标题"""
+    __slots__ = ()
+    type = 'heading2'
+    level = 2
+
+
+class Heading3Node(HeadingNode):
+    """三级标题"""
+    __slots__ = ()
+    type = 'heading3'
+    level = 3
+
+
+class FigureNode(ContentNode):
+    """图片"""
+    __slots__ = ('number', 'caption', 'source', 'path')
+    type = 'figure'
+    _fields = ('type', 'number', 'caption', 'source', 'path')
+
+
+class TableGrid:
+    """
+    补齐列数后的紧凑表格数据
+    cells 为按行展开的单一元组（单元格字符串已 intern），列可通过切片直接取出
+    """
+    __slots__ = ('cells', 'width', 'height', 'col_max_len')
+
+    def __init__(self, rows):
+        width = max((len(row) for row in rows), default=0)
+        cells = []
+        for row in rows:
+            cells.extend(sys.intern(cell) for cell in row)
+            cells.extend([''] * (width - len(row)))
+        self.cells = tuple(cells)
+        self.width = width
+        self.height = len(rows)
+        self.col_max_len = tuple(
+            max(map(len, self.cells[col::width]), default=0) for col in range(width)
+        )
+
+    def row(self, index):
+        """第 index 行（元组）"""
+        start = index * self.width
+        return self.cells[start:start + self.width]
+
+    def column(self, index):
+        """第 index 列（元组）"""
+        return self.cells[index::self.width]
+
+    def iter_rows(self):
+        width = self.width
+        if not width:
+            return
+        cells = self.cells
+        for start in range(0, len(cells), width):
+            yield cells[start:start + width]
+
+    def to_rows(self):
+        """转换为行列表"""
+        return [list(row) for row in self.iter_rows()]
+
+
+class TableNode(ContentNode):
+    """
+    表格（数据保存在 grid 中，rows 为兼容旧结构的视图）
+    has_header 为 None 时首行是否为表头由表格样式的 header_row 决定
+    """
+    __slots__ = ('number', 'caption', 'source', 'grid', 'has_header')
+    type = 'table'
+    _fields = ('type', 'number', 'caption', 'source', 'rows', 'has_header')
+
+    @property
+    def rows(self):
+        """
+        各行单元格的只读快照（元组的元组，列数已补齐）
+        grid 不可变，修改表格需整体赋值：node.rows = 新的行列表
+        """
+        grid = self.grid
+        return tuple(grid.iter_rows()) if grid is not None else None
+
+    @rows.setter
+    def rows(self, value):
+        self.grid = TableGrid(value) if value is not None else None
+
+
+class FormulaNode(ContentNode):
+    """公式"""
+    __slots__ = ('number', 'content')
+    type = 'formula'
+    _fields = ('type', 'number', 'content')
+
+
+class ReferenceNode(ContentNode):
+    """参考文献条目"""
+    __slots__ = ('index', 'original_index', 'text', 'raw')
+    type = 'reference'
+    _fields = ('type', 'index', 'original_index', 'text', 'raw')
+
+
+def _to_plain(value):
+    if isinstance(value, ContentNode) or hasattr(value, 'to_dict'):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_to_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _to_plain(item) for key, item in value.items()}
+    return value
+
+
+def content_to_dict(content):
+    """将解析结果整体转换为纯 dict/list 结构"""
+    return _to_plain(content)
+
+
+# 章节内容中的节点类型
+CONTENT_NODE_TYPES = {
+    node_class.type: node_class
+    for node_class in (ParagraphNode, Heading2Node, Heading3Node, FigureNode, TableNode, FormulaNode)
+}
+
+
+def _expect(value, expected_type, where):
+    if not isinstance(value, expected_type):
+        types = expected_type if isinstance(expected_type, tuple) else (expected_type,)
+        expected = ' 或 '.join(t.__name__ for t in types)
+        raise ValueError(f'{where} 应为 {expected}，实际为 {type(value).__name__}')
+    return value
+
+
+def _optional_text(values, key, where):
+    """可选的文本字段：缺失或为 null 时存为 ''，否则须为字符串"""
+    value = values.get(key)
+    values[key] = '' if value is None else _expect(value, str, f'{where}.{key}')
+
+
+def _content_node(item, where):
+    """
+    由 dict 重建章节内容节点：段落引用位置按文本重新计算，表格重建 TableGrid，
+    缺少的可选文本（题注、公式内容）存为 ''
+    """
+    _expect(item, dict, where)
+    node_class = CONTENT_NODE_TYPES.get(item.get('type'))
+    if node_class is None:
+        raise ValueError(f'{where} 的类型未知: {item.get("type")!r}')
+    values = {key: value for key, value in item.items() if key != 'type'}
+    if node_class is ParagraphNode:
+        values['citations'] = find_citation_spans(_expect(values.get('text'), str, f'{where}.text'))
+    elif issubclass(node_class, HeadingNode):
+        for key in ('number', 'text'):
+            _expect(values.get(key), str, f'{where}.{key}')
+    elif node_class is TableNode:
+        # content_to_dict 保留 rows 的元组形式，经 JSON 传输后为列表
+        rows = _expect(values.get('rows') or [], (list, tuple), f'{where}.rows')
+        for row_pos, row in enumerate(rows):
+            for cell in _expect(row, (list, tuple), f'{where}.rows[{row_pos}]'):
+                _expect(cell, str, f'{where}.rows[{row_pos}] 的单元格')
+        if values.get('has_header') is not None:
+            _expect(values['has_header'], bool, f'{where}.has_header')
+        _optional_text(values, 'caption', where)
+    elif node_class is FormulaNode:
+        _optional_text(values, 'content', where)
+    elif node_class is FigureNode:
+        if values.get('path') is not None:
+            _expect(values['path'], str, f'{where}.path')
+        _optional_text(values, 'caption', where)
+    if values.get('source') is not None:
+        _expect(values['source'], str, f'{where}.source')
+    return node_class(**values)
+
+
+def empty_content():
+    """解析结果的空结构（各部分齐全，内容为空）"""
+    return {
+        'title': '',
+        'abstract': {
+            'content': [],
+            'keywords': []
+        },
+        'abstract_en': {
+            'content': [],
+            'keywords': []
+        },
+        'chapters': [],
+        'references': [],
+        'acknowledgements': [],
+        'appendix': []
+    }
+
+
+def content_from_dict(data):
+    """
+    由 content_to_dict() 的结果（如经 JSON 传输的解析内容）重建与解析器输出相同的结构：
+    章节与参考文献恢复为节点，段落引用位置与文档引用索引重新计算
+    :raises ValueError: 结构不符合解析结果的格式
+    """
+    _expect(data, dict, '内容')
+    # 缺少的部分按解析器的空结构补齐，值为 null 的部分视为缺失
+    content = empty_content()
+    content.update((key, value) for key, value in data.items() if value is not None)
+    chapters = []
+    for chapter_pos, chapter in enumerate(_expect(data.get('chapters') or [], list, 'chapters')):
+        where = f'chapters[{chapter_pos}]'
+        _expect(chapter, dict, where)
+        items = _expect(chapter.get('content') or [], list, f'{where}.content')
+        values = {key: value for key, value in chapter.items() if key != 'content'}
+        _optional_text(values, 'title', where)
+        values['content'] = [
+            _content_node(item, f'{where}.content[{item_pos}]') for item_pos, item in enumerate(items)
+        ]
+        chapters.append(ChapterNode(**values))
+    references = []
+    for ref_pos, ref in enumerate(_expect(data.get('references') or [], list, 'references')):
+        _expect(ref, dict, f'references[{ref_pos}]')
+        _expect(ref.get('text') or '', str, f'references[{ref_pos}].text')
+        references.append(ReferenceNode(**ref))
+    for key in ('acknowledgements', 'appendix'):
+        _expect(content[key], list, key)
+    for key in ('abstract', 'abstract_en'):
+        section = content[key] = {'content': [], 'keywords': [], **_expect(content[key], dict, key)}
+        for field in ('content', 'keywords'):
+            _expect(section[field], list, f'{key}.{field}')
+    _expect(content['title'], str, 'title')
+
+    content['chapters'] = chapters
+    content['references'] = references
+    content['citations'] = CitationIndex.build(chapters, len(references))
+    return content
@@ -0,0 +1,40 @@
+"""
+题注与公式编号 - 编号模板（如 图{chapter}.{seq}、({chapter}.{seq})）编译一次为片段序列；
+SEQ 域的显示结果由生成器按域名称顺序计数得出，与 Word 更新域后的编号一致
+"""
+import re
+from functools import lru_cache
+
+
+SEQ = 'SEQ'
+
+# 模板片段类型：text 为原样文本，chapter 为章节号，seq 为 SEQ 域（{index} 与 {seq} 相同）
+TEXT = 'text'
+CHAPTER = 'chapter'
+SEQUENCE = 'seq'
+_PLACEHOLDER_PATTERN = re.compile(r'(\{chapter\}|\{seq\}|\{index\})')
+_PLACEHOLDERS = {'{chapter}': CHAPTER, '{seq}': SEQUENCE, '{index}': SEQUENCE}
+
+
+@lru_cache(maxsize=None)
+def compile_numbering_template(template):
+    """
+    编译编号模板（相同模板只编译一次）
+    :return: ((类型, 文本), ...)
+    """
+    return tuple(
+        (_PLACEHOLDERS.get(token, TEXT), token)
+        for token in _PLACEHOLDER_PATTERN.split(template)
+        if token
+    )
+
+
+def seq_field_name(seq_type, chapter_num=None, chapter_based=False):
+    """SEQ 域名称：按章节编号时带章节号（如 Figure_2），各章分别从 1 计数"""
+    if not chapter_based or chapter_num is None:
+        return seq_type
+    return f'{seq_type}_{chapter_num}'
+
+
+def seq_instruction(seq_name):
+    return f' SEQ {seq_name} \\* ARABIC '
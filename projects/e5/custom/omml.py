@@ -0,0 +1,186 @@
+"""
+公式 OMML 构建 - 公式文本先切分为记号列表，再由记号生成 m:oMath；
+相邻的普通字符记号合并为一个 m:r，构建结果按 (公式文本, 字体, 字号) 缓存，重复的公式直接深拷贝；
+可再接一层磁盘渲染缓存（RenderCache），序列化的片段跨文档、跨进程复用
+"""
+import sys
+from collections import namedtuple
+from copy import deepcopy
+
+from docx.oxml import OxmlElement, parse_xml
+from docx.oxml.ns import qn
+from lxml import etree
+
+from .render_cache import source_fingerprint
+
+
+# 按正体排版的函数名
+FUNCTION_NAMES = frozenset({'sin', 'cos', 'tan', 'floor', 'log', 'ln', 'exp', 'max', 'min', 'ReLU', 'Concat'})
+
+# 记号类型：word 为字母串（变量/函数名），char 为单个普通字符（数字、运算符、空格等），sub 为带下标的变量
+WORD = 'word'
+CHAR = 'char'
+SUB = 'sub'
+FormulaToken = namedtuple('FormulaToken', ['kind', 'text', 'italic', 'sub_text', 'sub_italic'], defaults=(None, False))
+
+# 缓存的公式数上限，超出时淘汰最早加入的条目
+OMML_CACHE_SIZE = 4096
+_XML_SPACE = qn('xml:space')
+OMML_CACHE_NAMESPACE = 'omml'
+_code_version = None
+
+
+def omml_code_version():
+    """本模块源码的指纹，作为磁盘缓存键的一部分（构建逻辑改动后旧条目失效）"""
+    global _code_version
+    if _code_version is None:
+        _code_version = source_fingerprint(sys.modules[__name__])
+    return _code_version
+
+
+def tokenize_formula(text):
+    """
+    将一行公式文本切分为记号
+    x_i / W_12 等写法为下标；字母串中函数名为正体、其余为斜体；其他字符逐个成为 char 记号
+    """
+    tokens = []
+    length = len(text)
+    i = 0
+    while i < length:
+        # 处理下标：x_i
+        if i < length - 2 and text[i].isalnum():
+            j = i
+            while j < length and text[j].isalnum():
+                j += 1
+
+            if j < length and text[j] == '_':
+                base = text[i:j]
+                k = j + 1
+                while k < length and text[k].isalnum():
+                    k += 1
+                subscript = text[j + 1:k]
+                tokens.append(FormulaToken(
+                    SUB, base, base.isalpha() and base not in FUNCTION_NAMES, subscript, subscript.isalpha()
+                ))
+                i = k
+                continue
+
+        # 处理普通单词
+        if text[i].isalpha():
+            j = i
+            while j < length and text[j].isalpha():
+                j += 1
+            word = text[i:j]
+            tokens.append(FormulaToken(WORD, word, word not in FUNCTION_NAMES))
+            i = j
+            continue
+
+        # 其他字符
+        tokens.append(FormulaToken(CHAR, text[i], False))
+        i += 1
+    return tokens
+
+
+def coalesce_tokens(tokens):
+    """将相邻的 char 记号合并为一个（如数字串与运算符 "12 + 3"），减少 m:r 数量"""
+    merged = []
+    for token in tokens:
+        if token.kind == CHAR and merged and merged[-1].kind == CHAR:
+            merged[-1] = merged[-1]._replace(text=merged[-1].text + token.text)
+        else:
+            merged.append(token)
+    return merged
+
+
+class OmmlBuilder:
+    """由公式文本构建 m:oMath，带构建结果缓存"""
+
+    def __init__(self, coalesce=True, cache_size=OMML_CACHE_SIZE, store=None):
+        """
+        :param coalesce: 是否合并相邻的普通字符记号
+        :param cache_size: 缓存的公式数上限，0 表示不缓存
+        :param store: 磁盘渲染缓存（RenderCache），内存缓存未命中时先查这里，None 表示不使用
+        """
+        self.coalesce = coalesce
+        self.cache_size = cache_size
+        self.store = store
+        self._cache = {}
+
+    def build(self, text, font_name, font_size):
+        """
+        构建一行公式的 m:oMath（每次返回新的副本，可直接插入文档）
+        :param font_name: 公式字体
+        :param font_size: 字号（半磅，字符串）
+        """
+        if not self.cache_size:
+            return self._load_or_build(text, font_name, font_size)
+        key = (text, font_name, font_size)
+        cached = self._cache.get(key)
+        if cached is None:
+            if len(self._cache) >= self.cache_size:
+                del self._cache[next(iter(self._cache))]
+            cached = self._cache[key] = self._load_or_build(text, font_name, font_size)
+        return deepcopy(cached)
+
+    def _load_or_build(self, text, font_name, font_size):
+        """先查磁盘缓存，未命中时构建并写回"""
+        if self.store is None:
+            return self._build(text, font_name, font_size)
+        key = self.store.key(
+            OMML_CACHE_NAMESPACE, omml_code_version(), text, font_name, font_size, self.coalesce
+        )
+        data = self.store.get(key)
+        if data is not None:
+            return parse_xml(data)
+        o_math = self._build(text, font_name, font_size)
+        self.store.put(key, etree.tostring(o_math, encoding='utf-8'))
+        return o_math
+
+    def _build(self, text, font_name, font_size):
+        tokens = tokenize_formula(text)
+        if self.coalesce:
+            tokens = coalesce_tokens(tokens)
+        o_math = OxmlElement('m:oMath')
+        for token in tokens:
+            if token.kind == SUB:
+                s_sub = OxmlElement('m:sSub')
+                e = OxmlElement('m:e')
+                e.append(self._make_run(token.text, font_name, font_size, token.italic))
+                s_sub.append(e)
+                sub = OxmlElement('m:sub')
+                sub.append(self._make_run(token.sub_text, font_name, font_size, token.sub_italic))
+                s_sub.append(sub)
+                o_math.append(s_sub)
+            else:
+                o_math.append(self._make_run(token.text, font_name, font_size, token.italic))
+        return o_math
+
+    def _make_run(self, text, font_name, font_size, italic=False):
+        """构建一个 m:r（m:rPr 斜体标记、w:rPr 字体字号与 m:t 文本）"""
+        r = OxmlElement('m:r')
+
+        m_rpr = OxmlElement('m:rPr')
+        if italic:
+            sty = OxmlElement('m:sty')
+            sty.set(qn('m:val'), 'i')
+            m_rpr.append(sty)
+        r.append(m_rpr)
+
+        w_rpr = OxmlElement('w:rPr')
+        r_fonts = OxmlElement('w:rFonts')
+        r_fonts.set(qn('w:ascii'), font_name)
+        r_fonts.set(qn('w:hAnsi'), font_name)
+        r_fonts.set(qn('w:eastAsia'), font_name)
+        w_rpr.append(r_fonts)
+        sz = OxmlElement('w:sz')
+        sz.set(qn('w:val'), font_size)
+        w_rpr.append(sz)
+        r.append(w_rpr)
+
+        t = OxmlElement('m:t')
+        t.text = text
+        # 合并后的文本可能以空格开头或结尾
+        if len(text) > 1 and len(text.strip()) < len(text):
+            t.set(_XML_SPACE, 'preserve')
+        r.append(t)
+        return r
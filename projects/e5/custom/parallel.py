@@ -0,0 +1,90 @@
+"""
+并行渲染章节 - 每章在 worker 进程中生成为独立的 XML 片段（附带图片数据），
+由主进程按顺序合并，合并时重新编号书签、去重图片并改写关系 ID
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+from docx.oxml.ns import qn
+from lxml import etree
+
+from .xml_builder import detach_blocks
+
+
+_BLIP = qn('a:blip')
+_EMBED = qn('r:embed')
+
+# worker 进程内的生成器（由 _init_chapter_worker 创建）
+_worker_formatter = None
+
+
+class ChapterFragment:
+    """
+    单章的渲染结果
+    xml: 包装在 w:body 元素中的章节块（书签 ID 从 1 开始，图片关系 ID 为 worker 文档内的 ID）
+    images: worker 文档内的图片关系 ID -> 源图片路径（主进程按路径并入图片，与顺序生成一样按内容去重）
+    """
+    __slots__ = ('xml', 'images')
+
+    def __init__(self, xml, images):
+        self.xml = xml
+        self.images = images
+
+
+def _init_chapter_worker(config, named_styles, backend, reference_targets, render_cache_options=None):
+    """
+    进程池初始化：按同一份配置创建生成器
+    :param render_cache_options: (缓存目录, 大小上限)，与主进程共用同一个磁盘渲染缓存；None 表示不使用
+    """
+    global _worker_formatter
+    from .formatter import USTCFormatter
+    from .render_cache import RenderCache
+    from .styles import USTCStyleManager
+
+    _worker_formatter = USTCFormatter(
+        USTCStyleManager.from_config(config),
+        named_styles=named_styles,
+        backend=backend,
+        render_cache=RenderCache(*render_cache_options) if render_cache_options else None
+    )
+    _worker_formatter.reference_targets = reference_targets
+
+
+def _render_chapter(args):
+    """在 worker 中将一章渲染到空白底稿并取出片段"""
+    chapter, chapter_idx = args
+    formatter = _worker_formatter
+    reference_targets = formatter.reference_targets
+    formatter._reset_document()
+    formatter.reference_targets = reference_targets
+    formatter._generate_chapter(chapter, chapter_idx)
+
+    wrapper = detach_blocks(formatter.doc)
+    if wrapper is None:
+        return ChapterFragment(b'', {})
+    images = {}
+    for blip in wrapper.iter(_BLIP):
+        rId = blip.get(_EMBED)
+        images[rId] = formatter.image_sources[rId]
+    return ChapterFragment(etree.tostring(wrapper, encoding='utf-8'), images)
+
+
+def render_chapter_fragments(formatter, chapters, workers):
+    """
+    在进程池中渲染各章，按章节顺序逐个返回 ChapterFragment
+    :param formatter: 主进程的生成器（提供配置、渲染选项、参考文献书签映射与渲染缓存位置）
+    :param chapters: 章节列表
+    :param workers: worker 进程数
+    """
+    render_cache = formatter.render_cache
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_chapter_worker,
+        initargs=(
+            formatter.style_manager.config,
+            formatter.named_styles,
+            formatter.backend,
+            formatter.reference_targets,
+            (render_cache.cache_dir, render_cache.max_bytes) if render_cache is not None else None
+        )
+    ) as executor:
+        yield from executor.map(_render_chapter, [(chapter, idx) for idx, chapter in enumerate(chapters)])
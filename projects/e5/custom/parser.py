@@ -5,6 +5,41 @@ import os
 import re
 from glob import glob
 
+from .citations import CitationIndex, find_citation_spans
+from .nodes import (
+    ChapterNode,
+    ParagraphNode,
+    Heading2Node,
+    Heading3Node,
+    FigureNode,
+    TableNode,
+    FormulaNode,
+    ReferenceNode,
+    empty_content,
+)
+
+
+CHAPTER_PREFIX_PATTERN = re.compile(r'^第[一二三四五六七八九十\d]+章')
+CHAPTER_PATTERN = re.compile(r'^第([一二三四五六七八九十\d]+)章\s+(.+)$')
+NUMBERED_CHAPTER_PATTERN = re.compile(r'^(\d+)\s+(.+)$')
+FIGURE_MARKER_PATTERN = re.compile(r'\[FIGURE:([\d\-]+)\]')
+TABLE_MARKER_PATTERN = re.compile(r'\[TABLE:([\d\-]+)\]')
+FORMULA_MARKER_PATTERN = re.compile(r'\[FORMULA:([\d\-]+)\]')
+# 图/表/公式标记：(行首前缀, 块类型, 标记正则)
+BLOCK_MARKERS = (
+    ('[FIGURE:', 'figure', FIGURE_MARKER_PATTERN),
+    ('[TABLE:', 'table', TABLE_MARKER_PATTERN),
+    ('[FORMULA:', 'formula', FORMULA_MARKER_PATTERN),
+)
+# 各部分的结束标记：(英文标记前缀（不区分大小写）, 中文标记)
+SECTION_END_MARKERS = {
+    'references': ('[/REFERENCES]', None),
+    'acknowledgements': ('[/ACKNOWLEDGEMENTS]', '[/致谢]'),
+    'appendix': ('[/APPENDIX]', '[/附录]'),
+}
+# 可能引起部分切换的行首字符（标记、关键词、各部分标题及其括号）
+BLOCK_LEAD_CHARS = frozenset('[［【(:：]］】)aAkKrR参致附摘关第')
+
 
 class USTCContentParser:
     """解析论文内容结构"""
@@ -34,24 +69,29 @@ class USTCContentParser:
         :return: 解析后的内容结构
         """
         lines = text.split('\n')
-        content = {
-            'title': '',
-            'abstract': {
-                'content': [],
-                'keywords': []
-            },
-            'abstract_en': {
-                'content': [],
-                'keywords': []
-            },
-            'chapters': [],
-            'references': [],
-            'acknowledgements': [],
-            'appendix': []
-        }
+        content, references_buffer = self._parse_lines(lines)
+        content['references'] = self._build_references_list(references_buffer)
+        content['citations'] = CitationIndex.build(content['chapters'], len(content['references']))
+        return content
 
-        current_section = None
-        current_chapter = None
+    def _paragraph_node(self, para_text):
+        """创建正文段落节点，同时记录引用位置"""
+        return ParagraphNode(text=para_text, citations=find_citation_spans(para_text))
+
+    def _empty_content(self):
+        """返回空的内容结构"""
+        return empty_content()
+
+    def _parse_lines(self, lines, current_section=None, current_chapter=None, detect_title=True):
+        """
+        逐行解析的状态机，可从指定状态开始（供增量解析按块调用）
+        :param lines: 文本行列表
+        :param current_section: 起始所在部分
+        :param current_chapter: 起始所在章节（增量解析时为占位章节）
+        :param detect_title: 首行是否识别为论文题目
+        :return: (内容结构, 参考文献原始条目列表)
+        """
+        content = self._empty_content()
         current_paragraph = []
         references_buffer = []
         current_reference_lines = []
@@ -73,10 +113,7 @@ class USTCContentParser:
                     elif current_section == 'abstract_en':
                         content['abstract_en']['content'].append(para_text)
                     elif current_section == 'body' and current_chapter:
-                        current_chapter['content'].append({
-                            'type': 'paragraph',
-                            'text': para_text
-                        })
+                        current_chapter['content'].append(self._paragraph_node(para_text))
                     elif current_section == 'acknowledgements':
                         content['acknowledgements'].append(para_text)
                     elif current_section == 'appendix':
@@ -86,19 +123,19 @@ class USTCContentParser:
                 continue
 
             # 识别标题（论文题目）
-            if i == 0 and not line.startswith('#'):
+            if i == 0 and detect_title and not line.startswith('#'):
                 content['title'] = line
                 i += 1
                 continue
 
             # 识别摘要标记
-            if line.startswith('[ABSTRACT]') or line == '摘要':
+            if self._is_abstract_marker(line):
                 current_section = 'abstract'
                 i += 1
                 continue
 
             # 识别中文关键词
-            if line.startswith('关键词：') or line.startswith('关键词:'):
+            if self._is_keywords_line(line):
                 keywords_text = line.split('：', 1)[-1].split(':', 1)[-1]
                 keywords = [k.strip() for k in re.split('[;；]', keywords_text) if k.strip()]
                 content['abstract']['keywords'] = keywords
@@ -107,13 +144,13 @@ class USTCContentParser:
                 continue
 
             # 识别英文摘要标记
-            if line.upper().startswith('[ABSTRACT_EN]') or line.upper() == 'ABSTRACT':
+            if self._is_abstract_en_marker(line):
                 current_section = 'abstract_en'
                 i += 1
                 continue
 
             # 识别英文关键词
-            if line.lower().startswith('key words:') or line.lower().startswith('keywords:'):
+            if self._is_keywords_en_line(line):
                 keywords_text = line.split(':', 1)[-1]
                 keywords = [k.strip() for k in re.split('[;；]', keywords_text) if k.strip()]
                 content['abstract_en']['keywords'] = keywords
@@ -122,9 +159,9 @@ class USTCContentParser:
                 continue
 
             # 识别正文开始
-            if line.startswith('[BODY]') or re.match(r'^第[一二三四五六七八九十\d]+章', line):
+            if self._is_body_marker(line) or CHAPTER_PREFIX_PATTERN.match(line):
                 current_section = 'body'
-                if re.match(r'^第[一二三四五六七八九十\d]+章', line):
+                if CHAPTER_PREFIX_PATTERN.match(line):
                     # 已经是章节标题，不需要跳过
                     pass
                 else:
@@ -135,10 +172,7 @@ class USTCContentParser:
             if self._is_references_header(line):
                 if current_paragraph and current_section == 'body' and current_chapter:
                     para_text = ' '.join(current_paragraph)
-                    current_chapter['content'].append({
-                        'type': 'paragraph',
-                        'text': para_text
-                    })
+                    current_chapter['content'].append(self._paragraph_node(para_text))
                     current_paragraph = []
                 current_section = 'references'
                 current_reference_lines = []
@@ -146,7 +180,7 @@ class USTCContentParser:
                 continue
 
             if current_section == 'references':
-                if line.upper().startswith('[/REFERENCES]'):
+                if self._is_section_end(line, 'references'):
                     if current_reference_lines:
                         references_buffer.append(' '.join(current_reference_lines).strip())
                         current_reference_lines = []
@@ -171,10 +205,7 @@ class USTCContentParser:
                 if current_paragraph:
                     para_text = ' '.join(current_paragraph)
                     if current_section == 'body' and current_chapter:
-                        current_chapter['content'].append({
-                            'type': 'paragraph',
-                            'text': para_text
-                        })
+                        current_chapter['content'].append(self._paragraph_node(para_text))
                     elif current_section == 'acknowledgements':
                         content['acknowledgements'].append(para_text)
                     elif current_section == 'appendix':
@@ -184,7 +215,7 @@ class USTCContentParser:
                 i += 1
                 continue
 
-            if line.upper().startswith('[/ACKNOWLEDGEMENTS]') or line == '[/致谢]':
+            if self._is_section_end(line, 'acknowledgements'):
                 if current_paragraph and current_section == 'acknowledgements':
                     content['acknowledgements'].append(' '.join(current_paragraph))
                     current_paragraph = []
@@ -200,10 +231,7 @@ class USTCContentParser:
                 if current_paragraph:
                     para_text = ' '.join(current_paragraph)
                     if current_section == 'body' and current_chapter:
-                        current_chapter['content'].append({
-                            'type': 'paragraph',
-                            'text': para_text
-                        })
+                        current_chapter['content'].append(self._paragraph_node(para_text))
                     elif current_section == 'acknowledgements':
                         content['acknowledgements'].append(para_text)
                     elif current_section == 'appendix':
@@ -213,7 +241,7 @@ class USTCContentParser:
                 i += 1
                 continue
 
-            if line.upper().startswith('[/APPENDIX]') or line == '[/附录]':
+            if self._is_section_end(line, 'appendix'):
                 if current_paragraph and current_section == 'appendix':
                     content['appendix'].append(' '.join(current_paragraph))
                     current_paragraph = []
@@ -222,31 +250,19 @@ class USTCContentParser:
                 continue
 
             # 识别一级标题（章）
-            match1 = re.match(r'^第([一二三四五六七八九十\d]+)章\s+(.+)$', line)
-            match2 = re.match(r'^(\d+)\s+(.+)$', line)
-            match3 = re.match(r'^#+\s+(.+)$', line)  # Markdown 格式
-
-            if match1 or (match2 and current_section == 'body'):
+            chapter_heading = self._match_chapter_heading(line, current_section == 'body')
+            if chapter_heading:
                 if current_paragraph and current_chapter:
                     para_text = ' '.join(current_paragraph)
-                    current_chapter['content'].append({
-                        'type': 'paragraph',
-                        'text': para_text
-                    })
+                    current_chapter['content'].append(self._paragraph_node(para_text))
                     current_paragraph = []
 
-                if match1:
-                    chapter_num = self._chinese_to_arabic(match1.group(1))
-                    chapter_title = match1.group(2).strip()
-                elif match2:
-                    chapter_num = int(match2.group(1))
-                    chapter_title = match2.group(2).strip()
-
-                current_chapter = {
-                    'number': chapter_num,
-                    'title': chapter_title,
-                    'content': []
-                }
+                chapter_num, chapter_title = chapter_heading
+                current_chapter = ChapterNode(
+                    number=chapter_num,
+                    title=chapter_title,
+                    content=[]
+                )
                 content['chapters'].append(current_chapter)
                 i += 1
                 continue
@@ -256,17 +272,13 @@ class USTCContentParser:
             if match_h2 and current_chapter:
                 if current_paragraph:
                     para_text = ' '.join(current_paragraph)
-                    current_chapter['content'].append({
-                        'type': 'paragraph',
-                        'text': para_text
-                    })
+                    current_chapter['content'].append(self._paragraph_node(para_text))
                     current_paragraph = []
 
-                current_chapter['content'].append({
-                    'type': 'heading2',
-                    'number': match_h2.group(1),
-                    'text': match_h2.group(2).strip()
-                })
+                current_chapter['content'].append(Heading2Node(
+                    number=match_h2.group(1),
+                    text=match_h2.group(2).strip()
+                ))
                 i += 1
                 continue
 
@@ -275,144 +287,80 @@ class USTCContentParser:
             if match_h3 and current_chapter:
                 if current_paragraph:
                     para_text = ' '.join(current_paragraph)
-                    current_chapter['content'].append({
-                        'type': 'paragraph',
-                        'text': para_text
-                    })
+                    current_chapter['content'].append(self._paragraph_node(para_text))
                     current_paragraph = []
 
-                current_chapter['content'].append({
-                    'type': 'heading3',
-                    'number': match_h3.group(1),
-                    'text': match_h3.group(2).strip()
-                })
+                current_chapter['content'].append(Heading3Node(
+                    number=match_h3.group(1),
+                    text=match_h3.group(2).strip()
+                ))
                 i += 1
                 continue
 
-            # 识别图片标记 [FIGURE:1-1]
-            if line.startswith('[FIGURE:'):
-                match_fig = re.match(r'\[FIGURE:([\d\-]+)\]', line)
-                if match_fig and current_chapter:
-                    if current_paragraph:
-                        para_text = ' '.join(current_paragraph)
-                        current_chapter['content'].append({
-                            'type': 'paragraph',
-                            'text': para_text
-                        })
-                        current_paragraph = []
-
-                    # 读取下一行获取标题和来源
+            # 识别图/表/公式标记 [FIGURE:1-1]、[TABLE:1-1]、[FORMULA:2-1]
+            block_marker = self._match_block_marker(line)
+            if block_marker:
+                block_kind, block_number = block_marker
+                if block_number is None or not current_chapter:
                     i += 1
-                    if i < len(lines):
-                        caption_line = lines[i].strip()
+                    continue
+                if current_paragraph:
+                    para_text = ' '.join(current_paragraph)
+                    current_chapter['content'].append(self._paragraph_node(para_text))
+                    current_paragraph = []
+
+                block_end = self._block_end(lines, i, block_kind)
+                if block_kind == 'figure':
+                    # 标记行的下一行为 标题|来源|图片文件名
+                    if i + 1 < len(lines):
+                        caption_line = lines[i + 1].strip()
                         parts = [part.strip() for part in caption_line.split('|')]
                         caption = parts[0] if parts else ''
                         source = parts[1] if len(parts) > 1 and parts[1] else None
                         image_hint = parts[2] if len(parts) > 2 and parts[2] else None
 
                         # 自动映射图片路径，支持多种扩展名及自定义文件名
-                        figure_number = match_fig.group(1)
                         image_path = self._resolve_figure_image_path(
-                            figure_number,
+                            block_number,
                             filename_hint=image_hint
                         )
 
-                        current_chapter['content'].append({
-                            'type': 'figure',
-                            'number': match_fig.group(1),
-                            'caption': caption,
-                            'source': source,
-                            'path': image_path
-                        })
-
-                    # 跳过 [/FIGURE]
-                    i += 1
-                    if i < len(lines) and lines[i].strip() == '[/FIGURE]':
-                        i += 1
-                    continue
-                i += 1
-                continue
-
-            # 识别表格标记 [TABLE:1-1]
-            if line.startswith('[TABLE:'):
-                match_tbl = re.match(r'\[TABLE:([\d\-]+)\]', line)
-                if match_tbl and current_chapter:
-                    if current_paragraph:
-                        para_text = ' '.join(current_paragraph)
-                        current_chapter['content'].append({
-                            'type': 'paragraph',
-                            'text': para_text
-                        })
-                        current_paragraph = []
-
-                    # 读取表格内容
-                    i += 1
-                    table_lines = []
+                        current_chapter['content'].append(FigureNode(
+                            number=block_number,
+                            caption=caption,
+                            source=source,
+                            path=image_path
+                        ))
+                elif block_kind == 'table':
+                    # 第一行是标题|来源
                     caption = ''
                     source = None
-
-                    # 第一行是标题|来源
-                    if i < len(lines):
-                        caption_line = lines[i].strip()
-                        parts = caption_line.split('|')
+                    if i + 1 < len(lines):
+                        parts = lines[i + 1].strip().split('|')
                         caption = parts[0] if len(parts) > 0 else ''
                         source = parts[1] if len(parts) > 1 else None
-                        i += 1
-
-                    # 读取表格数据行
-                    while i < len(lines):
-                        tbl_line = lines[i].strip()
-                        if tbl_line == '[/TABLE]':
-                            break
-                        if tbl_line and not tbl_line.startswith('['):
-                            table_lines.append(tbl_line)
-                        i += 1
 
-                    # 解析表格数据
+                    # 其后直到 [/TABLE] 为表格数据行
                     rows = []
-                    for tbl_line in table_lines:
-                        cells = [cell.strip() for cell in tbl_line.split('|')]
-                        rows.append(cells)
-
-                    current_chapter['content'].append({
-                        'type': 'table',
-                        'number': match_tbl.group(1),
-                        'caption': caption,
-                        'source': source,
-                        'rows': rows
-                    })
-                i += 1
-                continue
-
-            # 识别公式标记 [FORMULA:2-1]
-            if line.startswith('[FORMULA:'):
-                match_formula = re.match(r'\[FORMULA:([\d\-]+)\]', line)
-                if match_formula and current_chapter:
-                    if current_paragraph:
-                        para_text = ' '.join(current_paragraph)
-                        current_chapter['content'].append({
-                            'type': 'paragraph',
-                            'text': para_text
-                        })
-                        current_paragraph = []
-
-                    # 读取公式内容
-                    i += 1
-                    formula_lines = []
-                    while i < len(lines):
-                        formula_line = lines[i].strip()
-                        if formula_line == '[/FORMULA]':
-                            break
-                        if formula_line:
-                            formula_lines.append(formula_line)
-                        i += 1
-
-                    current_chapter['content'].append({
-                        'type': 'formula',
-                        'number': match_formula.group(1),
-                        'content': '\n'.join(formula_lines)
-                    })
-                i += 1
+                    for tbl_line in lines[i + 2:block_end - 1]:
+                        tbl_line = tbl_line.strip()
+                        if tbl_line and not tbl_line.startswith('['):
+                            rows.append([cell.strip() for cell in tbl_line.split('|')])
+
+                    current_chapter['content'].append(TableNode(
+                        number=block_number,
+                        caption=caption,
+                        source=source,
+                        rows=rows
+                    ))
+                else:
+                    # 公式内容为标记行之后直到 [/FORMULA] 的非空行
+                    formula_lines = [formula_line.strip() for formula_line in lines[i + 1:block_end - 1]]
+                    current_chapter['content'].append(FormulaNode(
+                        number=block_number,
+                        content='\n'.join(formula_line for formula_line in formula_lines if formula_line)
+                    ))
+                i = block_end
                 continue
 
             # 普通文本行
@@ -437,10 +385,7 @@ class USTCContentParser:
             elif current_section == 'abstract_en':
                 content['abstract_en']['content'].append(para_text)
             elif current_section == 'body' and current_chapter:
-                current_chapter['content'].append({
-                    'type': 'paragraph',
-                    'text': para_text
-                })
+                current_chapter['content'].append(self._paragraph_node(para_text))
             elif current_section == 'acknowledgements':
                 content['acknowledgements'].append(para_text)
             elif current_section == 'appendix':
@@ -450,9 +395,72 @@ class USTCContentParser:
         if current_reference_lines:
             references_buffer.append(' '.join(current_reference_lines).strip())
 
-        content['references'] = self._build_references_list(references_buffer)
+        return content, references_buffer
 
-        return content
+    def split_blocks(self, lines):
+        """
+        按章节与特殊部分（参考文献/致谢/附录）的标题行切分文本
+        只跟踪部分切换，不构建内容；判定规则与 _parse_lines 保持一致
+        :param lines: 文本行列表
+        :return: [(起始行号, 块类型)]，首块类型为 'front'
+        """
+        blocks = [(0, 'front')]
+        current_section = None
+        has_chapter = False
+        total = len(lines)
+
+        i = 0
+        while i < total:
+            line = lines[i].strip()
+            if not line or (i == 0 and not line.startswith('#')):
+                i += 1
+                continue
+            if line[0] not in BLOCK_LEAD_CHARS and not line[0].isdigit():
+                # 普通文本行不会引起部分切换
+                i += 1
+                continue
+
+            if self._is_abstract_marker(line):
+                current_section = 'abstract'
+            elif self._is_keywords_line(line):
+                current_section = None
+            elif self._is_abstract_en_marker(line):
+                current_section = 'abstract_en'
+            elif self._is_keywords_en_line(line):
+                current_section = None
+            elif self._is_body_marker(line) and not CHAPTER_PREFIX_PATTERN.match(line):
+                current_section = 'body'
+            elif self._is_references_header(line):
+                blocks.append((i, 'references'))
+                current_section = 'references'
+            elif current_section == 'references' and not CHAPTER_PREFIX_PATTERN.match(line):
+                if self._is_section_end(line, 'references'):
+                    current_section = None
+            elif self._is_acknowledgements_header(line):
+                blocks.append((i, 'acknowledgements'))
+                current_section = 'acknowledgements'
+            elif self._is_section_end(line, 'acknowledgements'):
+                current_section = None
+            elif self._is_appendix_header(line):
+                blocks.append((i, 'appendix'))
+                current_section = 'appendix'
+            elif self._is_section_end(line, 'appendix'):
+                current_section = None
+            else:
+                if CHAPTER_PREFIX_PATTERN.match(line):
+                    current_section = 'body'
+                if self._match_chapter_heading(line, current_section == 'body'):
+                    blocks.append((i, 'chapter'))
+                    has_chapter = True
+                elif has_chapter:
+                    block_marker = self._match_block_marker(line)
+                    if block_marker and block_marker[1] is not None:
+                        # 跳过图/表/公式块，块内的行不参与部分切换
+                        i = self._block_end(lines, i, block_marker[0])
+                        continue
+            i += 1
+
+        return blocks
 
     def _resolve_figure_image_path(self, figure_number, filename_hint=None):
         """根据图号或额外提示解析图片路径"""
@@ -519,6 +527,79 @@ class USTCContentParser:
 
         return 1  # 默认返回1
 
+    def _is_abstract_marker(self, line):
+        """判断是否为中文摘要标记"""
+        return line.startswith('[ABSTRACT]') or line == '摘要'
+
+    def _is_abstract_en_marker(self, line):
+        """判断是否为英文摘要标记"""
+        return line.upper().startswith('[ABSTRACT_EN]') or line.upper() == 'ABSTRACT'
+
+    def _is_keywords_line(self, line):
+        """判断是否为中文关键词行（结束中文摘要）"""
+        return line.startswith('关键词：') or line.startswith('关键词:')
+
+    def _is_keywords_en_line(self, line):
+        """判断是否为英文关键词行（结束英文摘要）"""
+        return line.lower().startswith('key words:') or line.lower().startswith('keywords:')
+
+    def _is_body_marker(self, line):
+        """判断是否为正文开始标记"""
+        return line.startswith('[BODY]')
+
+    def _is_section_end(self, line, section):
+        """
+        判断是否为指定部分的结束标记
+        :param section: references / acknowledgements / appendix
+        """
+        marker, chinese_marker = SECTION_END_MARKERS[section]
+        return line.upper().startswith(marker) or line == chinese_marker
+
+    def _match_chapter_heading(self, line, in_body):
+        """
+        识别一级标题（章）：「第X章 标题」任意位置均可识别，「1 标题」仅在正文中识别
+        :param in_body: 当前是否位于正文
+        :return: (章号, 标题)；不是章标题时返回 None
+        """
+        match = CHAPTER_PATTERN.match(line)
+        if match:
+            return self._chinese_to_arabic(match.group(1)), match.group(2).strip()
+        if in_body:
+            match = NUMBERED_CHAPTER_PATTERN.match(line)
+            if match:
+                return int(match.group(1)), match.group(2).strip()
+        return None
+
+    def _match_block_marker(self, line):
+        """
+        识别图/表/公式标记行
+        :return: (块类型, 编号)，编号格式无效时为 (块类型, None)；不是标记行时返回 None
+        """
+        for prefix, kind, pattern in BLOCK_MARKERS:
+            if line.startswith(prefix):
+                match = pattern.match(line)
+                return kind, match.group(1) if match else None
+        return None
+
+    def _block_end(self, lines, start, kind):
+        """
+        图/表/公式块之后第一行的行号
+        图：标记行 + 题注行 + 可选的 [/FIGURE]；表：标记行 + 题注行，随后直到 [/TABLE]；公式：直到 [/FORMULA]
+        :param start: 标记行的行号
+        """
+        total = len(lines)
+        if kind == 'figure':
+            i = start + 2
+            if i < total and lines[i].strip() == '[/FIGURE]':
+                i += 1
+            return i
+
+        i = start + 2 if kind == 'table' else start + 1
+        closing = '[/TABLE]' if kind == 'table' else '[/FORMULA]'
+        while i < total and lines[i].strip() != closing:
+            i += 1
+        return i + 1
+
     def _is_references_header(self, line):
         """
         判断是否为参考文献区块的标题
@@ -583,10 +664,10 @@ class USTCContentParser:
             else:
                 normalized_text = text
                 original_index = None
-            references.append({
-                'index': idx,
-                'original_index': original_index,
-                'text': normalized_text,
-                'raw': text
-            })
+            references.append(ReferenceNode(
+                index=idx,
+                original_index=original_index,
+                text=normalized_text,
+                raw=text
+            ))
         return references
@@ -0,0 +1,82 @@
+"""
+参考文献文本规范化 - 一次遍历完成 URL 移除、标点统一、空白压缩、标点后补空格与连字符数字串保护
+（结果与逐步处理的旧清洗链相同）
+"""
+import re
+
+
+WORD_JOINER = '\u2060'
+# 日期、页码等连字符片段中的连字符两侧加不可断开控制
+JOINED_HYPHEN = f'{WORD_JOINER}-{WORD_JOINER}'
+
+URL_PATTERN = re.compile(r'https?://\S+', re.IGNORECASE)
+
+# 统一为英文半角的标点（'……' 为两个字符，单独替换）
+ELLIPSIS = ('……', '...')
+PUNCTUATION_TABLE = str.maketrans({
+    '，': ',',
+    '。': '.',
+    '．': '.',
+    '、': ',',
+    '；': ';',
+    '：': ':',
+    '？': '?',
+    '！': '!',
+    '（': '(',
+    '）': ')',
+    '【': '[',
+    '】': ']',
+    '《': '<',
+    '》': '>',
+    '“': '"',
+    '”': '"',
+    '‘': "'",
+    '’': "'",
+    '—': '-',
+    '－': '-',
+    '～': '~',
+    '·': '-',
+    '｜': '|'
+})
+
+# 前面不留空格、后面（紧跟其他字符时）补一个空格的标点
+_PUNCT = r',.;:?!)\]}'
+# 各分组：1 首尾或标点前的空白（删除）；2 其余空白（压缩为一个空格）；
+# 3 后面紧跟非空白非标点字符的标点（补空格）；4 连字符数字串（加不可断开控制）
+REFERENCE_SCANNER = re.compile(
+    rf'(\A\s+|\s+\Z|\s+(?=[{_PUNCT}]))'
+    rf'|(\s+)'
+    rf'|([{_PUNCT}])(?=[^\s{_PUNCT}])'
+    r'|(\d+(?:-\d+)+)'
+)
+
+
+def _replace_token(match):
+    group = match.lastindex
+    if group == 1:
+        return ''
+    if group == 2:
+        return ' '
+    if group == 3:
+        return match.group(3) + ' '
+    return match.group(4).replace('-', JOINED_HYPHEN)
+
+
+def normalize_reference_text(text):
+    """
+    清洗一条参考文献：移除 http/https 链接，标点统一为半角，删除标点前与首尾的空白、其余空白压缩为一个空格，
+    标点（- 除外）紧跟其他字符时补空格，连字符数字串加不可断开控制，末尾补句号
+    :param text: 原始条目文本
+    :return: 清洗后的文本，空条目返回 ''
+    """
+    if not text:
+        return ''
+    # 链接在标点统一之前移除（全角冒号等不构成链接）
+    if '://' in text:
+        text = URL_PATTERN.sub('', text)
+    if ELLIPSIS[0] in text:
+        text = text.replace(*ELLIPSIS)
+    text = REFERENCE_SCANNER.sub(_replace_token, text.translate(PUNCTUATION_TABLE))
+    if text and not text.endswith('.'):
+        text += '.'
+    return text
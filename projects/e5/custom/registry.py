@@ -0,0 +1,123 @@
+"""
+样式配置注册表 - 常驻进程中按配置文件缓存样式管理器，文件变化时重新编译并原子替换
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+from .styles import USTCStyleManager
+
+
+CONFIG_RELATIVE_PATH = os.path.join('config', 'thesis_format.json')
+
+
+class _ConfigEntry:
+    """单个配置文件的缓存快照"""
+    __slots__ = ('manager', 'stat_key', 'digest', 'checked_at')
+
+    def __init__(self, manager, stat_key, digest, checked_at):
+        self.manager = manager
+        self.stat_key = stat_key
+        self.digest = digest
+        self.checked_at = checked_at
+
+
+class StyleConfigRegistry:
+    """
+    多项目共享的样式配置注册表
+    get() 返回的 USTCStyleManager 是只读快照：配置变化时换入新对象，
+    正在生成的文档继续使用取到的旧快照，不会看到一半新一半旧的样式
+    """
+
+    def __init__(self, check_interval=0.0):
+        """
+        :param check_interval: 两次检查文件状态的最小间隔（秒），0 表示每次 get 都检查
+        """
+        self.check_interval = check_interval
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, config_path):
+        """
+        获取配置文件对应的样式管理器，文件 mtime/大小变化时按内容摘要判断是否需要重新编译
+        :param config_path: thesis_format.json 路径
+        """
+        path = os.path.abspath(os.fspath(config_path))
+        entry = self._entries.get(path)
+        now = time.monotonic()
+        if entry is not None and now - entry.checked_at < self.check_interval:
+            return entry.manager
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            if entry is None:
+                raise
+            # 文件被临时移走（如编辑器替换保存）时继续使用当前快照
+            return entry.manager
+        stat_key = (stat.st_mtime_ns, stat.st_size)
+        if entry is not None and entry.stat_key == stat_key:
+            entry.checked_at = now
+            return entry.manager
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.stat_key == stat_key:
+                return entry.manager
+            return self._reload(path, stat_key, entry, now)
+
+    def get_project(self, project_dir):
+        """获取项目目录（projects/<id>）下 config/thesis_format.json 的样式管理器"""
+        return self.get(os.path.join(os.fspath(project_dir), CONFIG_RELATIVE_PATH))
+
+    def digest(self, config_path):
+        """当前快照对应的配置内容摘要；未加载时为 None"""
+        entry = self._entries.get(os.path.abspath(os.fspath(config_path)))
+        return entry.digest if entry is not None else None
+
+    def invalidate(self, config_path=None):
+        """丢弃指定配置（默认全部）的快照，下次 get 时重新加载"""
+        with self._lock:
+            if config_path is None:
+                self._entries = {}
+            else:
+                self._entries.pop(os.path.abspath(os.fspath(config_path)), None)
+
+    def _reload(self, path, stat_key, entry, now):
+        """
+        读取并编译配置；失败时保留旧快照（首次加载失败则抛出异常）
+        内容无效时记下失败版本的文件状态，文件再次变化前不再重复解析与告警；读取失败时下次检查重试
+        """
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError as exc:
+            if entry is None:
+                raise
+            print(f'⚠ 样式配置读取失败，继续使用上一版本: {path} ({exc})')
+            self._entries[path] = _ConfigEntry(entry.manager, entry.stat_key, entry.digest, now)
+            return entry.manager
+
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        if entry is not None and entry.digest == digest:
+            # 仅被 touch，内容未变
+            self._entries[path] = _ConfigEntry(entry.manager, stat_key, digest, now)
+            return entry.manager
+
+        try:
+            manager = USTCStyleManager.from_config(json.loads(data.decode('utf-8')))
+        except (ValueError, KeyError, TypeError) as exc:
+            if entry is None:
+                raise
+            print(f'⚠ 样式配置重新加载失败，继续使用上一版本: {path} ({exc})')
+            # 摘要仍为旧快照的摘要：文件改回旧内容时只需更新状态
+            self._entries[path] = _ConfigEntry(entry.manager, stat_key, entry.digest, now)
+            return entry.manager
+
+        # 单次字典赋值完成替换，读取方要么拿到旧快照，要么拿到新快照
+        self._entries[path] = _ConfigEntry(manager, stat_key, digest, now)
+        if entry is not None:
+            print(f'✓ 样式配置已重新加载: {path}')
+        return manager
@@ -0,0 +1,162 @@
+"""
+渲染缓存 - 按内容寻址的磁盘缓存，跨多次生成、多个进程共享
+保存清洗后的参考文献文本与序列化的公式 OMML 片段；
+键由命名空间、生成代码的版本指纹、相关配置与输入文本共同决定，总大小超出上限时按最近使用时间淘汰
+"""
+import hashlib
+import inspect
+import os
+import tempfile
+
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# 淘汰时删到上限的该比例以下，避免每次写入都触发淘汰
+EVICT_TARGET_RATIO = 0.8
+_KEY_SEPARATOR = '\x00'
+
+
+def source_fingerprint(*objects):
+    """
+    生成代码的版本指纹：对象源码的摘要，代码改动后旧条目自然失效
+    :param objects: 函数、类或模块
+    """
+    digest = hashlib.sha256()
+    for obj in objects:
+        try:
+            source = inspect.getsource(obj)
+        except (OSError, TypeError):
+            # 无法取得源码（如打包后运行）时退化为按名称区分
+            source = f'{getattr(obj, "__module__", "")}.{getattr(obj, "__qualname__", obj)}'
+        digest.update(source.encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+class RenderCache:
+    """
+    磁盘缓存：每个条目一个文件，路径为键的 SHA-256（前两位作子目录）
+    写入先写临时文件再原子替换，多进程同时读写同一目录是安全的；读取命中时更新文件 mtime，淘汰按 mtime 从旧到新
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        :param cache_dir: 缓存目录（不存在时创建）
+        :param max_bytes: 缓存总大小上限（字节）；各进程分别计数，超出时重新扫描目录后淘汰
+        """
+        self.cache_dir = os.fspath(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None  # 本进程估计的缓存总大小，首次写入时扫描目录得到
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key(self, namespace, version, text, *parts):
+        """
+        计算条目键
+        :param namespace: 条目类型（如 'reference'、'omml'）
+        :param version: 生成代码的版本指纹
+        :param text: 输入文本
+        :param parts: 影响结果的其他配置（字体、字号等）
+        """
+        material = _KEY_SEPARATOR.join([namespace, version, *(str(part) for part in parts), text])
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def get(self, key):
+        """读取条目（bytes），不存在时返回 None"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass  # 条目刚被其他进程淘汰
+        self.hits += 1
+        return data
+
+    def put(self, key, data):
+        """写入条目（bytes）；磁盘错误时放弃写入，不影响生成"""
+        path = self._path(key)
+        try:
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            return
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        else:
+            self._size += len(data)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def get_text(self, key):
+        data = self.get(key)
+        return data.decode('utf-8') if data is not None else None
+
+    def put_text(self, key, text):
+        self.put(key, text.encode('utf-8'))
+
+    def _entries(self):
+        """[(路径, 大小, mtime)]"""
+        entries = []
+        try:
+            subdirs = list(os.scandir(self.cache_dir))
+        except OSError:
+            return entries
+        for subdir in subdirs:
+            if not subdir.is_dir():
+                continue
+            try:
+                for entry in os.scandir(subdir.path):
+                    if entry.name.startswith('.tmp-'):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((entry.path, stat.st_size, stat.st_mtime))
+            except OSError:
+                continue
+        return entries
+
+    def evict(self):
+        """按最近使用时间淘汰条目，直到总大小降到上限的 EVICT_TARGET_RATIO 以下"""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICT_TARGET_RATIO
+        if total > self.max_bytes:
+            for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+                if total <= target:
+                    break
+                try:
+                    os.unlink(path)
+                except OSError:
+                    continue
+                total -= size
+        self._size = total
+
+    def clear(self):
+        """删除全部条目"""
+        for path, _, _ in self._entries():
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        self._size = 0
+
+    def stats(self):
+        """(命中次数, 未命中次数)"""
+        return self.hits, self.misses
@@ -0,0 +1,349 @@
+"""
+本地生成服务 - 常驻的进程池预加载样式配置与底稿文档，
+通过 HTTP 接收标准化文本（或解析后的 JSON 内容）并返回 docx
+"""
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from .formatter import USTCFormatter
+from .nodes import content_from_dict
+from .parser import USTCContentParser
+from .registry import StyleConfigRegistry
+from .render_cache import RenderCache
+
+
+DOCX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+_RESPONSE_CHUNK_SIZE = 64 * 1024
+# 预热时等待全部 worker 就绪的超时（秒）
+WARM_UP_TIMEOUT = 120
+
+# worker 进程内的预加载状态（由 _init_worker 填充）
+_worker_state = {}
+
+
+def _init_worker(project_dir, check_interval, ready_barrier, render_cache_dir=None):
+    """
+    进程池初始化：加载样式配置并预先构建两种模式的底稿文档；各 worker 共用同一个磁盘渲染缓存目录
+    :param ready_barrier: 预热握手用的屏障（参与方为全部 worker）
+    """
+    registry = StyleConfigRegistry(check_interval=check_interval)
+    style_manager = registry.get_project(project_dir)
+    render_cache = RenderCache(render_cache_dir) if render_cache_dir else None
+    formatters = {}
+    for named_styles in (False, True):
+        formatters[(named_styles, 'docx')] = USTCFormatter(
+            style_manager, named_styles=named_styles, render_cache=render_cache
+        )
+    _worker_state.update(
+        registry=registry,
+        project_dir=project_dir,
+        image_dir=os.path.join(project_dir, 'input', 'images'),
+        formatters=formatters,
+        render_cache=render_cache,
+        ready_barrier=ready_barrier,
+    )
+
+
+def _worker_ready(timeout):
+    """预热任务：在屏障处等待其余 worker，全部 worker 都领到一个预热任务（即都已完成初始化）后一起返回"""
+    _worker_state['ready_barrier'].wait(timeout)
+    return os.getpid()
+
+
+def _get_formatter(style_manager, named_styles, backend):
+    """复用 worker 内的生成器；配置热加载换入新的样式管理器后重新创建"""
+    key = (named_styles, backend)
+    formatter = _worker_state['formatters'].get(key)
+    if formatter is None or formatter.style_manager is not style_manager:
+        formatter = USTCFormatter(
+            style_manager, named_styles=named_styles, backend=backend, render_cache=_worker_state['render_cache']
+        )
+        _worker_state['formatters'][key] = formatter
+    return formatter
+
+
+def _render(payload, options):
+    """
+    在 worker 中解析并生成文档
+    :param payload: UTF-8 标准化文本（bytes），或已由 content_from_dict 重建的内容
+    :param options: named_styles / backend / include_toc
+    :return: (docx 路径, 所在临时目录（由调用方发送后删除）, 各阶段耗时字典（秒）, 开始处理的时间戳, worker pid)
+    """
+    started_at = time.time()
+    start = time.perf_counter()
+    style_manager = _worker_state['registry'].get_project(_worker_state['project_dir'])
+    if isinstance(payload, dict):
+        content = payload
+    else:
+        parser = USTCContentParser(image_dir=_worker_state['image_dir'])
+        content = parser.parse_text(payload.decode('utf-8'))
+    parsed = time.perf_counter()
+
+    formatter = _get_formatter(style_manager, options['named_styles'], options['backend'])
+    work_dir = tempfile.mkdtemp(prefix='e5-serve-')
+    try:
+        output_path = os.path.join(work_dir, 'thesis.docx')
+        formatter.generate(content, output_path, include_toc=options['include_toc'])
+    except BaseException:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+    timings = {'parse': parsed - start, 'render': time.perf_counter() - parsed}
+    return output_path, work_dir, timings, started_at, os.getpid()
+
+
+def _parse_flag(values, default):
+    if not values:
+        return default
+    value = values[-1].lower()
+    if value in ('1', 'true', 'yes', 'on'):
+        return True
+    if value in ('0', 'false', 'no', 'off'):
+        return False
+    raise ValueError(f'无法识别的开关取值: {values[-1]}')
+
+
+def parse_options(query):
+    """
+    解析请求参数：named_styles=0|1、backend=docx|lxml、toc=0|1
+    :raises ValueError: 参数取值无效
+    """
+    params = parse_qs(query)
+    backend = params.get('backend', ['docx'])[-1]
+    if backend not in USTCFormatter.BACKENDS:
+        raise ValueError(f'未知的渲染后端: {backend}（可选: {", ".join(USTCFormatter.BACKENDS)}）')
+    return {
+        'named_styles': _parse_flag(params.get('named_styles'), False),
+        'backend': backend,
+        'include_toc': _parse_flag(params.get('toc'), True),
+    }
+
+
+class GenerationServer:
+    """
+    常驻生成服务
+    POST /generate  请求体为标准化文本（text/plain）或解析后的内容（application/json），返回 docx；
+                    正在处理与排队的请求总数达到上限时立即返回 503 并附带 Retry-After
+    GET  /health    返回 worker 数与当前负载
+    响应头 Server-Timing 给出排队、解析、渲染与总耗时
+    """
+
+    def __init__(self, project_dir, host='127.0.0.1', port=8765, workers=None, max_queue=8, check_interval=1.0,
+                 render_cache_dir=None):
+        """
+        :param project_dir: 项目目录（读取 config/thesis_format.json 与 input/images）
+        :param workers: worker 进程数，默认为 CPU 核数
+        :param max_queue: 所有 worker 都忙时允许排队的请求数，超出后拒绝
+        :param check_interval: worker 检查样式配置是否变化的间隔（秒）
+        :param render_cache_dir: 磁盘渲染缓存目录（参考文献与公式片段跨请求、跨 worker 复用），None 表示不使用
+        """
+        self.project_dir = os.path.abspath(os.fspath(project_dir))
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self._mp_context = multiprocessing.get_context()
+        # 屏障随进程创建传给各 worker，预热时每个 worker 领一个任务并在此会合
+        self._ready_barrier = self._mp_context.Barrier(self.workers)
+        self._initargs = (self.project_dir, check_interval, self._ready_barrier, render_cache_dir)
+        self._executor_lock = threading.Lock()
+        self.executor = self._create_executor()
+        self._slots = threading.BoundedSemaphore(self.workers + max_queue)
+        self._in_flight = 0
+        self._counter_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.httpd.daemon_threads = True
+
+    def _create_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=self._mp_context,
+            initializer=_init_worker,
+            initargs=self._initargs
+        )
+
+    def _replace_executor(self, broken):
+        """换掉已损坏的进程池（多个请求同时发现时只替换一次），返回当前进程池"""
+        with self._executor_lock:
+            if self.executor is broken:
+                self.executor = self._create_executor()
+                broken.shutdown(wait=False, cancel_futures=True)
+                print('⚠ worker 进程异常退出，已重建进程池')
+            return self.executor
+
+    def run(self, fn, *args):
+        """
+        在进程池中执行任务并等待结果
+        worker 异常退出会使整个进程池损坏：提交时发现损坏则换用新的进程池后重新提交；
+        执行中损坏时同样换用新的进程池，本次任务抛出 BrokenProcessPool，后续请求不受影响
+        """
+        executor = self.executor
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            executor = self._replace_executor(executor)
+            future = executor.submit(fn, *args)
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            self._replace_executor(executor)
+            raise
+
+    @property
+    def address(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def warm_up(self, timeout=WARM_UP_TIMEOUT):
+        """
+        启动全部 worker 并完成预加载，返回各 worker 的 pid
+        每个预热任务在屏障处等待，直到全部 worker 各领到一个，因此不会有 worker 连续执行两个预热任务
+        :raises threading.BrokenBarrierError: 超时仍有 worker 未就绪
+        """
+        self._ready_barrier.reset()
+        futures = [self.executor.submit(_worker_ready, timeout) for _ in range(self.workers)]
+        return sorted({future.result() for future in futures})
+
+    def try_acquire(self):
+        """占用一个处理/排队名额，已满时返回 False"""
+        if not self._slots.acquire(blocking=False):
+            return False
+        with self._counter_lock:
+            self._in_flight += 1
+        return True
+
+    def release(self):
+        with self._counter_lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'max_queue': self.max_queue,
+            'in_flight': self._in_flight,
+        }
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _make_handler(server):
+    """创建绑定到指定服务实例的请求处理类"""
+
+    class GenerationRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            if urlparse(self.path).path != '/health':
+                self._send_error(HTTPStatus.NOT_FOUND, '未知路径')
+                return
+            self._send_bytes(HTTPStatus.OK, json.dumps(server.stats()).encode('utf-8'), 'application/json')
+
+        def do_POST(self):
+            received_at = time.time()
+            url = urlparse(self.path)
+            if url.path != '/generate':
+                self._send_error(HTTPStatus.NOT_FOUND, '未知路径')
+                return
+            try:
+                options = parse_options(url.query)
+            except ValueError as exc:
+                self._send_error(HTTPStatus.BAD_REQUEST, str(exc))
+                return
+
+            length = self.headers.get('Content-Length')
+            if length is None:
+                self._send_error(HTTPStatus.LENGTH_REQUIRED, '缺少 Content-Length')
+                return
+            try:
+                length = int(length)
+            except ValueError:
+                length = -1
+            if length < 0:
+                self._send_error(HTTPStatus.BAD_REQUEST, 'Content-Length 无效')
+                return
+            if length > MAX_REQUEST_BYTES:
+                self._send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, '请求体过大')
+                return
+            payload = self.rfile.read(length)
+            if self.headers.get_content_type() == 'application/json':
+                try:
+                    payload = json.loads(payload)
+                except ValueError as exc:
+                    self._send_error(HTTPStatus.BAD_REQUEST, f'JSON 内容无效: {exc}')
+                    return
+                try:
+                    # 重建节点、表格数据与引用索引，结构不符时在提交给 worker 之前拒绝
+                    payload = content_from_dict(payload)
+                except ValueError as exc:
+                    self._send_error(HTTPStatus.BAD_REQUEST, f'解析内容格式无效: {exc}')
+                    return
+
+            if not server.try_acquire():
+                self._send_error(HTTPStatus.SERVICE_UNAVAILABLE, '服务繁忙，请稍后重试', {'Retry-After': '1'})
+                return
+            try:
+                submitted_at = time.time()
+                try:
+                    output_path, work_dir, timings, started_at, worker_pid = server.run(_render, payload, options)
+                except Exception as exc:
+                    self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, f'{type(exc).__name__}: {exc}')
+                    return
+            finally:
+                server.release()
+
+            queue_ms = max(0.0, started_at - submitted_at) * 1000
+            total_ms = (time.time() - received_at) * 1000
+            server_timing = ', '.join([
+                f'queue;dur={queue_ms:.1f}',
+                f'parse;dur={timings["parse"] * 1000:.1f}',
+                f'render;dur={timings["render"] * 1000:.1f}',
+                f'total;dur={total_ms:.1f}',
+            ])
+            try:
+                self._send_file(HTTPStatus.OK, output_path, DOCX_CONTENT_TYPE, {
+                    'Server-Timing': server_timing,
+                    'X-Worker-Pid': str(worker_pid),
+                })
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+        def _send_headers(self, status, content_type, length, extra_headers=None):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(length))
+            for name, value in (extra_headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+
+        def _send_file(self, status, path, content_type, extra_headers=None):
+            """从磁盘分块发送文件，不把整个文档读入内存"""
+            with open(path, 'rb') as f:
+                self._send_headers(status, content_type, os.fstat(f.fileno()).st_size, extra_headers)
+                shutil.copyfileobj(f, self.wfile, _RESPONSE_CHUNK_SIZE)
+
+        def _send_bytes(self, status, data, content_type, extra_headers=None):
+            self._send_headers(status, content_type, len(data), extra_headers)
+            self.wfile.write(data)
+
+        def _send_error(self, status, message, extra_headers=None):
+            # 请求体可能未读取，出错后不复用连接
+            self.close_connection = True
+            body = json.dumps({'error': message}, ensure_ascii=False).encode('utf-8')
+            self._send_bytes(status, body, 'application/json; charset=utf-8', extra_headers)
+
+    return GenerationRequestHandler
@@ -0,0 +1,88 @@
+"""
+流式写出 document.xml - 已完成的章节序列化到临时文件后从内存树中移除，
+保存时在 zip 中按顺序拼回，峰值内存不再随文档长度增长
+"""
+import io
+import shutil
+import tempfile
+import uuid
+import zipfile
+
+from lxml import etree
+
+from .xml_builder import detach_blocks
+
+
+DOCUMENT_PART_NAME = 'word/document.xml'
+_COPY_BUFFER_SIZE = 1024 * 1024
+# 超过此大小的 document.xml 需要 ZIP64 记录
+_ZIP64_THRESHOLD = 0x7FFF0000
+
+
+class DocumentSpool:
+    """
+    document.xml 正文块的磁盘缓冲
+    flush() 把 w:body 中除节属性 sectPr 外的所有块按顺序写入临时文件并从树中移除，
+    save() 用占位注释标记缓冲内容的位置，保存其余部件后替换为缓冲内容
+    """
+
+    def __init__(self, document, spool_dir=None):
+        """
+        :param document: python-docx Document
+        :param spool_dir: 临时文件目录，默认使用系统临时目录
+        """
+        self.document = document
+        self.body = document.element.body
+        self.blocks_flushed = 0
+        self._file = tempfile.TemporaryFile(dir=spool_dir)
+        self._marker = f'e5-spool-{uuid.uuid4().hex}'
+
+    def flush(self):
+        """将已生成的块序列化到临时文件，返回本次写出的块数"""
+        wrapper = detach_blocks(self.document)
+        if wrapper is None:
+            return 0
+        data = etree.tostring(wrapper, encoding='utf-8')
+        start = data.index(b'>') + 1
+        end = data.rindex(b'</')
+        self._file.write(data[start:end])
+        self.blocks_flushed += len(wrapper)
+        return len(wrapper)
+
+    def save(self, output_path):
+        """写出剩余内容并生成 docx：其他部件原样复制，document.xml 由占位前后部分与缓冲内容拼接"""
+        self.flush()
+        marker = etree.Comment(self._marker)
+        self.body.insert(0, marker)
+        package = io.BytesIO()
+        try:
+            self.document.save(package)
+        finally:
+            self.body.remove(marker)
+        package.seek(0)
+
+        spool_size = self._file.tell()
+        with zipfile.ZipFile(package) as source, \
+                zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as target:
+            for info in source.infolist():
+                if info.filename == DOCUMENT_PART_NAME:
+                    self._write_document_part(source.read(info), info, target, spool_size)
+                    continue
+                with source.open(info) as src, target.open(info, 'w') as dst:
+                    shutil.copyfileobj(src, dst, _COPY_BUFFER_SIZE)
+        self._file.close()
+
+    def _write_document_part(self, document_xml, source_info, target, spool_size):
+        head, tail = document_xml.split(f'<!--{self._marker}-->'.encode('utf-8'), 1)
+        info = zipfile.ZipInfo(DOCUMENT_PART_NAME, date_time=source_info.date_time)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        force_zip64 = len(head) + spool_size + len(tail) > _ZIP64_THRESHOLD
+        with target.open(info, 'w', force_zip64=force_zip64) as dst:
+            dst.write(head)
+            self._file.seek(0)
+            shutil.copyfileobj(self._file, dst, _COPY_BUFFER_SIZE)
+            dst.write(tail)
+
+    def close(self):
+        """放弃缓冲内容（生成失败时调用）"""
+        self._file.close()
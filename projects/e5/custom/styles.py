@@ -1,11 +1,170 @@
 """
 样式管理器 - 负责管理和应用文档样式
 """
+import io
 import json
-from docx.shared import Pt, RGBColor, Cm, Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_LINE_SPACING
+import zipfile
+from collections import namedtuple
+from copy import deepcopy
+
+from docx import Document
+from docx.shared import Pt, RGBColor, Cm, Inches, Twips
+from docx.enum.style import WD_STYLE_TYPE
+from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_LINE_SPACING, WD_TAB_ALIGNMENT, WD_TAB_LEADER
 from docx.oxml import OxmlElement
 from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+from docx.text.run import Run
+
+
+ALIGNMENT_MAP = {
+    'left': WD_ALIGN_PARAGRAPH.LEFT,
+    'center': WD_ALIGN_PARAGRAPH.CENTER,
+    'right': WD_ALIGN_PARAGRAPH.RIGHT,
+    'justify': WD_ALIGN_PARAGRAPH.JUSTIFY
+}
+LINE_SPACING_RULE_MAP = {
+    'single': WD_LINE_SPACING.SINGLE,
+    'double': WD_LINE_SPACING.DOUBLE,
+    '1.5': WD_LINE_SPACING.ONE_POINT_FIVE
+}
+LINE_SPACING_VALUE_MAP = {
+    1.0: WD_LINE_SPACING.SINGLE,
+    1.5: WD_LINE_SPACING.ONE_POINT_FIVE,
+    2.0: WD_LINE_SPACING.DOUBLE
+}
+
+# 预先解析好的只读样式（加载配置时编译一次，渲染时只读取）
+ResolvedParagraphStyle = namedtuple('ResolvedParagraphStyle', [
+    'alignment', 'space_before', 'space_after', 'left_indent', 'first_line_indent',
+    'char_indent', 'line_spacing_rule', 'line_spacing', 'keep_with_next', 'tab_stop'
+], defaults=(None,) * 10)
+ResolvedRunStyle = namedtuple('ResolvedRunStyle', ['chinese_font', 'english_font', 'size', 'size_pt', 'bold'])
+ResolvedTextStyle = namedtuple('ResolvedTextStyle', ['run', 'paragraph'])
+ResolvedHeadingStyle = namedtuple('ResolvedHeadingStyle', [
+    'font', 'number_font', 'size_pt', 'bold', 'alignment', 'space_before'
+])
+ResolvedCaptionStyle = namedtuple('ResolvedCaptionStyle', ['font', 'size_pt', 'bold'])
+# 目录条目的固定格式：五号字，16cm 处右对齐点线制表位，二/三级缩进 1/2 字符
+TOC_ENTRY_SIZE = 10.5
+TOC_TAB_STOP = (Twips(int(16.0 * 567)), WD_TAB_ALIGNMENT.RIGHT, WD_TAB_LEADER.DOTS)
+TOC_LEVEL_INDENTS = {1: None, 2: 10.5, 3: 21}
+
+# 命名样式模式下注册到 styles.xml 的段落样式
+NAMED_STYLE_NAMES = {
+    'body': 'Thesis Body',
+    'abstract': 'Thesis Abstract',
+    'abstract_en': 'Thesis Abstract EN',
+    'acknowledgements': 'Thesis Acknowledgements',
+    'appendix': 'Thesis Appendix',
+    'reference_entry': 'Thesis Reference',
+    'heading1': 'Thesis Heading 1',
+    'heading2': 'Thesis Heading 2',
+    'heading3': 'Thesis Heading 3',
+    'figure_caption': 'Thesis Figure Caption',
+    'table_caption': 'Thesis Table Caption',
+    'table_cell': 'Thesis Table Cell',
+    'toc1': 'Thesis TOC 1',
+    'toc2': 'Thesis TOC 2',
+    'toc3': 'Thesis TOC 3',
+    'header': 'Thesis Header'
+}
+
+# 命名字符样式：段落内与段落样式不同的 run（标题编号、参考文献编号、表头）通过 rStyle 引用
+CHARACTER_STYLE_NAMES = {
+    'heading1_number': 'Thesis Heading 1 Number',
+    'heading2_number': 'Thesis Heading 2 Number',
+    'heading3_number': 'Thesis Heading 3 Number',
+    'reference_number': 'Thesis Reference Number',
+    'table_header': 'Thesis Table Header'
+}
+
+CompiledStyles = namedtuple('CompiledStyles', [
+    'body', 'abstract', 'abstract_en', 'acknowledgements', 'appendix',
+    'reference_entry', 'headings', 'figure_caption', 'table_caption'
+])
+
+
+def extract_font_pair(style_cfg, fallback_cn='宋体', fallback_en='Times New Roman', base_key='font'):
+    """根据配置提取中文/英文字体对"""
+    chinese_font = style_cfg.get(f'{base_key}_chinese')
+    english_font = style_cfg.get(f'{base_key}_english')
+    if chinese_font or english_font:
+        return chinese_font or fallback_cn, english_font or fallback_en
+
+    chinese_font = style_cfg.get('font_chinese')
+    english_font = style_cfg.get('font_english')
+    if chinese_font or english_font:
+        return chinese_font or fallback_cn, english_font or fallback_en
+
+    fallback_font = style_cfg.get('font')
+    if fallback_font:
+        return fallback_font, fallback_font
+    return fallback_cn, fallback_en
+
+
+def resolve_paragraph_style(style_config):
+    """将段落样式配置解析为 ResolvedParagraphStyle"""
+    alignment = None
+    if 'alignment' in style_config:
+        alignment = ALIGNMENT_MAP.get(style_config['alignment'], WD_ALIGN_PARAGRAPH.LEFT)
+
+    left_indent = None
+    first_line_indent = None
+    char_indent = None
+    font_size = style_config.get('size', 12)
+    if 'hanging_indent_chars' in style_config:
+        char_count = style_config['hanging_indent_chars']
+        left_indent = Pt(char_count * font_size)
+        first_line_indent = Pt(-char_count * font_size)
+    elif 'hanging_indent' in style_config:
+        left_indent = Pt(style_config['hanging_indent'])
+        first_line_indent = Pt(-style_config['hanging_indent'])
+    elif 'first_line_indent' in style_config:
+        char_count = style_config['first_line_indent']
+        first_line_indent = Pt(char_count * font_size)
+        char_indent = (char_count, int(char_count * font_size * 20))
+
+    line_spacing_rule = None
+    line_spacing = None
+    if 'line_spacing_rule' in style_config:
+        rule_value = style_config['line_spacing_rule']
+        if rule_value == 'fixed':
+            line_spacing_rule = WD_LINE_SPACING.EXACTLY
+            if 'line_spacing_pt' in style_config:
+                line_spacing = Pt(style_config['line_spacing_pt'])
+        elif rule_value == 'multiple':
+            line_spacing_rule = WD_LINE_SPACING.MULTIPLE
+            line_spacing = style_config.get('line_spacing', 1.0)
+        else:
+            line_spacing_rule = LINE_SPACING_RULE_MAP.get(rule_value, WD_LINE_SPACING.SINGLE)
+    elif 'line_spacing' in style_config:
+        spacing = style_config['line_spacing']
+        line_spacing_rule = LINE_SPACING_VALUE_MAP.get(spacing)
+        if not line_spacing_rule:
+            line_spacing = spacing
+
+    return ResolvedParagraphStyle(
+        alignment=alignment,
+        space_before=Pt(style_config.get('space_before', 0)),
+        space_after=Pt(style_config.get('space_after', 0)),
+        left_indent=left_indent,
+        first_line_indent=first_line_indent,
+        char_indent=char_indent,
+        line_spacing_rule=line_spacing_rule,
+        line_spacing=line_spacing
+    )
+
+
+def _stored_package_blob(document):
+    """将文档保存为不压缩的 docx 字节，加载副本时省去解压"""
+    package = io.BytesIO()
+    document.save(package)
+    stored = io.BytesIO()
+    with zipfile.ZipFile(package) as source, zipfile.ZipFile(stored, 'w', zipfile.ZIP_STORED) as target:
+        for info in source.infolist():
+            target.writestr(info.filename, source.read(info))
+    return stored.getvalue()
 
 
 class USTCStyleManager:
@@ -14,7 +173,100 @@ class USTCStyleManager:
     def __init__(self, config_path):
         """加载格式配置文件"""
         with open(config_path, 'r', encoding='utf-8') as f:
-            self.config = json.load(f)
+            config = json.load(f)
+        self._load_config(config)
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        由已解析的配置字典创建样式管理器（配置注册表热加载时使用）
+        :param config: thesis_format.json 对应的字典
+        """
+        manager = cls.__new__(cls)
+        manager._load_config(config)
+        return manager
+
+    def _load_config(self, config):
+        """保存配置并编译派生样式"""
+        self.config = config
+        self.compiled = self._compile_styles()
+        # 按样式签名缓存完整的 w:rPr / w:pPr 子树，新建的 run/段落直接深拷贝
+        self._rpr_templates = {}
+        self._ppr_templates = {}
+        # 已完成页面设置、Normal 样式等初始化的底稿文档（未压缩的 docx 字节）
+        self._base_documents = {}
+
+    def base_document(self, key, build):
+        """
+        取底稿文档的新副本；底稿按 key 只构建一次，之后从内存中的 docx 字节加载
+        :param key: 底稿签名（如是否注册命名样式）
+        :param build: 底稿不存在时调用，返回 (初始化完成的 Document, 附加数据)
+        :return: (Document 副本, 附加数据)
+        """
+        cached = self._base_documents.get(key)
+        if cached is None:
+            document, extra = build()
+            cached = self._base_documents[key] = (_stored_package_blob(document), extra)
+        blob, extra = cached
+        return Document(io.BytesIO(blob)), extra
+
+    def compile_text_style(self, style_cfg, default_size=12):
+        """
+        将正文类样式配置编译为 ResolvedTextStyle
+        :param style_cfg: 含字体、字号与段落格式的配置字典
+        :param default_size: 配置中未给出字号时使用的字号
+        """
+        style_cfg = style_cfg or {}
+        fonts = self.get_fonts()
+        chinese_font, english_font = extract_font_pair(
+            style_cfg, fonts.get('chinese', '宋体'), fonts.get('english', 'Times New Roman')
+        )
+        size = style_cfg.get('size', default_size)
+        run = ResolvedRunStyle(chinese_font, english_font, size, Pt(size), style_cfg.get('bold', False))
+        return ResolvedTextStyle(run, resolve_paragraph_style(style_cfg))
+
+    def _compile_styles(self):
+        """将配置编译为渲染时只读的样式对象"""
+        text_style = self.compile_text_style
+
+        def heading_style(level):
+            cfg = self.get_heading_style(level)
+            # 一级标题固定居中并使用段前距；二/三级标题只处理左对齐
+            if level == 1:
+                alignment = WD_ALIGN_PARAGRAPH.CENTER
+                space_before = Pt(cfg['space_before']) if 'space_before' in cfg else None
+            else:
+                alignment = WD_ALIGN_PARAGRAPH.LEFT if cfg.get('alignment') == 'left' else None
+                space_before = None
+            return ResolvedHeadingStyle(
+                font=cfg['font'],
+                number_font=cfg.get('number_font', 'Times New Roman'),
+                size_pt=Pt(cfg['size']),
+                bold=cfg.get('bold', False),
+                alignment=alignment,
+                space_before=space_before
+            )
+
+        def caption_style(owner_cfg):
+            caption_cfg = owner_cfg.get('caption', {})
+            return ResolvedCaptionStyle(
+                font=caption_cfg.get('font', '宋体'),
+                size_pt=Pt(caption_cfg.get('size', 12)),
+                bold=caption_cfg.get('bold', False)
+            )
+
+        abstract_en_cfg = self.config.get('abstract_en', {})
+        return CompiledStyles(
+            body=text_style(self.get_paragraph_style()),
+            abstract=text_style(self.get_abstract_content_style()),
+            abstract_en=text_style(abstract_en_cfg.get('content', {})),
+            acknowledgements=text_style(self.get_acknowledgement_style().get('content', {})),
+            appendix=text_style(self.get_appendix_style().get('content', {})),
+            reference_entry=text_style(self.get_references_style().get('entry', {}), default_size=10.5),
+            headings={level: heading_style(level) for level in (1, 2, 3)},
+            figure_caption=caption_style(self.config.get('figure', {})),
+            table_caption=caption_style(self.config.get('table', {}))
+        )
 
     def get_font_size(self, size_name):
         """
@@ -47,64 +299,160 @@ class USTCStyleManager:
         """
         应用段落样式
         :param paragraph: python-docx的段落对象
-        :param style_config: 样式配置字典
+        :param style_config: 样式配置字典或已编译的 ResolvedParagraphStyle
         """
-        alignment_map = {
-            'left': WD_ALIGN_PARAGRAPH.LEFT,
-            'center': WD_ALIGN_PARAGRAPH.CENTER,
-            'right': WD_ALIGN_PARAGRAPH.RIGHT,
-            'justify': WD_ALIGN_PARAGRAPH.JUSTIFY
-        }
-        if 'alignment' in style_config:
-            paragraph.alignment = alignment_map.get(style_config['alignment'], WD_ALIGN_PARAGRAPH.LEFT)
-
-        paragraph.paragraph_format.space_before = Pt(style_config.get('space_before', 0))
-        paragraph.paragraph_format.space_after = Pt(style_config.get('space_after', 0))
-
-        if 'hanging_indent_chars' in style_config:
-            char_count = style_config['hanging_indent_chars']
-            font_size = style_config.get('size', 12)
-            indent_value = Pt(char_count * font_size)
-            paragraph.paragraph_format.left_indent = indent_value
-            paragraph.paragraph_format.first_line_indent = Pt(-char_count * font_size)
-        elif 'hanging_indent' in style_config:
-            paragraph.paragraph_format.left_indent = Pt(style_config['hanging_indent'])
-            paragraph.paragraph_format.first_line_indent = Pt(-style_config['hanging_indent'])
-        elif 'first_line_indent' in style_config:
-            char_count = style_config['first_line_indent']
-            font_size = style_config.get('size', 12)
-            indent_twips = int(char_count * font_size * 20)
-            paragraph.paragraph_format.first_line_indent = Pt(char_count * font_size)
-            self._apply_character_indent(paragraph, char_count, indent_twips)
-
-        if 'line_spacing_rule' in style_config:
-            rule_value = style_config['line_spacing_rule']
-            if rule_value == 'fixed':
-                paragraph.paragraph_format.line_spacing_rule = WD_LINE_SPACING.EXACTLY
-                if 'line_spacing_pt' in style_config:
-                    paragraph.paragraph_format.line_spacing = Pt(style_config['line_spacing_pt'])
-            elif rule_value == 'multiple':
-                paragraph.paragraph_format.line_spacing_rule = WD_LINE_SPACING.MULTIPLE
-                paragraph.paragraph_format.line_spacing = style_config.get('line_spacing', 1.0)
-            else:
-                mapping = {
-                    'single': WD_LINE_SPACING.SINGLE,
-                    'double': WD_LINE_SPACING.DOUBLE,
-                    '1.5': WD_LINE_SPACING.ONE_POINT_FIVE
-                }
-                paragraph.paragraph_format.line_spacing_rule = mapping.get(rule_value, WD_LINE_SPACING.SINGLE)
-        elif 'line_spacing' in style_config:
-            spacing = style_config['line_spacing']
-            rule_map = {
-                1.0: WD_LINE_SPACING.SINGLE,
-                1.5: WD_LINE_SPACING.ONE_POINT_FIVE,
-                2.0: WD_LINE_SPACING.DOUBLE
-            }
-            rule = rule_map.get(spacing)
-            if rule:
-                paragraph.paragraph_format.line_spacing_rule = rule
-            else:
-                paragraph.paragraph_format.line_spacing = spacing
+        if not isinstance(style_config, ResolvedParagraphStyle):
+            style_config = resolve_paragraph_style(style_config)
+
+        p = paragraph._p
+        if p.pPr is None:
+            template = self._ppr_templates.get(style_config)
+            if template is None:
+                scratch = Paragraph(OxmlElement('w:p'), None)
+                self._write_paragraph_style(scratch, style_config)
+                template = self._ppr_templates[style_config] = scratch._p.pPr
+            p.insert(0, deepcopy(template))
+            return
+        self._write_paragraph_style(paragraph, style_config)
+
+    def _write_paragraph_style(self, paragraph, style_config):
+        """逐项写入段落属性（已有 pPr 的段落、模板构建及命名样式注册时使用）"""
+        paragraph_format = paragraph.paragraph_format
+        if style_config.alignment is not None:
+            paragraph_format.alignment = style_config.alignment
+
+        if style_config.space_before is not None:
+            paragraph_format.space_before = style_config.space_before
+        if style_config.space_after is not None:
+            paragraph_format.space_after = style_config.space_after
+
+        if style_config.left_indent is not None:
+            paragraph_format.left_indent = style_config.left_indent
+        if style_config.first_line_indent is not None:
+            paragraph_format.first_line_indent = style_config.first_line_indent
+        if style_config.char_indent is not None:
+            self._apply_character_indent(paragraph, *style_config.char_indent)
+
+        if style_config.line_spacing_rule is not None:
+            paragraph_format.line_spacing_rule = style_config.line_spacing_rule
+        if style_config.line_spacing is not None:
+            paragraph_format.line_spacing = style_config.line_spacing
+
+        if style_config.keep_with_next is not None:
+            paragraph_format.keep_with_next = style_config.keep_with_next
+        if style_config.tab_stop is not None:
+            paragraph_format.tab_stops.add_tab_stop(*style_config.tab_stop)
+
+    def register_named_styles(self, document):
+        """
+        在 styles.xml 中注册论文使用的命名段落样式（基于 Normal）与字符样式
+        :param document: python-docx 的 Document 对象
+        :return: {样式键: 样式ID}，格式化器据此写入 pStyle / rStyle
+        """
+        styles = document.styles
+        normal_style = styles['Normal']
+        style_ids = {}
+        for key, paragraph_style, run_style in self._named_style_specs():
+            style = styles.add_style(NAMED_STYLE_NAMES[key], WD_STYLE_TYPE.PARAGRAPH)
+            style.base_style = normal_style
+            self._write_paragraph_style(style, paragraph_style)
+
+            font = style.font
+            font.name = run_style.english_font
+            style.element.rPr.rFonts.set(qn('w:eastAsia'), run_style.chinese_font)
+            font.size = run_style.size_pt
+            if run_style.bold is not None:
+                font.bold = run_style.bold
+            style_ids[key] = style.style_id
+
+        for key, run_style in self._character_style_specs():
+            style = styles.add_style(CHARACTER_STYLE_NAMES[key], WD_STYLE_TYPE.CHARACTER)
+            font = style.font
+            if run_style.english_font is not None:
+                font.name = run_style.english_font
+            if run_style.chinese_font is not None:
+                style.element.get_or_add_rPr().get_or_add_rFonts().set(qn('w:eastAsia'), run_style.chinese_font)
+            if run_style.bold is not None:
+                font.bold = run_style.bold
+            style_ids[key] = style.style_id
+        return style_ids
+
+    def _character_style_specs(self):
+        """命名字符样式列表：(样式键, 文字格式)；字段为 None 表示沿用段落样式"""
+        compiled = self.compiled
+        chinese_font = self.get_fonts().get('chinese', '宋体')
+        specs = [
+            # 标题编号：西文用编号字体，中文用 Normal 字体，字号与加粗由标题样式提供
+            (f'heading{level}_number', ResolvedRunStyle(chinese_font, heading.number_font, None, None, None))
+            for level, heading in compiled.headings.items()
+        ]
+
+        entry_run = compiled.reference_entry.run
+        number_cfg = self.get_references_style().get('number', {})
+        specs.append((
+            'reference_number',
+            ResolvedRunStyle(None, number_cfg.get('font', entry_run.english_font), None, None, number_cfg.get('bold', False))
+        ))
+        specs.append(('table_header', ResolvedRunStyle(None, None, None, None, True)))
+        return specs
+
+    def _named_style_specs(self):
+        """命名样式列表：(样式键, 段落格式, 文字格式)；bold 为 None 表示沿用 Normal"""
+        compiled = self.compiled
+        specs = []
+        for key in ('body', 'abstract', 'abstract_en', 'acknowledgements', 'appendix', 'reference_entry'):
+            text_style = getattr(compiled, key)
+            specs.append((key, text_style.paragraph, text_style.run))
+
+        for level, heading in compiled.headings.items():
+            specs.append((
+                f'heading{level}',
+                ResolvedParagraphStyle(alignment=heading.alignment, space_before=heading.space_before),
+                ResolvedRunStyle(heading.font, heading.font, None, heading.size_pt, heading.bold)
+            ))
+
+        for key, owner in (('figure_caption', 'figure'), ('table_caption', 'table')):
+            caption_cfg = self.config.get(owner, {}).get('caption', {})
+            caption = getattr(compiled, key)
+            specs.append((
+                key,
+                ResolvedParagraphStyle(
+                    alignment=WD_ALIGN_PARAGRAPH.CENTER,
+                    space_before=Pt(caption_cfg.get('space_before', 0)),
+                    space_after=Pt(caption_cfg.get('space_after', 0)),
+                    keep_with_next=True if owner == 'table' else None
+                ),
+                ResolvedRunStyle(caption.font, caption.font, None, caption.size_pt, None)
+            ))
+
+        table_cfg = self.get_table_style()
+        cell_font = table_cfg.get('content_font', '宋体')
+        cell_size = table_cfg.get('content_size', 12)
+        specs.append((
+            'table_cell',
+            ResolvedParagraphStyle(alignment=WD_ALIGN_PARAGRAPH.CENTER),
+            ResolvedRunStyle(cell_font, cell_font, cell_size, Pt(cell_size), None)
+        ))
+
+        for level, indent in TOC_LEVEL_INDENTS.items():
+            specs.append((
+                f'toc{level}',
+                ResolvedParagraphStyle(left_indent=Pt(indent) if indent else None, tab_stop=TOC_TAB_STOP),
+                ResolvedRunStyle('宋体', 'Times New Roman', TOC_ENTRY_SIZE, Pt(TOC_ENTRY_SIZE), None)
+            ))
+
+        header_cfg = self.config['body'].get('header')
+        if header_cfg:
+            header_font = header_cfg.get('font', '宋体')
+            header_size = header_cfg.get('size', 9)
+            specs.append((
+                'header',
+                ResolvedParagraphStyle(
+                    alignment=ALIGNMENT_MAP.get(header_cfg.get('alignment', 'center'), WD_ALIGN_PARAGRAPH.CENTER)
+                ),
+                ResolvedRunStyle(header_font, header_font, header_size, Pt(header_size), None)
+            ))
+        return specs
 
     def _apply_character_indent(self, paragraph, char_count, indent_twips):
         """通过 XML 设置字符单位的首行缩进"""
@@ -124,6 +472,17 @@ class USTCStyleManager:
         :param style_config: 样式配置字典
         :param text_type: 文本类型（'chinese' 或 'english'）
         """
+        r = run._r
+        if r.rPr is None:
+            key = ('run',) + tuple(
+                (name, style_config[name]) for name in ('font', 'size', 'bold', 'italic') if name in style_config
+            )
+            self._insert_rpr_template(r, key, lambda scratch: self._write_run_style(scratch, style_config))
+            return
+        self._write_run_style(run, style_config)
+
+    def _write_run_style(self, run, style_config):
+        """逐项写入 run 属性"""
         r_pr = run._element.get_or_add_rPr()
         if 'font' in style_config:
             font_name = style_config['font']
@@ -158,7 +517,53 @@ class USTCStyleManager:
         为包含中英文混合的文本设置不同字体
         """
         # 参考: best_practices/字体样式_reference.py 第30-41行
+        self._write_mixed_font(run, text, chinese_font, english_font, Pt(size), bold)
+
+    def apply_mixed_run_style(self, run, text, run_style):
+        """
+        按已编译的 ResolvedRunStyle 写入中英文混合文本（字号无需重新换算）
+        """
+        self._write_mixed_font(
+            run, text, run_style.chinese_font, run_style.english_font, run_style.size_pt, run_style.bold
+        )
+
+    def _write_mixed_font(self, run, text, chinese_font, english_font, size_pt, bold):
         run.text = text
+        r = run._r
+        if r.rPr is None:
+            r.insert(0, deepcopy(self.mixed_rpr_template(chinese_font, english_font, size_pt, bold)))
+            return
+        self._write_mixed_rpr(run, chinese_font, english_font, size_pt, bold)
+
+    def mixed_rpr_template(self, chinese_font, english_font, size_pt, bold):
+        """
+        中英文混排 run 的 rPr 模板（共享对象，写入文档前需深拷贝）
+        :param size_pt: 字号（Length）
+        """
+        key = ('mixed', chinese_font, english_font, size_pt, bold)
+        return self._rpr_template(
+            key,
+            lambda scratch: self._write_mixed_rpr(scratch, chinese_font, english_font, size_pt, bold)
+        )
+
+    def _insert_rpr_template(self, r, key, build):
+        """将缓存的 rPr 模板深拷贝为 run 的首个子元素"""
+        r.insert(0, deepcopy(self._rpr_template(key, build)))
+
+    def _rpr_template(self, key, build):
+        """
+        按样式签名取 rPr 模板
+        :param build: 模板不存在时，在临时 run 上逐项写入属性的函数
+        """
+        template = self._rpr_templates.get(key)
+        if template is None:
+            scratch = Run(OxmlElement('w:r'), None)
+            build(scratch)
+            template = self._rpr_templates[key] = scratch._r.rPr
+        return template
+
+    def _write_mixed_rpr(self, run, chinese_font, english_font, size_pt, bold):
+        """逐项写入中英文混排的 run 属性"""
         r_pr = run._element.get_or_add_rPr()
         run.font.name = english_font
         r_fonts = r_pr.find(qn('w:rFonts'))
@@ -168,7 +573,7 @@ class USTCStyleManager:
         r_fonts.set(qn('w:eastAsia'), chinese_font)
         r_fonts.set(qn('w:ascii'), english_font)
         r_fonts.set(qn('w:hAnsi'), english_font)
-        run.font.size = Pt(size)
+        run.font.size = size_pt
         b = r_pr.find(qn('w:b'))
         if b is None:
             b = OxmlElement('w:b')
@@ -0,0 +1,90 @@
+"""
+直接构建 WordprocessingML 元素 - 绕过 python-docx 的 Paragraph/Run 包装对象
+生成的元素与 python-docx 对应 API 的结果一致
+"""
+import re
+from copy import deepcopy
+
+from docx.oxml.ns import nsmap, qn
+from docx.oxml.parser import oxml_parser
+from lxml import etree
+
+
+_W_NSMAP = {'w': nsmap['w']}
+_SECT_PR = qn('w:sectPr')
+_XML_SPACE = qn('xml:space')
+# 与 python-docx 的 run.text 一致：制表符写为 w:tab，换行/回车写为 w:br
+_RUN_CONTROL_PATTERN = re.compile(r'([\t\r\n])')
+
+
+def make_w_element(tag):
+    """创建 w 命名空间元素（等价于 OxmlElement('w:...')，保留 python-docx 的自定义元素类）"""
+    return oxml_parser.makeelement(qn(f'w:{tag}'), nsmap=_W_NSMAP)
+
+
+def make_run(text, rpr_template=None):
+    """
+    构建 w:r
+    :param text: 文本
+    :param rpr_template: rPr 模板，给出时深拷贝为首个子元素
+    """
+    r = make_w_element('r')
+    if rpr_template is not None:
+        r.append(deepcopy(rpr_template))
+    append_text(r, text)
+    return r
+
+
+def append_text(r, text):
+    """向 w:r 末尾写入文本（与 python-docx 的 run.text 相同的 w:t/w:tab/w:br 拆分）"""
+    if '\t' not in text and '\r' not in text and '\n' not in text:
+        _append_t(r, text)
+        return
+    for segment in _RUN_CONTROL_PATTERN.split(text):
+        if segment == '\t':
+            r.append(make_w_element('tab'))
+        elif segment in ('\r', '\n'):
+            r.append(make_w_element('br'))
+        elif segment:
+            _append_t(r, segment)
+
+
+def _append_t(r, text):
+    if not text:
+        return
+    t = make_w_element('t')
+    t.text = text
+    if len(text.strip()) < len(text):
+        t.set(_XML_SPACE, 'preserve')
+    r.append(t)
+
+
+def append_block(body, element):
+    """
+    将段落/表格追加到 w:body 末尾（节属性 sectPr 之前）
+    直接检查最后一个子元素，避免 python-docx 每次插入时从头扫描所有子元素
+    """
+    try:
+        last = body[-1]
+    except IndexError:
+        last = None
+    if last is not None and last.tag == _SECT_PR:
+        last.addprevious(element)
+    else:
+        body.append(element)
+    return element
+
+
+def detach_blocks(document):
+    """
+    将 w:body 中除节属性 sectPr 外的所有块按顺序移到包装元素下并返回（没有块时返回 None）
+    包装元素声明了文档根节点的全部命名空间，序列化时各块不再重复输出 xmlns 声明
+    """
+    body = document.element.body
+    blocks = [child for child in body if child.tag != _SECT_PR]
+    if not blocks:
+        return None
+    wrapper = etree.Element(body.tag, nsmap=document.element.nsmap)
+    for block in blocks:
+        wrapper.append(block)
+    return wrapper
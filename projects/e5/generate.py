@@ -1,37 +1,157 @@
 """项目 e5 的文档生成入口脚本。"""
+import argparse
 from pathlib import Path
+import subprocess
 import sys
 
-from custom import USTCContentParser, USTCStyleManager, USTCFormatter
+# custom 包按需导入子模块：仅解析时不会加载 python-docx
+import custom
+from custom.citations import citation_issues
 
 
-def main():
+IMPORT_PROFILE_TOP = 15
+
+
+def run_import_profile(argv):
+    """
+    以 -X importtime 重新运行本脚本（去掉 --import-profile），按模块汇总导入耗时
+    :param argv: 传给子进程的其余命令行参数
+    :return: 子进程退出码
+    """
+    command = [sys.executable, '-X', 'importtime', str(Path(__file__).resolve()), *argv]
+    result = subprocess.run(command, stderr=subprocess.PIPE, text=True)
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            print(line, file=sys.stderr)
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # 表头
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(fields[0]) / 1000, int(fields[1]) / 1000, depth))
+
+    total_ms = sum(cumulative for _, _, cumulative, depth in rows if depth == 0)
+    print(f'\n导入耗时（按累计时间排序，前 {IMPORT_PROFILE_TOP} 项）:')
+    print(f'  {"累计(ms)":>9}  {"自身(ms)":>9}  模块')
+    for name, self_ms, cumulative_ms, _ in sorted(rows, key=lambda row: -row[2])[:IMPORT_PROFILE_TOP]:
+        print(f'  {cumulative_ms:>9.1f}  {self_ms:>9.1f}  {name}')
+    print(f'✓ 导入总耗时 {total_ms:.1f} ms（{len(rows)} 个模块）')
+    return result.returncode
+
+
+def report_parse_summary(content):
+    """仅解析模式：输出内容统计与引用检查结果"""
+    chapters = content.get('chapters', [])
+    items = sum(len(chapter.get('content', [])) for chapter in chapters)
+    print(f'✓ 解析完成: {len(chapters)} 章, {items} 个内容块, {len(content.get("references", []))} 条参考文献')
+    missing, uncited = citation_issues(content.get('citations'))
+    if missing:
+        print(f'⚠ 以下引用没有对应的参考文献: {", ".join(str(n) for n in missing)}')
+    if uncited:
+        print(f'⚠ 以下参考文献未在正文中引用: {", ".join(str(n) for n in uncited)}')
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description='生成项目 e5 的论文文档')
+    arg_parser.add_argument(
+        '--named-styles',
+        action='store_true',
+        help='在 styles.xml 中注册命名样式，段落通过 pStyle 引用（document.xml 更小）'
+    )
+    arg_parser.add_argument(
+        '--backend',
+        choices=('docx', 'lxml'),
+        default='docx',
+        help='正文渲染方式：docx 经 python-docx 对象，lxml 直接构建 XML 元素（更快，输出相同）'
+    )
+    arg_parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='逐章写出正文到临时文件，内存占用不随页数增长（适合合集等超长文档）'
+    )
+    arg_parser.add_argument(
+        '--chapter-workers',
+        type=int,
+        default=0,
+        help='并行渲染章节的 worker 进程数（大于 1 时启用，输出与顺序生成相同）'
+    )
+    arg_parser.add_argument(
+        '--render-cache',
+        default=None,
+        metavar='DIR',
+        help='磁盘渲染缓存目录：清洗后的参考文献与公式 OMML 跨多次生成、多个进程复用'
+    )
+    arg_parser.add_argument(
+        '--render-cache-mb',
+        type=int,
+        default=64,
+        help='渲染缓存大小上限（MB，超出时淘汰最久未使用的条目）'
+    )
+    arg_parser.add_argument(
+        '--parse-only',
+        action='store_true',
+        help='只解析并检查标准化文本，不生成文档（不加载 python-docx）'
+    )
+    arg_parser.add_argument(
+        '--output',
+        default=None,
+        help='输出 docx 路径（默认 output/e5thesis.docx；该目录下的其他 docx 会被清理）'
+    )
+    arg_parser.add_argument(
+        '--import-profile',
+        action='store_true',
+        help='输出各模块的导入耗时'
+    )
+    argv = sys.argv[1:] if argv is None else list(argv)
+    args = arg_parser.parse_args(argv)
+    if args.import_profile:
+        return run_import_profile([arg for arg in argv if arg != '--import-profile'])
+
     base_dir = Path(__file__).resolve().parent
     config_path = base_dir / 'config' / 'thesis_format.json'
     normalized_path = base_dir / 'input' / 'normalized.txt'
     image_dir = base_dir / 'input' / 'images'
-    output_dir = base_dir / 'output'
-    output_path = output_dir / 'e5thesis.docx'
+    output_path = Path(args.output).resolve() if args.output else base_dir / 'output' / 'e5thesis.docx'
+    output_dir = output_path.parent
 
     if not config_path.exists():
         raise FileNotFoundError(f'缺少配置文件: {config_path}')
     if not normalized_path.exists():
         raise FileNotFoundError(f'缺少标准化文本: {normalized_path}')
 
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    style_manager = USTCStyleManager(str(config_path))
-    parser = USTCContentParser(image_dir=str(image_dir))
+    parser = custom.USTCContentParser(image_dir=str(image_dir))
     content = parser.parse_file(str(normalized_path))
+    if args.parse_only:
+        report_parse_summary(content)
+        return 0
+
+    output_dir.mkdir(parents=True, exist_ok=True)
 
-    formatter = USTCFormatter(style_manager)
-    formatter.generate(content, str(output_path))
+    style_manager = custom.USTCStyleManager(str(config_path))
+    render_cache = None
+    if args.render_cache:
+        render_cache = custom.RenderCache(args.render_cache, max_bytes=args.render_cache_mb * 1024 * 1024)
+    formatter = custom.USTCFormatter(
+        style_manager,
+        named_styles=args.named_styles,
+        backend=args.backend,
+        chapter_workers=args.chapter_workers,
+        render_cache=render_cache
+    )
+    formatter.generate(content, str(output_path), streaming=args.stream)
     print(f'✓ 已生成文档: {output_path}')
+    if render_cache is not None:
+        hits, misses = render_cache.stats()
+        print(f'✓ 渲染缓存: 命中 {hits}，未命中 {misses}（{render_cache.cache_dir}）')
+    return 0
 
 
 if __name__ == '__main__':
     try:
-        main()
+        sys.exit(main())
     except Exception as exc:  # pragma: no cover - 入口脚本告警
         print(f'✗ 生成失败: {exc}')
         sys.exit(1)
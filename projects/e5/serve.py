@@ -0,0 +1,39 @@
+"""项目 e5 的本地生成服务入口。"""
+import argparse
+from pathlib import Path
+
+from custom import GenerationServer
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description='启动项目 e5 的本地论文生成服务')
+    arg_parser.add_argument('--host', default='127.0.0.1', help='监听地址')
+    arg_parser.add_argument('--port', type=int, default=8765, help='监听端口')
+    arg_parser.add_argument('--workers', type=int, default=None, help='worker 进程数（默认 CPU 核数）')
+    arg_parser.add_argument('--max-queue', type=int, default=8, help='worker 全忙时允许排队的请求数')
+    arg_parser.add_argument(
+        '--render-cache', default=None, metavar='DIR', help='磁盘渲染缓存目录（各 worker 共用，跨请求复用参考文献与公式）'
+    )
+    args = arg_parser.parse_args(argv)
+
+    server = GenerationServer(
+        Path(__file__).resolve().parent,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        max_queue=args.max_queue,
+        render_cache_dir=args.render_cache
+    )
+    pids = server.warm_up()
+    print(f'✓ {len(pids)} 个 worker 已预加载样式与底稿')
+    print(f'✓ 服务已启动: {server.address}（POST /generate, GET /health）')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print('正在停止服务...')
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,7 @@
+"""测试公共设置：将项目目录加入导入路径（custom 包与 benchmark 数据）"""
+from pathlib import Path
+import sys
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+if str(PROJECT_DIR) not in sys.path:
+    sys.path.insert(0, str(PROJECT_DIR))
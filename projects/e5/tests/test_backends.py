@@ -0,0 +1,38 @@
+"""渲染后端：python-docx 与 lxml 两个后端生成的示例文档 document.xml 一致"""
+import contextlib
+import io
+import zipfile
+from pathlib import Path
+
+import pytest
+from lxml import etree
+
+from custom import USTCContentParser, USTCFormatter, USTCStyleManager
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope='module')
+def content():
+    parser = USTCContentParser(image_dir=str(PROJECT_DIR / 'input' / 'images'))
+    return parser.parse_file(str(PROJECT_DIR / 'input' / 'normalized.txt'))
+
+
+def _document_xml(content, output_dir, backend, named_styles):
+    """生成示例文档，返回规范化（c14n）后的 word/document.xml"""
+    style_manager = USTCStyleManager(str(PROJECT_DIR / 'config' / 'thesis_format.json'))
+    formatter = USTCFormatter(style_manager, named_styles=named_styles, backend=backend)
+    output_dir.mkdir()
+    output_path = output_dir / 'thesis.docx'
+    with contextlib.redirect_stdout(io.StringIO()):
+        formatter.generate(content, str(output_path))
+    with zipfile.ZipFile(output_path) as archive:
+        root = etree.fromstring(archive.read('word/document.xml'))
+    return etree.tostring(root, method='c14n')
+
+
+@pytest.mark.parametrize('named_styles', [False, True])
+def test_backends_produce_identical_document_xml(content, tmp_path, named_styles):
+    docx_xml = _document_xml(content, tmp_path / 'docx', 'docx', named_styles)
+    lxml_xml = _document_xml(content, tmp_path / 'lxml', 'lxml', named_styles)
+    assert docx_xml == lxml_xml
@@ -0,0 +1,40 @@
+"""引用检查：生成时只报告没有对应参考文献的引用"""
+import contextlib
+import io
+from pathlib import Path
+
+import pytest
+
+from custom import USTCContentParser, USTCFormatter, USTCStyleManager
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope='module')
+def style_manager():
+    return USTCStyleManager(str(PROJECT_DIR / 'config' / 'thesis_format.json'))
+
+
+def _generate_output(style_manager, text, tmp_path):
+    parser = USTCContentParser(image_dir=str(PROJECT_DIR / 'input' / 'images'))
+    content = parser.parse_text(text)
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        USTCFormatter(style_manager).generate(content, str(tmp_path / 'thesis.docx'))
+    return stdout.getvalue()
+
+
+def test_generate_does_not_list_uncited_references(style_manager, tmp_path):
+    text = (PROJECT_DIR / 'input' / 'normalized.txt').read_text(encoding='utf-8')
+    output = _generate_output(style_manager, text, tmp_path)
+    assert '未在正文中引用' not in output
+    assert '没有对应的参考文献' not in output
+
+
+def test_generate_reports_missing_references(style_manager, tmp_path):
+    text = (PROJECT_DIR / 'input' / 'normalized.txt').read_text(encoding='utf-8')
+    # 目录之后正文中的小节标题
+    head, heading, tail = text.rpartition('\n1.1 研究背景和意义\n')
+    text = f'{head}{heading}已有研究[99]表明。\n{tail}'
+    output = _generate_output(style_manager, text, tmp_path)
+    assert '⚠ 以下引用没有对应的参考文献: 99' in output
@@ -0,0 +1,17 @@
+"""版面估算：文本宽度按 Unicode 东亚宽度区分全角与西文字符"""
+import pytest
+
+from custom.layout import text_width
+
+
+@pytest.mark.parametrize('text, wide, narrow', [
+    ('abc', 0, 3),
+    ('绪论', 2, 0),
+    ('表1.1 结果', 3, 4),
+    ('ＡＢ，', 3, 0),
+    # 半角片假名与欧元符号在 UTF-8 下同样占 3 字节，但不是全角字符
+    ('ｱｲ€', 0, 3),
+    ('café', 0, 4),
+])
+def test_text_width_classifies_east_asian_width(text, wide, narrow):
+    assert text_width(text, 10, latin_advance=0.5) == pytest.approx(10 * (wide + 0.5 * narrow))
@@ -0,0 +1,91 @@
+"""内容节点：dict 兼容行为与 content_from_dict 的缺省字段处理"""
+import contextlib
+import io
+from pathlib import Path
+
+import pytest
+
+from custom import USTCFormatter, USTCStyleManager
+from custom.nodes import (
+    CONTENT_NODE_TYPES,
+    ChapterNode,
+    FigureNode,
+    FormulaNode,
+    ReferenceNode,
+    TableNode,
+    content_from_dict,
+    content_to_dict,
+)
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope='module')
+def style_manager():
+    return USTCStyleManager(str(PROJECT_DIR / 'config' / 'thesis_format.json'))
+
+
+def _generate(style_manager, content, tmp_path, backend='docx'):
+    formatter = USTCFormatter(style_manager, backend=backend)
+    with contextlib.redirect_stdout(io.StringIO()):
+        formatter.generate(content, str(tmp_path / 'out.docx'))
+    return tmp_path / 'out.docx'
+
+
+def test_get_returns_default_for_missing_field():
+    node = FigureNode(path='a.png')
+    assert node.get('caption', '') == ''
+    assert node.get('path', '') == 'a.png'
+    assert node['caption'] is None
+
+
+@pytest.mark.parametrize('node_class', [ChapterNode, ReferenceNode, *CONTENT_NODE_TYPES.values()])
+def test_all_nodes_expose_type_key(node_class):
+    node = node_class()
+    assert next(iter(node)) == 'type'
+    assert node['type'] == node_class.type
+    assert 'type' not in (node.extra or {})
+
+
+def test_round_trip_keeps_nodes_free_of_extra_keys():
+    content = content_from_dict({
+        'chapters': [{'number': 1, 'title': '绪论', 'content': [{'type': 'paragraph', 'text': '正文'}]}],
+        'references': [{'text': '作者. 题名[J]. 刊名, 2020.'}],
+    })
+    restored = content_from_dict(content_to_dict(content))
+    assert restored['chapters'][0].extra is None
+    assert restored['references'][0].extra is None
+
+
+@pytest.mark.parametrize('backend', USTCFormatter.BACKENDS)
+def test_optional_fields_may_be_omitted(style_manager, tmp_path, backend):
+    content = content_from_dict({
+        'chapters': [{'number': 1, 'content': [
+            {'type': 'table', 'rows': [['a', 'b'], ['1', '2']]},
+            {'type': 'figure', 'path': str(tmp_path / 'missing.png')},
+            {'type': 'formula', 'number': '1-1'},
+        ]}],
+    })
+    assert content['title'] == ''
+    assert content['chapters'][0]['title'] == ''
+    assert _generate(style_manager, content, tmp_path, backend).exists()
+
+
+def test_nodes_built_directly_without_optional_fields(style_manager, tmp_path):
+    content = content_from_dict({'chapters': [{'number': 1, 'title': '绪论', 'content': []}]})
+    content['chapters'][0]['content'] = [
+        TableNode(rows=[['a'], ['1']]),
+        FigureNode(),
+        FormulaNode(number='1-1'),
+    ]
+    assert _generate(style_manager, content, tmp_path).exists()
+
+
+@pytest.mark.parametrize('item', [
+    {'type': 'heading2', 'text': '缺少编号'},
+    {'type': 'table', 'rows': [['a']], 'caption': 1},
+    {'type': 'formula', 'content': ['x']},
+])
+def test_malformed_fields_raise_value_error(item):
+    with pytest.raises(ValueError):
+        content_from_dict({'chapters': [{'content': [item]}]})
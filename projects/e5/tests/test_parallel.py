@@ -0,0 +1,51 @@
+"""并行章节渲染：按章合并的结果与顺序生成一致，片段结构不符时明确报错"""
+import contextlib
+import io
+import zipfile
+from pathlib import Path
+
+import pytest
+from docx.oxml.ns import nsdecls
+from lxml import etree
+
+from custom import USTCContentParser, USTCFormatter, USTCStyleManager
+from custom.parallel import ChapterFragment
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope='module')
+def style_manager():
+    return USTCStyleManager(str(PROJECT_DIR / 'config' / 'thesis_format.json'))
+
+
+def _document_xml(style_manager, output_dir, chapter_workers):
+    parser = USTCContentParser(image_dir=str(PROJECT_DIR / 'input' / 'images'))
+    content = parser.parse_file(str(PROJECT_DIR / 'input' / 'normalized.txt'))
+    formatter = USTCFormatter(style_manager, chapter_workers=chapter_workers)
+    output_dir.mkdir()
+    output_path = output_dir / 'thesis.docx'
+    with contextlib.redirect_stdout(io.StringIO()):
+        formatter.generate(content, str(output_path))
+    with zipfile.ZipFile(output_path) as archive:
+        return etree.tostring(etree.fromstring(archive.read('word/document.xml')), method='c14n')
+
+
+def test_parallel_chapters_match_sequential(style_manager, tmp_path):
+    sequential = _document_xml(style_manager, tmp_path / 'sequential', 0)
+    parallel = _document_xml(style_manager, tmp_path / 'parallel', 2)
+    assert parallel == sequential
+
+
+def test_merge_rejects_seq_field_without_result(style_manager):
+    formatter = USTCFormatter(style_manager)
+    formatter._reset_document()
+    xml = (
+        f'<w:body {nsdecls("w")}><w:p><w:r>'
+        '<w:fldChar w:fldCharType="begin"/>'
+        '<w:instrText xml:space="preserve"> SEQ Figure \\* ARABIC </w:instrText>'
+        '<w:fldChar w:fldCharType="end"/>'
+        '</w:r></w:p></w:body>'
+    )
+    with pytest.raises(ValueError, match='SEQ'):
+        formatter._merge_chapter_fragment(ChapterFragment(xml.encode('utf-8'), {}))
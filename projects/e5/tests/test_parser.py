@@ -0,0 +1,46 @@
+"""内容解析：split_blocks 与逐行状态机使用同一套行分类规则"""
+from pathlib import Path
+
+import pytest
+
+from custom import USTCContentParser
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def parser():
+    return USTCContentParser(image_dir=str(PROJECT_DIR / 'input' / 'images'))
+
+
+def _chapter_starts(parser, lines):
+    return [start for start, kind in parser.split_blocks(lines) if kind == 'chapter']
+
+
+def test_split_blocks_matches_parsed_chapters(parser):
+    lines = (PROJECT_DIR / 'input' / 'normalized.txt').read_text(encoding='utf-8').split('\n')
+    content = parser.parse_text('\n'.join(lines))
+    starts = _chapter_starts(parser, lines)
+    assert [parser._match_chapter_heading(lines[start].strip(), True)[0] for start in starts] == [
+        chapter['number'] for chapter in content['chapters']
+    ]
+    kinds = [kind for _, kind in parser.split_blocks(lines)]
+    assert kinds[-2:] == ['references', 'acknowledgements']
+
+
+def test_block_contents_do_not_start_chapters(parser):
+    lines = [
+        '题目',
+        '第1章 绪论',
+        '[TABLE:1-1]',
+        '2 标题行|来源',
+        '3 数据|4',
+        '[/TABLE]',
+        '[FORMULA:1-1]',
+        '4 x = 1',
+        '[/FORMULA]',
+        '2 方法',
+    ]
+    content = parser.parse_text('\n'.join(lines))
+    assert [chapter['number'] for chapter in content['chapters']] == [1, 2]
+    assert _chapter_starts(parser, lines) == [1, 9]
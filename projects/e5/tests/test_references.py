@@ -0,0 +1,15 @@
+"""参考文献清洗：GB/T 7714 语料逐条比对期望输出"""
+import json
+from pathlib import Path
+
+import pytest
+
+from custom.references import normalize_reference_text
+
+CORPUS = Path(__file__).resolve().parent.parent / 'benchmark_data' / 'references_gbt7714.jsonl'
+CASES = [json.loads(line) for line in CORPUS.read_text(encoding='utf-8').splitlines() if line.strip()]
+
+
+@pytest.mark.parametrize('case', CASES, ids=[f'ref{idx + 1}' for idx in range(len(CASES))])
+def test_normalize_reference_text(case):
+    assert normalize_reference_text(case['text']) == case['expected']
@@ -0,0 +1,83 @@
+"""生成服务：请求头校验、缺省字段的 JSON 内容与 worker 异常退出后的恢复"""
+import contextlib
+import http.client
+import io
+import json
+import os
+import signal
+import threading
+from pathlib import Path
+
+import pytest
+
+from custom.server import GenerationServer
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+SAMPLE_TEXT = '第1章 绪论\n正文段落。\n'
+
+
+@pytest.fixture(scope='module')
+def server():
+    with contextlib.redirect_stdout(io.StringIO()):
+        server = GenerationServer(PROJECT_DIR, port=0, workers=1)
+        server.warm_up()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    with contextlib.redirect_stdout(io.StringIO()):
+        server.shutdown()
+
+
+def _post(server, body, content_type='text/plain; charset=utf-8', length=None):
+    """发送 POST /generate；length 不为 None 时直接写入给定的 Content-Length"""
+    host, port = server.httpd.server_address[:2]
+    connection = http.client.HTTPConnection(host, port, timeout=120)
+    try:
+        connection.putrequest('POST', '/generate')
+        connection.putheader('Content-Type', content_type)
+        connection.putheader('Content-Length', str(len(body)) if length is None else length)
+        connection.endheaders(body)
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+@pytest.mark.parametrize('length', ['abc', '-1', '1.5'])
+def test_invalid_content_length_is_rejected(server, length):
+    status, _, body = _post(server, SAMPLE_TEXT.encode('utf-8'), length=length)
+    assert status == 400
+    assert 'Content-Length' in json.loads(body)['error']
+
+
+def test_json_with_missing_optional_fields(server):
+    content = {
+        'title': '测试',
+        'chapters': [{
+            'number': 1,
+            'content': [
+                {'type': 'paragraph', 'text': '正文'},
+                {'type': 'table', 'number': '1.1', 'rows': [['甲', '乙'], ['1', '2']]},
+                {'type': 'formula', 'number': '1.1'},
+            ],
+        }],
+    }
+    status, _, body = _post(server, json.dumps(content).encode('utf-8'), 'application/json')
+    assert status == 200, body
+    assert body[:2] == b'PK'
+
+
+def test_recovers_after_worker_crash(server):
+    status, headers, _ = _post(server, SAMPLE_TEXT.encode('utf-8'))
+    assert status == 200
+    os.kill(int(headers['X-Worker-Pid']), signal.SIGKILL)
+
+    # 进程池损坏可能在下一个请求提交之后才被发现：至多该请求失败，随后的请求由新的进程池处理
+    with contextlib.redirect_stdout(io.StringIO()):
+        status, _, body = _post(server, SAMPLE_TEXT.encode('utf-8'))
+        if status != 200:
+            assert status == 500
+            assert 'BrokenProcessPool' in json.loads(body)['error']
+            status, _, body = _post(server, SAMPLE_TEXT.encode('utf-8'))
+    assert status == 200, body
@@ -0,0 +1,147 @@
+"""
+批量生成 projects/ 下所有项目的论文文档。
+
+每个项目目录需包含 generate.py、config/thesis_format.json 与 input/normalized.txt。
+各项目在独立的子进程中运行自己的 generate.py（项目各自带有同名的 custom 包，
+不能在同一解释器中混用），并发数由 --jobs 控制。
+
+用法: python projects/generate_all.py [--jobs N] [--projects e5 ...] [--output-dir DIR]
+                                       [--timeout 秒] [其余参数原样传给各项目的 generate.py]
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
+from pathlib import Path
+import subprocess
+import sys
+import time
+
+
+PROJECTS_DIR = Path(__file__).resolve().parent
+PROJECT_LAYOUT = ('generate.py', os.path.join('config', 'thesis_format.json'), os.path.join('input', 'normalized.txt'))
+LOG_TAIL_LINES = 10
+
+
+class ProjectResult:
+    """单个项目的生成结果"""
+    __slots__ = ('project', 'returncode', 'elapsed', 'output', 'log')
+
+    def __init__(self, project, returncode, elapsed, output=None, log=''):
+        self.project = project
+        self.returncode = returncode
+        self.elapsed = elapsed
+        self.output = output
+        self.log = log
+
+    @property
+    def ok(self):
+        return self.returncode == 0
+
+
+def discover_projects(projects_dir=PROJECTS_DIR, names=None):
+    """
+    查找具有标准目录结构的项目
+    :param names: 只保留指定的项目名，None 表示全部
+    :return: 按名称排序的项目目录列表
+    """
+    projects = []
+    for path in sorted(Path(projects_dir).iterdir()):
+        if not path.is_dir() or (names and path.name not in names):
+            continue
+        if all((path / relative).is_file() for relative in PROJECT_LAYOUT):
+            projects.append(path)
+    return projects
+
+
+def run_project(project_dir, extra_args, output_dir=None, timeout=None):
+    """
+    在子进程中运行项目的 generate.py
+    :param extra_args: 原样传给 generate.py 的参数
+    :param output_dir: 统一输出目录；给出时每个项目写入其下的同名子目录
+    :param timeout: 单个项目的超时时间（秒）
+    """
+    command = [sys.executable, 'generate.py', *extra_args]
+    output = None
+    if output_dir is not None:
+        output = Path(output_dir).resolve() / project_dir.name / f'{project_dir.name}thesis.docx'
+        command += ['--output', str(output)]
+
+    start = time.perf_counter()
+    try:
+        completed = subprocess.run(
+            command,
+            cwd=project_dir,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            timeout=timeout
+        )
+        returncode, log = completed.returncode, completed.stdout
+    except subprocess.TimeoutExpired as exc:
+        log = exc.stdout.decode('utf-8', 'replace') if isinstance(exc.stdout, bytes) else (exc.stdout or '')
+        returncode, log = -1, f'{log}\n✗ 超时（{timeout} 秒）'
+    return ProjectResult(project_dir.name, returncode, time.perf_counter() - start, output, log)
+
+
+def generate_all(projects, extra_args=(), jobs=None, output_dir=None, timeout=None):
+    """
+    并行生成多个项目，按完成顺序输出进度
+    :return: 与 projects 顺序一致的 ProjectResult 列表
+    """
+    jobs = jobs or os.cpu_count() or 1
+    results = {}
+    # 实际工作在 generate.py 子进程中完成，线程只负责等待
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(run_project, project, list(extra_args), output_dir, timeout): project
+            for project in projects
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            results[result.project] = result
+            mark = '✓' if result.ok else '✗'
+            print(f'{mark} {result.project}: {result.elapsed:.2f}s')
+    return [results[project.name] for project in projects]
+
+
+def print_summary(results, wall_time):
+    """输出各项目耗时与失败项目的日志末尾"""
+    failed = [result for result in results if not result.ok]
+    print(f'\n{"项目":<16}{"状态":<8}{"耗时(s)":>8}  输出')
+    for result in results:
+        status = '成功' if result.ok else f'失败({result.returncode})'
+        print(f'{result.project:<16}{status:<8}{result.elapsed:>8.2f}  {result.output or "-"}')
+    for result in failed:
+        tail = result.log.strip().splitlines()[-LOG_TAIL_LINES:]
+        print(f'\n✗ {result.project} 日志末尾:')
+        for line in tail:
+            print(f'    {line}')
+    total = sum(result.elapsed for result in results)
+    print(f'\n共 {len(results)} 个项目，失败 {len(failed)} 个；总耗时 {wall_time:.2f}s（各项目累计 {total:.2f}s）')
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description='并行生成 projects/ 下所有项目的论文文档')
+    arg_parser.add_argument('--jobs', '-j', type=int, default=None, help='同时运行的项目数（默认 CPU 核数）')
+    arg_parser.add_argument('--projects', nargs='+', default=None, help='只生成指定项目')
+    arg_parser.add_argument('--output-dir', default=None, help='统一输出目录（默认写入各项目自己的 output/）')
+    arg_parser.add_argument('--timeout', type=float, default=None, help='单个项目的超时时间（秒）')
+    args, extra_args = arg_parser.parse_known_args(argv)
+
+    projects = discover_projects(names=set(args.projects) if args.projects else None)
+    missing = sorted(set(args.projects or ()) - {project.name for project in projects})
+    for name in missing:
+        print(f'✗ 未找到项目或目录结构不完整: {name}')
+    if not projects:
+        print('✗ 没有可生成的项目')
+        return 1
+
+    print(f'发现 {len(projects)} 个项目，并发数 {args.jobs or os.cpu_count() or 1}')
+    start = time.perf_counter()
+    results = generate_all(projects, extra_args, args.jobs, args.output_dir, args.timeout)
+    print_summary(results, time.perf_counter() - start)
+    return 0 if not missing and all(result.ok for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())